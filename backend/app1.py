@@ -1,24 +1,72 @@
-from flask import Flask, request, jsonify, render_template_string
+from lazy_imports import ImportProfiler, module_available, optional_module
+
+# Profil des imports du démarrage (désinstallé à la fin de ce module, voir /startup_report)
+import_profiler = ImportProfiler().install()
+
+from flask import Flask, Response, g, request, jsonify, render_template_string
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import torch
 import torch.nn as nn
-import torchvision.transforms as transforms
-from torchvision import models
 from PIL import Image
 import cv2
 import numpy as np
-import base64
-from facenet_pytorch import MTCNN
-import io
 import os
 import json
-from collections import deque
 import sqlite3
 import sys
+import threading
+import atexit
+import time
+
+from config import get_config
+from batching import BatchInferenceScheduler
+from stream_state import StreamRegistry, stream_key
+from face_detectors import (FaceDetectorPool, HaarFaceDetector, MTCNNFaceDetector,
+                            DlibFaceDetector, largest_face, downscale_for_detection,
+                            rescale_boxes)
+from face_tracking import FaceTrack, FaceTracker
+from preprocessing import TensorPreprocessor, decode_image, image_bytes_from_base64, synthetic_jpeg
+from frame_io import FrameTooLargeError, read_frame
+from quantization import load_calibration_tensors, quantize_model
+from inference_backends import EagerBackend, select_backend
+from worker_pool import InferenceWorkerPool
+from frame_cache import FrameCache, eye_signature, frame_signature
+from change_detection import ChangeDetector, ChangeState
+from landmarks import EarCascade, mean_ear, shape_to_array
+from temporal_engine import TemporalEngine, TemporalSeriesWriter, delete_metrics
+from multi_face import MultiFaceTracks
+from logging_setup import get_logger, log_queue_depth, parse_sample_rates, setup_logging
+from metrics import ERRORS, REGISTRY, REQUEST_SECONDS, REQUESTS, STAGE_SECONDS, observe_stage, stage
+from system_sampler import SystemSampler
+from profiling import MODES as PROFILE_MODES, ProfilerController
+
+app_config = get_config()
+
+
+def configure_logging():
+    """Logs de l'application selon la config (à refaire dans chaque worker forké : le thread d'écriture n'y survit pas)"""
+    return setup_logging(
+        level=app_config.LOG_LEVEL,
+        log_file=app_config.LOG_FILE or None,
+        sample_rates=parse_sample_rates(app_config.LOG_SAMPLE_RATES),
+        default_sample_rate=app_config.LOG_DEFAULT_SAMPLE_RATE,
+        json_lines=app_config.LOG_JSON,
+        queued=app_config.LOG_QUEUE_ENABLED
+    )
+
+
+log_sampling = configure_logging()
+face_log = get_logger('face')
+landmarks_log = get_logger('landmarks')
+predict_log = get_logger('predict')
+db_log = get_logger('db')
 
 # Configuration de l'application Flask
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
+# Corps trop volumineux refusés (413) avant que Werkzeug n'analyse un formulaire ou un JSON
+app.config['MAX_CONTENT_LENGTH'] = app_config.MAX_REQUEST_BYTES
 CORS(app)  # Permet les requêtes cross-origin
 
 # Cache pour les prédictions (éviter de retraiter la même image)
@@ -28,24 +76,10 @@ import secrets
 from datetime import datetime, timedelta
 from functools import wraps
 
-# Cache des prédictions récentes
-prediction_cache = {}
-CACHE_SIZE = 100
-
-def get_image_hash(image_data):
-    """Générer un hash de l'image pour le cache"""
-    if isinstance(image_data, str):
-        if 'base64,' in image_data:
-            image_data = image_data.split(',')[1]
-    return hashlib.md5(image_data.encode()).hexdigest()
-
-# Optionnel: tentative d'import de dlib pour les landmarks
-try:
-    import dlib
-    import face_recognition
-    DLIB_AVAILABLE = True
-except ImportError:
-    DLIB_AVAILABLE = False
+
+# Optionnel : dlib pour les landmarks, importé seulement si le modèle de landmarks est utilisé
+DLIB_AVAILABLE = module_available('dlib')
+if not DLIB_AVAILABLE:
     print("Dlib non disponible. Fonctionnalité de landmarks désactivée.")
 
 
@@ -110,6 +144,23 @@ class SessionDatabase:
         except Exception:
             pass
         
+        # Série temporelle compacte des indicateurs (une ligne par flux toutes les N secondes)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS session_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stream_id TEXT,
+                timestamp REAL,
+                perclos REAL,
+                blink_rate REAL,
+                avg_blink_ms REAL,
+                long_closures INTEGER,
+                mean_score REAL,
+                source TEXT,
+                frames INTEGER
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_metrics_stream ON session_metrics (stream_id, timestamp)')
+        
         conn.commit()
         conn.close()
         
@@ -198,6 +249,12 @@ class SessionDatabase:
         # Supprimer d'abord les frames associées
         cursor.execute('DELETE FROM session_frames WHERE session_id = ?', (session_id,))
         
+        # Les indicateurs temporels de la session client (sans identifiant, le flux est partagé : conservé)
+        cursor.execute('SELECT user_id, client_session_id FROM sessions WHERE id = ?', (session_id,))
+        row = cursor.fetchone()
+        if row is not None and row[1] is not None:
+            delete_metrics(cursor, row[0], row[1])
+        
         # Puis supprimer la session
         cursor.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
         
@@ -310,6 +367,7 @@ def require_admin(f):
 class MobileNetDrowsiness(nn.Module):
     def __init__(self):
         super().__init__()
+        from torchvision import models  # ~0.5 s d'import : seulement à la construction du modèle
         base_model = models.mobilenet_v2(weights=None)
         base_model.classifier[1] = nn.Sequential(  # CLASSIFIER[1] doit être un Sequential
             nn.Linear(1280, 1),
@@ -327,195 +385,379 @@ class MobileNetDrowsiness(nn.Module):
 
 
 
+def load_mobilenet(model_path, device, mmap=False, strict=False):
+    """Construire MobileNetDrowsiness et charger ses poids (modèle non entraîné si absent).
+
+    Avec `mmap` (CPU), le state dict est projeté en mémoire depuis le fichier
+    et les paramètres pointent directement sur ces pages (`assign=True`) :
+    pas de copie des poids, et des pages partagées entre processus.
+    Avec `strict`, un fichier absent ou illisible lève une exception au lieu
+    de retomber sur un modèle non entraîné (re-scoring des frames enregistrées).
+    """
+    model = MobileNetDrowsiness()
+    
+    if strict and not os.path.isfile(model_path):
+        raise FileNotFoundError(f"Modèle {model_path} introuvable")
+    
+    # Charger les poids
+    if os.path.exists(model_path):
+        try:
+            checkpoint = None
+            assign = False
+            if mmap and device.type == 'cpu':
+                try:
+                    checkpoint = torch.load(model_path, map_location=device, mmap=True)
+                    assign = True
+                except (TypeError, RuntimeError) as e:
+                    # torch < 2.1 ou fichier au format legacy (non zip)
+                    print(f"⚠️ Chargement mmap impossible ({e}), chargement classique")
+            if checkpoint is None:
+                checkpoint = torch.load(model_path, map_location=device)
+            state_dict = checkpoint
+            if isinstance(checkpoint, dict) and (
+                'model_state_dict' in checkpoint or 'state_dict' in checkpoint
+            ):
+                if 'model_state_dict' in checkpoint:
+                    state_dict = checkpoint['model_state_dict']
+                else:
+                    state_dict = checkpoint['state_dict']
+            if assign:
+                model.load_state_dict(state_dict, assign=True)
+            else:
+                model.load_state_dict(state_dict)
+
+            print(f"✅ Modèle MobileNet chargé depuis {model_path}")
+        except Exception as e:
+            if strict:
+                raise
+            print(f"❌ Erreur lors du chargement des poids : {str(e)}")
+            print("⚠️ Utilisation d'un modèle non entraîné")
+    else:
+        print(f"📁 Modèle {model_path} non trouvé, utilisation d'un modèle non entraîné")
+
+    model.to(device)
+    model.eval()
+    return model
+
+
 class DrowsinessDetector:
     def __init__(self, model_path='mobilenet_drowsiness.pth'):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         print(f"Utilisation du device: {self.device}")
 
         self.classes = ['awake', 'drowsy']
-        self.prediction_buffer = deque(maxlen=5)
-        self.model = MobileNetDrowsiness()
+        # Lissage temporel : un buffer par flux (conducteur / session client)
+        self.streams = StreamRegistry(
+            buffer_size=app_config.STREAM_BUFFER_SIZE,
+            ttl_seconds=app_config.STREAM_TTL_SECONDS,
+            max_streams=app_config.MAX_STREAMS
+        )
+        self.model = load_mobilenet(model_path, self.device, mmap=app_config.MODEL_MMAP)
+        self.precision = 'fp32'
+        self.backend = EagerBackend(self.model, self.device)
+        self.backend_benchmark = {}
 
         # Optimisations PyTorch
         if torch.cuda.is_available():
             # Mixed precision pour CUDA
             self.scaler = torch.cuda.amp.GradScaler()
             print("✅ Mixed precision CUDA activé")
-        
-        # Charger les poids
-        if os.path.exists(model_path):
-            try:
-                checkpoint = torch.load(model_path, map_location=self.device)
-                if isinstance(checkpoint, dict) and (
-                    'model_state_dict' in checkpoint or 'state_dict' in checkpoint
-                ):
-                    if 'model_state_dict' in checkpoint:
-                        self.model.load_state_dict(checkpoint['model_state_dict'])
-                    else:
-                        self.model.load_state_dict(checkpoint['state_dict'])
-                else:
-                    self.model.load_state_dict(checkpoint)
 
-                print(f"✅ Modèle MobileNet chargé depuis {model_path}")
-            except Exception as e:
-                print(f"❌ Erreur lors du chargement des poids : {str(e)}")
-                print("⚠️ Utilisation d'un modèle non entraîné")
-        else:
-            print(f"📁 Modèle {model_path} non trouvé, utilisation d'un modèle non entraîné")
-
-        self.model.to(self.device)
-        self.model.eval()
+        # Micro-batching : regrouper les forwards des requêtes concurrentes
+        self.batcher = None
+        self.start_batcher()
+
+        # Pool de processus d'inférence (attaché au démarrage, voir start_worker_pool)
+        self.worker_pool = None
+        
+        # Persistance des indicateurs temporels (attachée au démarrage, après l'échauffement)
+        self.temporal_series = None
+        
+        # Cache des scores de frames quasi identiques (par flux)
+        self.frame_cache = None
+        if app_config.CACHE_ENABLED:
+            self.frame_cache = FrameCache(
+                max_entries=app_config.CACHE_MAX_ENTRIES,
+                max_bytes=app_config.CACHE_MAX_BYTES,
+                ttl_seconds=app_config.CACHE_TIMEOUT,
+                max_distance=app_config.CACHE_HASH_DISTANCE,
+                hash_size=app_config.CACHE_HASH_SIZE,
+                entries_per_stream=app_config.CACHE_ENTRIES_PER_STREAM,
+                eye_tolerance=app_config.CACHE_EYE_TOLERANCE
+            )
         
-        # Optimisation : JIT compilation si disponible
-        try:
-            if hasattr(torch, 'jit') and torch.jit.is_available():
-                self.model = torch.jit.optimize_for_inference(torch.jit.script(self.model))
-                print("✅ Modèle optimisé avec TorchScript")
-        except Exception as e:
-            print(f"⚠️ TorchScript non disponible: {e}")
+        # Détection de changement par flux (frames statiques non rescorées)
+        self.change_detector = None
+        if app_config.CHANGE_DETECTION_ENABLED:
+            self.change_detector = ChangeDetector(
+                threshold=app_config.CHANGE_THRESHOLD,
+                max_skip=app_config.CHANGE_MAX_SKIP,
+                thumbnail_size=app_config.CHANGE_THUMBNAIL_SIZE,
+                block_size=app_config.CHANGE_BLOCK_SIZE
+            )
 
-        self.transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                                 std=[0.229, 0.224, 0.225])
-        ])
+        # Prétraitement fusionné : resize + normalisation dans un tenseur préalloué
+        self.preprocessor = TensorPreprocessor(size=224)
+        self.decode_max_width = app_config.DECODE_MAX_WIDTH
 
         # Détection faciale avec fallback
         self.use_face_detection = True
         self.use_opencv_fallback = True  # Activer OpenCV par défaut
         self.use_mtcnn = False  # Désactiver MTCNN par défaut (trop strict)
         
+        # Pool de détecteurs : chaque détecteur est chargé une fois puis réutilisé
+        self.face_detectors = FaceDetectorPool()
+        self.detection_width = app_config.FACE_DETECTION_WIDTH  # 0 = pleine résolution
+        self.face_detector_order = []
+        
+        if self.use_opencv_fallback:
+            try:
+                self.face_detectors.register('haar', HaarFaceDetector)
+                self.face_detectors.preload('haar')
+                self.face_detector_order.append('haar')
+                print("✅ Cascade de Haar chargée")
+            except Exception as e:
+                print(f"❌ Erreur cascade de Haar: {e}")
+        
         try:
             if self.use_mtcnn:
-                self.detector_face = MTCNN(
-                    keep_all=False, 
-                    device=self.device,
-                    min_face_size=20,  # Visages plus petits
-                    thresholds=[0.6, 0.7, 0.7],  # Plus permissif
-                    factor=0.8,  # Échelle de pyramide plus fine
-                    post_process=False  # Désactiver le post-processing pour la vitesse
-                )
+                self.face_detectors.register('mtcnn', lambda: MTCNNFaceDetector(device=self.device))
+                self.face_detectors.preload('mtcnn')
+                self.face_detector_order.append('mtcnn')
                 print("✅ MTCNN initialisé avec paramètres optimisés")
             else:
                 print("🔄 MTCNN désactivé, utilisation d'OpenCV uniquement")
-                self.detector_face = None
         except Exception as e:
             print(f"❌ Erreur MTCNN: {e}")
+        
+        if not self.face_detector_order:
             print("⚠️ Détection faciale désactivée")
             self.use_face_detection = False
-            self.detector_face = None
+        
+        # Suivi du visage par flux : détection plein cadre seulement tous les N frames
+        self.face_tracker = None
+        if app_config.FACE_TRACKING_ENABLED:
+            self.face_tracker = FaceTracker(
+                redetect_interval=app_config.FACE_REDETECT_INTERVAL,
+                roi_padding=app_config.FACE_ROI_PADDING
+            )
 
         # Optionnel : landmarks avec dlib
         self.use_landmarks = False
         if DLIB_AVAILABLE:
             try:
                 predictor_path = 'shape_predictor_68_face_landmarks.dat'
-                if os.path.exists(predictor_path):
-                    self.predictor = dlib.shape_predictor(predictor_path)
-                    self.face_detector = dlib.get_frontal_face_detector()
+                if not os.path.exists(predictor_path):
+                    print(f"Fichier {predictor_path} non trouvé")
+                elif optional_module('dlib') is not None:
+                    self.dlib = optional_module('dlib')
+                    self.predictor = self.dlib.shape_predictor(predictor_path)
+                    self.face_detectors.register('dlib', DlibFaceDetector)
                     self.use_landmarks = True
                     print("Détecteur de landmarks disponible")
-                else:
-                    print(f"Fichier {predictor_path} non trouvé")
             except Exception as e:
                 print(f"Erreur chargement landmarks : {e}")
+        
+        # Cascade EAR -> CNN : les yeux nettement ouverts ou fermés ne passent pas par le modèle
+        self.ear_cascade = None
+        if self.use_landmarks and app_config.EAR_CASCADE_ENABLED:
+            self.ear_cascade = EarCascade(
+                open_threshold=app_config.EAR_OPEN_THRESHOLD,
+                closed_threshold=app_config.EAR_CLOSED_THRESHOLD
+            )
+            print(f"✅ Cascade EAR activée (ouverts >= {app_config.EAR_OPEN_THRESHOLD}, fermés <= {app_config.EAR_CLOSED_THRESHOLD})")
+
+        # Optimisations du modèle (après la détection faciale, utilisée pour la calibration)
+        self._optimize_model()
+        # Statistiques du modèle final : calculées une fois, pas à chaque /performance
+        self.model_stats = self.compute_model_stats()
+
+    def compute_model_stats(self):
+        """Nombre de paramètres et taille des poids du modèle servi, calculés une fois au chargement.
+
+        Mesurés sur le `state_dict()` : les poids INT8 (tenseurs quantifiés,
+        `_packed_params`) y figurent avec leur taille réelle, contrairement à
+        `parameters()`. Les backends TorchScript / ONNX servent ces mêmes poids.
+        """
+        if not hasattr(self.model, 'state_dict'):
+            return {'parameters': 0, 'trainable_parameters': 0, 'size_mb': 0.0}
+        buffers = {name for name, _ in self.model.named_buffers()}
+        parameters = 0
+        size = 0
+        for name, value in self.model.state_dict().items():
+            for tensor in (value if isinstance(value, (tuple, list)) else (value,)):
+                if not isinstance(tensor, torch.Tensor):
+                    continue  # dtype des poids quantifiés
+                size += tensor.numel() * tensor.element_size()
+                if name not in buffers and not name.endswith(('.scale', '.zero_point')):
+                    parameters += tensor.numel()
+        trainable = sum(p.numel() for p in self.model.parameters() if p.requires_grad)
+        return {'parameters': parameters, 'trainable_parameters': trainable, 'size_mb': round(size / (1024 * 1024), 2)}
+
+    def _optimize_model(self):
+        """Quantification INT8 éventuelle puis choix du backend d'inférence"""
+        precision = app_config.INFERENCE_PRECISION
+        if precision != 'fp32':
+            if self.device.type != 'cpu':
+                print(f"⚠️ Précision {precision} réservée au CPU, modèle conservé en fp32")
+            else:
+                try:
+                    calibration = []
+                    if precision in ('int8', 'int8_static'):
+                        calibration = load_calibration_tensors(
+                            app_config.LOCAL_DB_PATH,
+                            lambda frame: self.preprocess_image(frame).clone(),
+                            limit=app_config.QUANT_CALIBRATION_FRAMES
+                        )
+                        print(f"🎯 {len(calibration)} frames de calibration chargées")
+                    self.model, self.precision = quantize_model(self.model, precision, calibration)
+                    if self.precision != 'fp32':
+                        print(f"✅ Modèle quantifié ({self.precision})")
+                except Exception as e:
+                    print(f"❌ Erreur de quantification: {e}")
+                    print("⚠️ Utilisation du modèle fp32")
+        
+        # Backend d'inférence (éventuellement choisi par benchmark au démarrage)
+        requested = app_config.INFERENCE_BACKEND
+        self.backend, self.backend_benchmark = select_backend(
+            self.model,
+            self.device,
+            preferred=requested,
+            auto=(requested == 'auto'),
+            runs=app_config.BACKEND_BENCHMARK_RUNS
+        )
+        print(f"✅ Backend d'inférence: {self.backend.name} ({self.backend.latency_ms:.2f}ms/frame)")
 
-    def crop_face(self, image_pil):
-        """Détecter et recadrer le visage avec OpenCV en priorité, MTCNN en fallback"""
-        try:
-            print(f"🔍 Tentative détection faciale sur image {image_pil.size}")
+    def detect_faces(self, img_array):
+        """Détecter les visages avec OpenCV en priorité, MTCNN en fallback"""
+        # Détection sur une image réduite, boîtes ramenées à la pleine résolution
+        small, scale = downscale_for_detection(img_array, self.detection_width)
+        for name in self.face_detector_order:
+            try:
+                faces = self.face_detectors.detect(name, small)
+            except Exception as detector_error:
+                face_log.warning("⚠️ %s échoué: %s", name, detector_error)
+                continue
             
-            # Priorité 1 : OpenCV (plus fiable)
-            if self.use_opencv_fallback:
-                try:
-                    import cv2
-                    import numpy as np
-                    
-                    # Convertir PIL en numpy array
-                    img_array = np.array(image_pil)
-                    
-                    # Détecteur de visages OpenCV (plus permissif)
-                    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-                    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-                    
-                    faces = face_cascade.detectMultiScale(
-                        gray, 
-                        scaleFactor=1.1, 
-                        minNeighbors=3, 
-                        minSize=(30, 30)
-                    )
-                    
-                    if len(faces) > 0:
-                        print(f"✅ Visage détecté par OpenCV: {len(faces)} visage(s)")
-                        # Prendre le plus grand visage
-                        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
-                        face_img = image_pil.crop((x, y, x+w, y+h))
-                        return face_img
-                    else:
-                        print("⚠️ Aucun visage détecté par OpenCV")
-                        
-                except Exception as cv_error:
-                    print(f"⚠️ OpenCV échoué: {cv_error}")
+            if faces:
+                face_log.debug("✅ Visage détecté par %s: %d visage(s)", name, len(faces))
+                return rescale_boxes(faces, scale)
+            face_log.debug("⚠️ Aucun visage détecté par %s", name)
+        return []
+
+    def start_batcher(self):
+        """Démarrer le thread de micro-batching (à refaire après un fork : le thread du parent n'y existe pas)"""
+        if self.batcher is None and app_config.BATCH_INFERENCE_ENABLED:
+            self.batcher = BatchInferenceScheduler(
+                self._run_model,
+                max_batch_size=app_config.BATCH_MAX_SIZE,
+                max_wait_ms=app_config.BATCH_MAX_WAIT_MS
+            )
+            print(f"✅ Micro-batching activé (batch max {app_config.BATCH_MAX_SIZE}, fenêtre {app_config.BATCH_MAX_WAIT_MS}ms)")
+
+    def stop_batcher(self):
+        """Arrêter le thread de micro-batching (avant un fork) ; l'inférence redevient directe"""
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+
+    def stream_track(self, stream):
+        """Suivi du visage d'un flux (créé à la demande), ou None si le suivi est désactivé"""
+        if self.face_tracker is None or stream is None:
+            return None
+        if stream.face_track is None:
+            stream.face_track = FaceTrack()
+        return stream.face_track
+
+    def locate_face(self, img_array, track=None):
+        """Boîte (x, y, w, h) du visage principal (suivi par ROI si le flux a déjà un visage connu)"""
+        if self.face_tracker is not None and track is not None:
+            return self.face_tracker.locate(img_array, track, self.detect_faces)
+        
+        faces = self.detect_faces(img_array)
+        # Prendre le plus grand visage
+        return largest_face(faces) if faces else None
+
+    def crop_face(self, image_pil, stream=None):
+        """Détecter et recadrer le visage d'une image PIL"""
+        try:
+            face_log.debug("🔍 Tentative détection faciale sur image %s", image_pil.size)
+            box = self.locate_face(np.asarray(image_pil.convert('RGB')), self.stream_track(stream))
             
-            # Priorité 2 : MTCNN (si disponible et OpenCV échoue)
-            if self.use_mtcnn and self.use_face_detection and self.detector_face is not None:
-                try:
-                    face = self.detector_face(image_pil)
-                    
-                    if face is not None:
-                        print(f"✅ Visage détecté par MTCNN: {face.shape}")
-                        # Convertir le tensor en image PIL
-                        if hasattr(face, 'permute'):
-                            face = face.permute(1, 2, 0).byte().cpu().numpy()
-                            face_img = Image.fromarray(face)
-                        else:
-                            face_img = face
-                        return face_img
-                    else:
-                        print("⚠️ Aucun visage détecté par MTCNN")
-                        
-                except Exception as mtcnn_error:
-                    print(f"⚠️ MTCNN échoué: {mtcnn_error}")
-            elif not self.use_mtcnn:
-                print("🔄 MTCNN désactivé, passage à l'image complète")
+            if box is not None:
+                x, y, w, h = box
+                return image_pil.crop((x, y, x+w, y+h))
             
             # Dernier fallback : retourner l'image complète
-            print("🔄 Aucun visage détecté, utilisation de l'image complète")
+            face_log.debug("🔄 Aucun visage détecté, utilisation de l'image complète")
             return image_pil
                 
         except Exception as e:
-            print(f"❌ Erreur crop_face: {e}")
-            print(f"🔍 Type d'image: {type(image_pil)}")
-            print(f"🔍 Taille image: {image_pil.size if hasattr(image_pil, 'size') else 'N/A'}")
+            face_log.warning("❌ Erreur crop_face: %s", e, extra={'fields': {
+                'image_type': type(image_pil).__name__,
+                'image_size': getattr(image_pil, 'size', 'N/A')
+            }})
             return image_pil
 
-    def preprocess_image(self, image):
-        try:
+    def decode_frame(self, image):
+        """Image (base64, octets, ndarray BGR ou PIL) -> tableau RGB uint8, décodé une seule fois"""
+        if isinstance(image, (str, bytes, bytearray, memoryview)):
+            started = time.perf_counter()
             if isinstance(image, str):
-                if 'base64,' in image:
-                    image_data = base64.b64decode(image.split(',')[1])
-                else:
-                    image_data = base64.b64decode(image)
-                image = Image.open(io.BytesIO(image_data))
-            elif isinstance(image, np.ndarray):
-                image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-
-            image = image.convert('RGB')
-            
-            # Crop face seulement si la détection faciale est activée
-            if self.use_face_detection and self.detector_face is not None:
-                image = self.crop_face(image)
-            else:
-                print("🔄 Détection faciale désactivée, utilisation de l'image complète")
-
-            image_tensor = self.transform(image).unsqueeze(0)
-            return image_tensor.to(self.device)
+                image = image_bytes_from_base64(image)
+                started = observe_stage('base64_decode', started)
+            img_array = decode_image(image, self.decode_max_width)
+            observe_stage('image_decode', started)
+            return img_array
+        if isinstance(image, np.ndarray):
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return np.asarray(image.convert('RGB'))
+
+    def face_box(self, img_array, track=None):
+        """Boîte du visage à recadrer, ou None (détection désactivée ou aucun visage)"""
+        if not self.use_face_detection:
+            face_log.debug("🔄 Détection faciale désactivée, utilisation de l'image complète")
+            return None
+        
+        try:
+            box = self.locate_face(img_array, track)
         except Exception as e:
-            print(f"Erreur lors du préprocessing: {e}")
+            face_log.warning("❌ Erreur détection faciale: %s", e)
+            box = None
+        
+        if box is None:
+            face_log.debug("🔄 Aucun visage détecté, utilisation de l'image complète")
+        return box
+
+    def crop_tensor(self, img_array, box=None):
+        """Tableau RGB (recadré sur `box`, simple vue sans copie) -> tenseur d'entrée 1x3x224x224"""
+        if box is not None:
+            x, y, w, h = box
+            img_array = img_array[y:y+h, x:x+w]
+        return self.preprocessor.to_tensor(img_array).to(self.device)
+
+    def preprocess_array(self, img_array, track=None):
+        """Tableau RGB -> tenseur d'entrée 1x3x224x224 (recadré sur le visage)"""
+        return self.crop_tensor(img_array, self.face_box(img_array, track))
+
+    def preprocess_image(self, image, stream=None):
+        """Image (base64, octets, ndarray BGR ou PIL) -> tenseur d'entrée 1x3x224x224"""
+        try:
+            return self.preprocess_array(self.decode_frame(image), self.stream_track(stream))
+        except Exception as e:
+            predict_log.error("Erreur lors du préprocessing: %s", e)
             raise
 
+    def face_landmarks(self, img_array, box):
+        """Landmarks 68 points (68, 2) du visage `box`, calculés sur la seule région du visage"""
+        x, y, w, h = (int(v) for v in box)
+        x0, y0 = max(x, 0), max(y, 0)
+        gray = cv2.cvtColor(img_array[y0:y+h, x0:x+w], cv2.COLOR_RGB2GRAY)
+        rect = self.dlib.rectangle(x - x0, y - y0, x - x0 + w, y - y0 + h)
+        return shape_to_array(self.predictor(gray, rect))
+
     def extract_eye_features(self, image):
+        """EAR moyen (deux yeux) de chaque visage détecté par dlib"""
         if not self.use_landmarks:
             return None
 
@@ -525,86 +767,263 @@ class DrowsinessDetector:
             else:
                 image_array = image
 
-            gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
-            faces = self.face_detector(gray)
-
-            eye_features = []
-            for face in faces:
-                landmarks = self.predictor(gray, face)
-                left_eye = [(landmarks.part(i).x, landmarks.part(i).y) for i in range(36, 42)]
-                right_eye = [(landmarks.part(i).x, landmarks.part(i).y) for i in range(42, 48)]
-
-                left_ear = self.eye_aspect_ratio(left_eye)
-                right_ear = self.eye_aspect_ratio(right_eye)
-                ear = (left_ear + right_ear) / 2.0
-                eye_features.append(ear)
-
-            return eye_features
+            faces = self.face_detectors.detect('dlib', image_array)
+            if not faces:
+                return []
+            landmarks = np.stack([self.face_landmarks(image_array, box) for box in faces])
+            return mean_ear(landmarks).tolist()
         except Exception as e:
-            print(f"Erreur extraction features: {e}")
+            landmarks_log.warning("Erreur extraction features: %s", e)
             return None
 
-    def eye_aspect_ratio(self, eye):
+    def face_ears(self, img_array, boxes):
+        """EAR moyen de chaque visage : landmarks par visage, EAR vectorisé sur le lot (N, 68, 2)"""
+        if not self.use_landmarks or not boxes:
+            return [None] * len(boxes)
         try:
-            A = np.linalg.norm(np.array(eye[1]) - np.array(eye[5]))
-            B = np.linalg.norm(np.array(eye[2]) - np.array(eye[4]))
-            C = np.linalg.norm(np.array(eye[0]) - np.array(eye[3]))
-            return (A + B) / (2.0 * C) if C != 0 else 0
-        except:
-            return 0
-
-    def predict(self, image):
+            landmarks = np.stack([self.face_landmarks(img_array, box) for box in boxes])
+            return mean_ear(landmarks).tolist()
+        except Exception as e:
+            landmarks_log.warning("❌ Erreur landmarks: %s", e)
+            return [None] * len(boxes)
+
+    def _run_model(self, input_tensor):
+        """Forward du modèle sur un batch (Nx3x224x224)"""
+        with torch.no_grad():
+            # Utiliser mixed precision si CUDA disponible
+            if torch.cuda.is_available() and hasattr(self, 'scaler'):
+                with torch.cuda.amp.autocast():
+                    return self.backend(input_tensor)
+            return self.backend(input_tensor)
+
+    def forward(self, input_tensor):
+        """Forward d'une image, via le planificateur de batching s'il est actif"""
+        if self.batcher is not None:
+            return self.batcher.infer(input_tensor)
+        return self._run_model(input_tensor)
+
+    def score_array(self, img_array, track=None):
+        """Score brut (probabilité sigmoïde, EAR ou None) d'une frame RGB décodée, sans lissage.
+
+        Cascade à deux étages : si l'EAR tranche (yeux nettement ouverts ou
+        fermés), la probabilité en est déduite et le CNN n'est pas exécuté.
+        """
+        started = time.perf_counter()
+        box = self.face_box(img_array, track)
+        started = observe_stage('face_detection', started)
+        ear = None
+        if self.use_landmarks and box is not None:
+            try:
+                ear = mean_ear(self.face_landmarks(img_array, box))
+            except Exception as e:
+                landmarks_log.warning("❌ Erreur landmarks: %s", e)
+            landmarks_done = observe_stage('landmarks', started)
+            if self.ear_cascade is not None:
+                probability = self.ear_cascade.classify(ear, (landmarks_done - started) * 1000)
+                if probability is not None:
+                    return probability, ear
+            started = landmarks_done
+        
+        input_tensor = self.crop_tensor(img_array, box)
+        started = observe_stage('preprocess', started)
+        # Le modèle se termine par nn.Sigmoid : sa sortie est déjà une probabilité
+        probability = float(self.forward(input_tensor).item())
+        observe_stage('forward', started)
+        return probability, ear
+
+    def score_frame(self, img_array, track=None):
+        """Score brut d'une frame décodée, calculé par le pool de processus s'il est actif"""
+        if self.worker_pool is not None:
+            with stage('worker_pool'):
+                return self.worker_pool.score(img_array, track)
+        return self.score_array(img_array, track)
+
+    def update_temporal(self, stream, probability, ear, now):
+        """Alimenter PERCLOS / clignements du flux (EAR si disponible, sinon score CNN)"""
+        if stream.temporal is None:
+            stream.temporal = TemporalEngine(
+                window_seconds=app_config.TEMPORAL_WINDOW_SECONDS,
+                capacity=app_config.TEMPORAL_MAX_FRAMES,
+                max_blink_seconds=app_config.TEMPORAL_MAX_BLINK_MS / 1000
+            )
+        if ear is not None:
+            stream.temporal.update(now, ear < app_config.TEMPORAL_EAR_CLOSED, ear, 'ear')
+        else:
+            stream.temporal.update(now, probability > 0.5, probability, 'cnn')
+        if self.temporal_series is not None:
+            self.temporal_series.maybe_record(stream.key, stream.temporal, now)
+        return stream.temporal.snapshot()
+
+    def predict_faces(self, image, stream_id='default'):
+        """Mode multi-visages : une prédiction par visage détecté, un seul forward pour tous.
+
+        Chaque visage garde son propre lissage et ses indicateurs temporels,
+        rattachés à un identifiant de piste stable (association par IoU d'une
+        frame à l'autre). Le cache, la détection de changement et le pool de
+        processus ne s'appliquent qu'au mode mono-visage.
+        """
         try:
-            # Vérifier le cache d'abord
-            image_hash = get_image_hash(image)
-            if image_hash in prediction_cache:
-                cached_result = prediction_cache[image_hash]
-                print(f"✅ Cache hit pour image {image_hash[:8]}...")
-                return cached_result
+            stream = self.streams.get(stream_id)
+            img_array = self.decode_frame(image)
+            faces = self.detect_faces(img_array) if self.use_face_detection else []
+            boxes = [tuple(int(v) for v in box)
+                     for box in sorted(faces, key=lambda f: f[2] * f[3], reverse=True)[:app_config.MULTI_FACE_MAX_FACES]]
             
-            input_tensor = self.preprocess_image(image)
-
-            with torch.no_grad():
-                # Utiliser mixed precision si CUDA disponible
-                if torch.cuda.is_available() and hasattr(self, 'scaler'):
-                    with torch.cuda.amp.autocast():
-                        outputs = self.model(input_tensor)
-                else:
-                    outputs = self.model(input_tensor)
-                    
-                probability = torch.sigmoid(outputs)
-                confidence_score = probability.item() * 100
-                predicted_class = 'drowsy' if probability.item() > 0.5 else 'awake'
-
-            self.prediction_buffer.append((predicted_class, confidence_score))
-
-            recent_predictions = list(self.prediction_buffer)
-            drowsy_count = sum(1 for pred, _ in recent_predictions if pred == 'drowsy')
+            with stream.lock:
+                if stream.faces is None:
+                    stream.faces = MultiFaceTracks(
+                        stream.key,
+                        buffer_size=self.streams.buffer_size,
+                        iou_threshold=app_config.MULTI_FACE_IOU_THRESHOLD,
+                        max_missed=app_config.MULTI_FACE_MAX_MISSED
+                    )
+                slots = stream.faces.assign(boxes)
+            
+            if not boxes:
+                return {'prediction': 'awake', 'confidence': 0.0, 'face_count': 0, 'faces': []}
+            
+            # Tous les visages recadrés dans un même tenseur : un seul appel au modèle
+            batch = self.preprocessor.to_batch([img_array[y:y+h, x:x+w] for x, y, w, h in boxes]).to(self.device)
+            # Même échelle que le mode mono-visage : la sortie du modèle (nn.Sigmoid) est la probabilité
+            probabilities = self._run_model(batch).view(-1).tolist()
+            ears = self.face_ears(img_array, boxes)
+            
+            now = time.monotonic()
+            face_results = []
+            for slot, box, probability, ear in zip(slots, boxes, probabilities, ears):
+                confidence_score = probability * 100
+                predicted_class = 'drowsy' if probability > 0.5 else 'awake'
+                with slot.state.lock:
+                    final_prediction, avg_confidence = slot.state.push(predicted_class, confidence_score)
+                    temporal = self.update_temporal(slot.state, probability, ear, now)
+                face_results.append({
+                    'track_id': slot.track_id,
+                    'box': list(box),
+                    'prediction': final_prediction,
+                    'confidence': round(avg_confidence, 2),
+                    'raw_prediction': predicted_class,
+                    'raw_confidence': round(confidence_score, 2),
+                    'ear': round(ear, 4) if ear is not None else None,
+                    'temporal': temporal
+                })
+            
+            # Synthèse : somnolent si au moins un visage l'est
+            drowsy = [f for f in face_results if f['prediction'] == 'drowsy']
+            return {
+                'prediction': 'drowsy' if drowsy else 'awake',
+                'confidence': max(f['confidence'] for f in (drowsy or face_results)),
+                'face_count': len(face_results),
+                'faces': face_results
+            }
+        
+        except Exception as e:
+            predict_log.exception("Erreur lors de la prédiction multi-visages: %s", e)
+            return {
+                'prediction': 'awake',
+                'confidence': 0.0,
+                'faces': [],
+                'error': str(e)
+            }
 
-            final_prediction = 'drowsy' if drowsy_count >= len(recent_predictions) // 2 else 'awake'
-            avg_confidence = np.mean([conf for _, conf in recent_predictions])
+    def warmup(self, runs=5, shapes=((640, 480),)):
+        """Inférences d'échauffement sur des frames synthétiques : retourne la durée en ms.
+
+        Passe par tout le pipeline (décodage, détection, prétraitement, forward)
+        puis par les tailles de batch usuelles, pour que le profilage JIT et les
+        allocations aient lieu avant le premier vrai client.
+        """
+        started = time.perf_counter()
+        stream_id = '__warmup__'
+        # Les frames synthétiques se ressemblent : sans cache ni détection de changement,
+        # chaque frame passe par le modèle
+        frame_cache, self.frame_cache = self.frame_cache, None
+        change_detector, self.change_detector = self.change_detector, None
+        try:
+            for width, height in shapes:
+                for i in range(runs):
+                    self.predict(synthetic_jpeg(width, height, seed=i), stream_id=stream_id)
+        finally:
+            self.frame_cache = frame_cache
+            self.change_detector = change_detector
+        
+        batch_sizes = {1}
+        if self.batcher is not None:
+            batch_sizes.update({2, 4, self.batcher.max_batch_size})
+        for batch_size in sorted(batch_sizes):
+            for _ in range(2):
+                self._run_model(torch.zeros(batch_size, 3, 224, 224, device=self.device))
+        
+        self.streams.remove(stream_id)
+        return (time.perf_counter() - started) * 1000
+
+    def predict(self, image, stream_id='default'):
+        try:
+            stream = self.streams.get(stream_id)
+            img_array = self.decode_frame(image)
+            track = self.stream_track(stream)
+            box = track.box if track is not None else None
+            
+            # Visage immobile depuis la dernière frame scorée : réutiliser son score
+            score = None
+            if self.change_detector is not None:
+                started = time.perf_counter()
+                if stream.change_state is None:
+                    stream.change_state = ChangeState()
+                score, thumbnail = self.change_detector.check(stream.change_state, img_array, box)
+                observe_stage('change_detection', started)
+            skipped = score is not None
+            
+            # Sinon vérifier le cache (hash perceptuel du visage + bande des yeux) ;
+            # sans boîte de visage connue, la bande des yeux est inconnue : pas de cache
+            cached = False
+            cache_key = None
+            if not skipped and self.frame_cache is not None and box is not None:
+                started = time.perf_counter()
+                cache_key = (frame_signature(img_array, box, self.frame_cache.hash_size),
+                             eye_signature(img_array, box))
+                score = self.frame_cache.get(stream.key, *cache_key)
+                cached = score is not None
+                observe_stage('cache_lookup', started)
+            
+            score_ms = None
+            if score is None:
+                started = time.perf_counter()
+                score = self.score_frame(img_array, track)
+                score_ms = (time.perf_counter() - started) * 1000
+                if cache_key is not None:
+                    frame_hash, eyes = cache_key
+                    self.frame_cache.put(stream.key, frame_hash, score, eyes)
+            if not skipped and self.change_detector is not None:
+                self.change_detector.record(stream.change_state, thumbnail, score, score_ms)
+            probability, ear = score
+            confidence_score = probability * 100
+            predicted_class = 'drowsy' if probability > 0.5 else 'awake'
+
+            started = time.perf_counter()
+            with stream.lock:
+                final_prediction, avg_confidence = stream.push(predicted_class, confidence_score)
+                buffer_size = len(stream)
+                temporal = self.update_temporal(stream, probability, ear, time.monotonic())
+            observe_stage('smoothing', started)
 
             result = {
                 'prediction': final_prediction,
                 'confidence': round(avg_confidence, 2),
                 'raw_prediction': predicted_class,
                 'raw_confidence': round(confidence_score, 2),
-                'buffer_size': len(self.prediction_buffer)
+                'buffer_size': buffer_size,
+                'cached': cached,
+                'skipped': skipped,
+                'ear': round(ear, 4) if ear is not None else None,
+                'temporal': temporal
             }
-            
-            # Mettre en cache le résultat
-            if len(prediction_cache) >= CACHE_SIZE:
-                # Supprimer le plus ancien
-                oldest_key = next(iter(prediction_cache))
-                del prediction_cache[oldest_key]
-            
-            prediction_cache[image_hash] = result
-            print(f"💾 Cache miss, nouvelle prédiction mise en cache")
+            if stream.change_state is not None:
+                result['change_detection'] = stream.change_state.stats()
 
             return result
 
         except Exception as e:
-            print(f"Erreur lors de la prédiction: {e}")
+            predict_log.exception("Erreur lors de la prédiction: %s", e)
             return {
                 'prediction': 'awake',
                 'confidence': 0.0,
@@ -613,15 +1032,233 @@ class DrowsinessDetector:
 
 # Initialiser le détecteur
 detector = None
+detector_lock = threading.Lock()
+streaming_server = None
+system_sampler = None
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Compteurs et latence par endpoint (toutes les routes)"""
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.endpoint or 'not_found'
+        REQUESTS.inc(endpoint)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+        if response.status_code >= 500:
+            ERRORS.inc(endpoint)
+    return response
+
+
+def queue_depths():
+    """Files d'attente internes : micro-batching, pool de processus, logs"""
+    current = detector
+    return {
+        'batcher': current.batcher.queue_depth() if current is not None and current.batcher is not None else 0,
+        'worker_pool': current.worker_pool.stats()['in_flight'] if current is not None and current.worker_pool is not None else 0,
+        'logging': log_queue_depth()
+    }
+
+
+REGISTRY.gauge('drowsiness_queue_depth', "Éléments en attente dans les files internes", queue_depths, label='queue')
+REGISTRY.gauge('drowsiness_active_streams', 'Flux actifs (état temporel en mémoire)',
+               lambda: len(detector.streams) if detector is not None else 0)
+REGISTRY.gauge('drowsiness_process_rss_megabytes', 'Mémoire résidente du processus (dernier relevé)',
+               lambda: system_sampler.latest().get('rss_mb') if system_sampler is not None else None)
+REGISTRY.gauge('drowsiness_cpu_percent', 'Charge CPU de la machine (dernier relevé)',
+               lambda: system_sampler.latest().get('cpu_percent') if system_sampler is not None else None)
+REGISTRY.gauge('drowsiness_cache_entries', 'Entrées du cache de frames',
+               lambda: len(detector.frame_cache) if detector is not None and detector.frame_cache is not None else 0)
+
+# État du démarrage : l'API n'est prête qu'après chargement et échauffement du modèle
+startup_state = {
+    'ready': False,
+    'load_ms': None,
+    'warmup_ms': None,
+    'warmup_runs': 0,
+    'workers_ms': None,
+    'ready_at': None
+}
+
+# Fin des imports du module : arrêter le profil et le résumer
+import_profiler.uninstall()
+startup_state['import_ms'] = import_profiler.report(top=0)['import_ms']
+print(f"📦 Imports: {startup_state['import_ms']}ms ({len(import_profiler.records)} modules)")
 
 def init_detector():
     global detector
     if detector is None:
-        detector = DrowsinessDetector(model_path='mobilenet_drowsiness.pth')
+        with detector_lock:
+            if detector is None:
+                detector = DrowsinessDetector(model_path='mobilenet_drowsiness.pth')
+
+    return detector
+
 
+def build_worker_detector(model_path):
+    """Détecteur d'un processus du pool d'inférence (appelé dans le processus enfant).
+
+    Un processus ne traite qu'une frame à la fois : le micro-batching entre
+    threads n'y apporterait que de la latence.
+    """
+    app_config.BATCH_INFERENCE_ENABLED = False
+    worker_detector = DrowsinessDetector(model_path=model_path)
+    shapes = parse_shapes(app_config.WARMUP_SHAPES)
+    if app_config.WARMUP_RUNS > 0 and shapes:
+        worker_detector.warmup(app_config.WARMUP_RUNS, shapes)
+    return worker_detector
+
+
+def start_worker_pool(detector):
+    """Démarrer les processus d'inférence et y déléguer le scoring des frames"""
+    pool = InferenceWorkerPool(
+        build_worker_detector,
+        ('mobilenet_drowsiness.pth',),
+        num_workers=app_config.INFERENCE_WORKERS,
+        threads_per_worker=app_config.WORKER_TORCH_THREADS or None,
+        max_frame_pixels=app_config.WORKER_MAX_FRAME_PIXELS
+    )
+    pool.start()
+    atexit.register(pool.close)
+    detector.worker_pool = pool
+    print(f"✅ Pool d'inférence: {pool.num_workers} processus x {pool.threads_per_worker} thread(s) torch")
+    return pool
+
+
+def parse_shapes(shapes):
+    """'640x480,1280x720' -> [(640, 480), (1280, 720)]"""
+    parsed = []
+    for shape in shapes.split(','):
+        if 'x' in shape:
+            width, height = shape.lower().strip().split('x')
+            parsed.append((int(width), int(height)))
+    return parsed
+
+
+def start_background_services(detector):
+    """Threads de fond : micro-batching, persistance des indicateurs temporels, métriques système"""
+    global system_sampler
+    detector.start_batcher()
+    if app_config.SYSTEM_SAMPLER_ENABLED and system_sampler is None:
+        system_sampler = SystemSampler(
+            interval_seconds=app_config.SYSTEM_SAMPLER_INTERVAL,
+            window=app_config.SYSTEM_SAMPLER_WINDOW
+        )
+        atexit.register(system_sampler.close)
+    if app_config.TEMPORAL_PERSIST_ENABLED and detector.temporal_series is None:
+        SessionDatabase()  # crée la table session_metrics si besoin
+        detector.temporal_series = TemporalSeriesWriter(
+            'sessions.db',
+            interval_seconds=app_config.TEMPORAL_PERSIST_INTERVAL,
+            retention_seconds=app_config.TEMPORAL_RETENTION_DAYS * 86400,
+            persist_anonymous=app_config.TEMPORAL_PERSIST_ANONYMOUS
+        )
+        atexit.register(detector.temporal_series.close)
+
+
+def startup(background=True):
+    """Construire le détecteur et l'échauffer avant de déclarer l'API prête.
+
+    Avec `background=False` (maître gunicorn en preload, voir wsgi.py), ni
+    threads de fond ni processus d'inférence ne sont démarrés : ils ne
+    survivraient pas au fork et sont lancés dans chaque worker.
+    """
+    started = time.perf_counter()
+    detector = init_detector()
+    startup_state['load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    
+    if background and app_config.INFERENCE_WORKERS > 0 and detector.worker_pool is None:
+        started = time.perf_counter()
+        start_worker_pool(detector)
+        startup_state['workers_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    
+    shapes = parse_shapes(app_config.WARMUP_SHAPES)
+    if app_config.WARMUP_RUNS > 0 and shapes:
+        startup_state['warmup_ms'] = round(detector.warmup(app_config.WARMUP_RUNS, shapes), 1)
+        startup_state['warmup_runs'] = app_config.WARMUP_RUNS * len(shapes)
+    
+    if background:
+        start_background_services(detector)
+    
+    startup_state['ready'] = True
+    startup_state['ready_at'] = datetime.now().isoformat()
+    print(f"✅ API prête (chargement {startup_state['load_ms']}ms, échauffement {startup_state['warmup_ms']}ms)")
     return detector
 
 
+def resolve_stream_id(client_session_id=None):
+    """Identifiant du flux de la requête : utilisateur (si token valide) + client_session_id"""
+    user_id = None
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        user = user_tokens.get(auth_header.split(' ')[1])
+        if user:
+            user_id = user['id']
+
+    if user_id is None and client_session_id is None:
+        # Client anonyme sans session : isoler au moins par adresse
+        return f"anon:{request.remote_addr}"
+    return stream_key(user_id, client_session_id)
+
+
+BINARY_FRAME_MIMETYPES = ('image/jpeg', 'application/octet-stream')
+
+
+def read_predict_payload():
+    """Extraire (image, client_session_id) d'une requête /predict.
+
+    Formats acceptés : JSON {"image": "data:image/jpeg;base64,..."}, corps
+    image/jpeg brut, ou multipart/form-data avec un champ fichier "image".
+    Pour les formats binaires, les octets sont lus dans un buffer réutilisable.
+    """
+    if request.mimetype in BINARY_FRAME_MIMETYPES:
+        image = read_frame(request.stream, app_config.MAX_FRAME_BYTES, request.content_length)
+        client_session_id = request.args.get('client_session_id') or request.headers.get('X-Client-Session-Id')
+        return (image if len(image) else None), client_session_id
+
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('image')
+        if upload is None:
+            return None, None
+        image = read_frame(upload.stream, app_config.MAX_FRAME_BYTES)
+        return (image if len(image) else None), request.form.get('client_session_id')
+
+    data = request.get_json(silent=True)
+    if not data or 'image' not in data:
+        return None, None
+    return data['image'], data.get('client_session_id')
+
+
+def authenticate_token(token):
+    """Utilisateur associé à un token valide, sinon None"""
+    if not token or not verify_token(token):
+        return None
+    return user_tokens.get(token)
+
+
+def start_streaming_server(detector):
+    """Démarrer le serveur WebSocket de streaming dans un thread démon"""
+    global streaming_server
+    from stream_server import StreamingServer
+    
+    streaming_server = StreamingServer(
+        detector,
+        authenticate_token,
+        host=app_config.HOST,
+        port=app_config.STREAM_WS_PORT,
+        max_frame_bytes=app_config.MAX_FRAME_BYTES,
+        inference_threads=app_config.STREAM_WS_INFERENCE_THREADS
+    )
+    streaming_server.start_in_thread()
+    print(f"📡 Streaming WebSocket disponible sur ws://localhost:{app_config.STREAM_WS_PORT}")
+    return streaming_server
+
+
 # Routes API
 
 # Routes d'authentification
@@ -796,6 +1433,7 @@ def admin_delete_user(user_id):
         # Supprimer les sessions et frames de l'utilisateur
         cursor.execute('DELETE FROM session_frames WHERE user_id = ?', (user_id,))
         cursor.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,))
+        delete_metrics(cursor, user_id)
         
         # Supprimer l'utilisateur
         cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
@@ -807,6 +1445,120 @@ def admin_delete_user(user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+# Job de re-scoring des frames enregistrées (un seul à la fois)
+rescore_job = None
+
+@app.route('/admin/rescore', methods=['POST'])
+@require_admin
+def start_rescore():
+    """Lancer le re-scoring des frames enregistrées en arrière-plan (admin seulement)"""
+    global rescore_job
+    try:
+        if rescore_job is not None and rescore_job.running:
+            return jsonify({'error': 'Un re-scoring est déjà en cours', 'job': rescore_job.status()}), 409
+        
+        data = request.get_json(silent=True) or {}
+        from rescore import RescoreJob, resolve_model_path
+        try:
+            # Seuls les fichiers du dossier des modèles sont acceptés
+            model_path = resolve_model_path(data.get('model_path', 'mobilenet_drowsiness.pth'),
+                                            app_config.RESCORE_MODEL_DIR)
+        except (ValueError, FileNotFoundError) as e:
+            return jsonify({'error': str(e)}), 400
+        rescore_job = RescoreJob(
+            model_path,
+            db_path='sessions.db',
+            chunk_size=app_config.RESCORE_CHUNK_SIZE,
+            batch_size=app_config.RESCORE_BATCH_SIZE,
+            dry_run=bool(data.get('dry_run', False))
+        )
+        rescore_job.start_in_thread(reset=bool(data.get('reset', False)))
+        return jsonify({'success': True, 'job': rescore_job.status()}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/rescore', methods=['GET'])
+@require_admin
+def rescore_status():
+    """Progression du re-scoring (frames/s, position du checkpoint)"""
+    if rescore_job is None:
+        return jsonify({'success': True, 'job': None})
+    return jsonify({'success': True, 'job': rescore_job.status()})
+
+@app.route('/admin/rescore', methods=['DELETE'])
+@require_admin
+def stop_rescore():
+    """Arrêter le re-scoring après le bloc en cours (reprise possible)"""
+    if rescore_job is None or not rescore_job.running:
+        return jsonify({'error': 'Aucun re-scoring en cours'}), 404
+    rescore_job.stop()
+    return jsonify({'success': True, 'job': rescore_job.status()})
+
+# Profilage à chaud : les méthodes ne sont instrumentées que pendant une capture
+profiler = ProfilerController(report_dir=app_config.PROFILE_REPORT_DIR)
+
+@app.route('/admin/profile', methods=['POST'])
+@require_admin
+def start_profile():
+    """Armer un profileur pour les N prochaines prédictions ou T secondes (admin seulement).
+
+    Body: {"mode": "sampling|cprofile|torch", "requests": N, "seconds": T, "top": 30, "memory": false}
+    Avec le pool de processus, seul le temps vu par le processus de l'API est profilé.
+    Le micro-batching est suspendu pendant la capture : le forward s'exécute
+    alors dans le thread de la requête, là où le profileur l'observe.
+    """
+    data = request.get_json(silent=True) or {}
+    mode = data.get('mode', 'sampling')
+    if mode not in PROFILE_MODES:
+        return jsonify({'error': f"Mode inconnu: {mode}", 'modes': list(PROFILE_MODES)}), 400
+    try:
+        max_calls = min(int(data['requests']), app_config.PROFILE_MAX_REQUESTS) if data.get('requests') else None
+        max_seconds = min(float(data['seconds']), app_config.PROFILE_MAX_SECONDS) if data.get('seconds') else None
+        if max_calls is None and max_seconds is None:
+            max_calls = 100
+        detector = init_detector()
+        capture = profiler.arm(
+            detector,
+            ['predict', 'predict_faces'],
+            mode,
+            max_calls=max_calls,
+            max_seconds=max_seconds,
+            overrides={'batcher': None} if detector.batcher is not None else None,
+            top=int(data.get('top', 30)),
+            sample_interval_ms=float(data.get('interval_ms', 5.0)),
+            memory=bool(data.get('memory', False))
+        )
+    except RuntimeError as e:
+        return jsonify({'error': str(e), 'profile': profiler.status()}), 409
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'capture': capture}), 202
+
+@app.route('/admin/profile', methods=['GET'])
+@require_admin
+def profile_status():
+    """Capture en cours et rapports disponibles"""
+    return jsonify({'success': True, 'profile': profiler.status()})
+
+@app.route('/admin/profile/<int:capture_id>', methods=['GET'])
+@require_admin
+def profile_report(capture_id):
+    """Rapport agrégé d'une capture terminée"""
+    report = profiler.get_report(capture_id)
+    if report is None:
+        return jsonify({'error': 'Rapport introuvable'}), 404
+    return jsonify({'success': True, 'report': report})
+
+@app.route('/admin/profile', methods=['DELETE'])
+@require_admin
+def stop_profile():
+    """Terminer la capture en cours et retourner son rapport"""
+    report = profiler.disarm()
+    if report is None:
+        return jsonify({'error': 'Aucune capture en cours'}), 404
+    return jsonify({'success': True, 'report': report})
+
 # Routes API
 @app.route('/')
 def index():
@@ -873,7 +1625,13 @@ def index():
             <div class="endpoint">
                 <span class="method post">POST</span> <code>/predict</code>
                 <p>Analyser une image pour détecter la somnolence</p>
-                <strong>Body:</strong> <code>{"image": "data:image/jpeg;base64,..."}</code>
+                <strong>Body:</strong> <code>{"image": "data:image/jpeg;base64,...", "client_session_id": ...}</code>
+                <p>Ou corps binaire <code>image/jpeg</code> (<code>?client_session_id=...</code>), ou multipart avec un champ <code>image</code></p>
+            </div>
+            
+            <div class="endpoint">
+                <span class="method get">WS</span> <code>ws://&lt;host&gt;:{{ ws_port }}/?token=...&amp;client_session_id=...</code>
+                <p>Streaming continu : frames JPEG binaires en entrée, prédictions JSON en retour</p>
             </div>
             
             <div class="endpoint">
@@ -920,6 +1678,7 @@ def index():
     </html>
     """, 
     device=str(detector.device),
+    ws_port=app_config.STREAM_WS_PORT,
     model_loaded="Chargé" if os.path.exists('cnn_drowsiness (1).pth') else "Non entraîné",
     landmarks_available="Disponibles" if detector.use_landmarks else "Non disponibles"
     )
@@ -929,23 +1688,39 @@ def index():
 def predict():
     """Endpoint pour prédire l'état de somnolence"""
     start_time = datetime.now()
+    started = time.perf_counter()
     
     try:
-        detector = init_detector()
-        data = request.get_json()
+        try:
+            parse_started = time.perf_counter()
+            image, client_session_id = read_predict_payload()
+            observe_stage('request_parse', parse_started)
+        except (FrameTooLargeError, RequestEntityTooLarge) as e:
+            return jsonify({
+                'error': str(e),
+                'success': False
+            }), 413
         
-        if not data or 'image' not in data:
+        if image is None:
             return jsonify({
                 'error': 'Image manquante dans la requête',
                 'success': False
             }), 400
         
-        # Analyser l'image
-        result = detector.predict(data['image'])
+        detector = init_detector()
         
-        # Calculer la latence
-        end_time = datetime.now()
-        latency_ms = (end_time - start_time).total_seconds() * 1000
+        # Analyser l'image (lissage temporel propre au flux du client)
+        stream_id = resolve_stream_id(client_session_id)
+        multi_face = app_config.MULTI_FACE_MODE or request.args.get('multi_face', '').lower() in ('1', 'true')
+        if multi_face:
+            result = detector.predict_faces(image, stream_id=stream_id)
+        else:
+            result = detector.predict(image, stream_id=stream_id)
+        
+        # Calculer la latence (horloge monotone)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if 'error' in result:
+            ERRORS.inc('predict')
         
         # Ajouter des métadonnées de performance
         result.update({
@@ -953,18 +1728,19 @@ def predict():
             'timestamp': start_time.isoformat(),
             'device': str(detector.device),
             'latency_ms': round(latency_ms, 2),
-            'cache_size': len(prediction_cache),
-            'model_optimized': hasattr(detector.model, '_get_methods')  # TorchScript
+            'cache_size': len(detector.frame_cache) if detector.frame_cache is not None else 0,
+            'model_optimized': detector.backend.name != 'eager',
+            'backend': detector.backend.name
         })
         
-        # Log de performance
-        print(f"⚡ Prédiction en {latency_ms:.1f}ms (cache: {len(prediction_cache)}/{CACHE_SIZE})")
+        # Log de performance (échantillonné, écrit hors du thread de la requête)
+        predict_log.info("⚡ Prédiction en %.1fms (cache: %s)", latency_ms, 'hit' if result.get('cached') else 'miss',
+                         extra={'fields': {'stream': stream_id, 'prediction': result.get('prediction')}})
         
         return jsonify(result)
         
     except Exception as e:
-        end_time = datetime.now()
-        latency_ms = (end_time - start_time).total_seconds() * 1000
+        latency_ms = (time.perf_counter() - started) * 1000
         
         return jsonify({
             'error': f'Erreur lors de la prédiction: {str(e)}',
@@ -1009,7 +1785,8 @@ def save_session():
         # Inclure client_session_id dans la session persistée pour permettre la résolution ultérieure
         if client_session_id is not None:
             session_data['client_session_id'] = client_session_id
-        new_session_id = db.insert_session(session_data)
+        with stage('db_write'):
+            new_session_id = db.insert_session(session_data)
         
         # Si un client_session_id a été fourni, relier les frames orphelines
         if client_session_id is not None:
@@ -1027,7 +1804,7 @@ def save_session():
                 conn.commit()
                 conn.close()
             except Exception as e:
-                print(f"⚠️ Erreur lors du mapping des frames: {e}")
+                db_log.warning("⚠️ Erreur lors du mapping des frames: %s", e)
         
         return jsonify({
             'message': 'Session enregistrée avec succès',
@@ -1134,8 +1911,9 @@ def clear_sessions():
         
         # Supprimer d'abord les frames
         cursor.execute('DELETE FROM session_frames WHERE user_id = ?', (request.current_user['id'],))
-        # Puis les sessions
+        # Puis les sessions et leurs indicateurs temporels
         cursor.execute('DELETE FROM sessions WHERE user_id = ?', (request.current_user['id'],))
+        delete_metrics(cursor, request.current_user['id'])
         
         conn.commit()
         conn.close()
@@ -1212,7 +1990,7 @@ def get_session_frames(session_id):
 
                 conn.close()
             except Exception as e:
-                print(f"⚠️ get_session_frames: mappage automatique échoué: {e}")
+                db_log.warning("⚠️ get_session_frames: mappage automatique échoué: %s", e)
         
         # Convertir en format JSON-friendly
         frames_list = []
@@ -1238,6 +2016,50 @@ def get_session_frames(session_id):
         }), 500
 
 
+@app.route('/session_metrics/<client_session_id>', methods=['GET'])
+@require_auth
+def get_session_metrics(client_session_id):
+    """Série temporelle des indicateurs (PERCLOS, clignements) d'une session client"""
+    try:
+        limit = request.args.get('limit', 720, type=int)
+        stream_id = stream_key(request.current_user['id'], client_session_id)
+        
+        conn = sqlite3.connect('sessions.db')
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT timestamp, perclos, blink_rate, avg_blink_ms, long_closures, mean_score, source, frames
+            FROM session_metrics
+            WHERE stream_id = ?
+            ORDER BY timestamp
+            LIMIT ?
+        ''', (stream_id, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        metrics = [{
+            'timestamp': row[0],
+            'perclos': row[1],
+            'blink_rate_per_min': row[2],
+            'avg_blink_ms': row[3],
+            'long_closures': row[4],
+            'mean_score': row[5],
+            'source': row[6],
+            'frames': row[7]
+        } for row in rows]
+        
+        return jsonify({
+            'client_session_id': client_session_id,
+            'metrics': metrics,
+            'success': True
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Erreur lors de la récupération des indicateurs: {str(e)}',
+            'success': False
+        }), 500
+
+
 @app.route('/save_frame', methods=['POST'])
 @require_auth
 def save_frame():
@@ -1289,18 +2111,19 @@ def save_frame():
                 if row:
                     resolved_session_id = row[0]
             except Exception as e:
-                print(f"⚠️ Résolution session immédiate échouée: {e}")
-
-        db.insert_frame(
-            resolved_session_id,
-            frame_data['frame_data'],
-            frame_data['timestamp'],
-            frame_data['prediction'],
-            frame_data['confidence'],
-            frame_data['frame_number'],
-            client_session_id=frame_data['client_session_id'],
-            user_id=frame_data['user_id']
-        )
+                db_log.warning("⚠️ Résolution session immédiate échouée: %s", e)
+
+        with stage('db_write'):
+            db.insert_frame(
+                resolved_session_id,
+                frame_data['frame_data'],
+                frame_data['timestamp'],
+                frame_data['prediction'],
+                frame_data['confidence'],
+                frame_data['frame_number'],
+                client_session_id=frame_data['client_session_id'],
+                user_id=frame_data['user_id']
+            )
         
         return jsonify({
             'message': 'Frame enregistrée avec succès',
@@ -1320,38 +2143,63 @@ def performance_metrics():
     try:
         detector = init_detector()
         
-        # Statistiques du cache
-        cache_stats = {
-            'size': len(prediction_cache),
-            'max_size': CACHE_SIZE,
-            'hit_rate': 0.0,  # À calculer si on garde des stats
-            'memory_usage_mb': len(prediction_cache) * 0.1  # Estimation
-        }
+        # Statistiques du cache (hits, misses, évictions)
+        cache_stats = detector.frame_cache.stats() if detector.frame_cache is not None else {'enabled': False}
         
         # Informations sur le modèle
         model_info = {
             'device': str(detector.device),
-            'torchscript_optimized': hasattr(detector.model, '_get_methods'),
+            'torchscript_optimized': detector.backend.name == 'torchscript',
+            'backend': detector.backend.name,
+            'backend_latency_ms': round(detector.backend.latency_ms or 0.0, 3),
+            'backend_benchmark': detector.backend_benchmark,
+            'precision': detector.precision,
             'mixed_precision': hasattr(detector, 'scaler'),
             'cuda_available': torch.cuda.is_available(),
-            'model_parameters': sum(p.numel() for p in detector.model.parameters()) if hasattr(detector.model, 'parameters') else 0
+            'model_parameters': detector.model_stats['parameters'],
+            'model_size_mb': detector.model_stats['size_mb']
         }
         
-        # Statistiques système
-        try:
-            import psutil
-            system_stats = {
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory_percent': psutil.virtual_memory().percent,
-                'python_version': f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
-            }
-        except ImportError:
-            # Fallback si psutil n'est pas disponible
+        # Statistiques des détecteurs de visages (chargement vs détection)
+        face_detection_stats = detector.face_detectors.stats()
+        
+        # Statistiques du suivi du visage (ROI hit/miss, temps économisé)
+        face_tracking_stats = detector.face_tracker.stats() if detector.face_tracker is not None else {'enabled': False}
+        
+        # Statistiques des flux (lissage temporel)
+        stream_stats = detector.streams.stats()
+        
+        # Statistiques du micro-batching
+        batching_stats = detector.batcher.stats() if detector.batcher is not None else {'enabled': False}
+        
+        # Statistiques de la cascade EAR -> CNN (sorties anticipées)
+        cascade_stats = detector.ear_cascade.stats() if detector.ear_cascade is not None else {'enabled': False}
+        
+        # Statistiques de la détection de changement (frames non rescorées, CPU économisé)
+        change_stats = detector.change_detector.stats() if detector.change_detector is not None else {'enabled': False}
+        
+        # Persistance des indicateurs temporels
+        temporal_stats = detector.temporal_series.stats() if detector.temporal_series is not None else {'enabled': False}
+        
+        # Statistiques du pool de processus d'inférence
+        worker_stats = detector.worker_pool.stats() if detector.worker_pool is not None else {'enabled': False}
+        
+        # Statistiques du streaming WebSocket
+        streaming_stats = streaming_server.stats() if streaming_server is not None else {'enabled': False}
+        
+        # Statistiques système : dernier relevé de l'échantillonneur (pas de mesure bloquante ici)
+        python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+        if system_sampler is not None:
+            system_stats = {'cpu_percent': 0.0, 'memory_percent': 0.0, **system_sampler.latest(),
+                            'python_version': python_version, 'sampler': system_sampler.stats()}
+            if request.args.get('series', '1') != '0':
+                system_stats['series'] = system_sampler.series(points=request.args.get('points', 60, type=int))
+        else:
             system_stats = {
                 'cpu_percent': 0.0,
                 'memory_percent': 0.0,
-                'python_version': f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-                'note': 'psutil non disponible - métriques système simulées'
+                'python_version': python_version,
+                'note': 'échantillonneur système inactif'
             }
         
         return jsonify({
@@ -1359,6 +2207,20 @@ def performance_metrics():
             'timestamp': datetime.now().isoformat(),
             'cache': cache_stats,
             'model': model_info,
+            'batching': batching_stats,
+            'workers': worker_stats,
+            'streams': stream_stats,
+            'face_detection': face_detection_stats,
+            'face_tracking': face_tracking_stats,
+            'change_detection': change_stats,
+            'cascade': cascade_stats,
+            'temporal_series': temporal_stats,
+            'streaming': streaming_stats,
+            'logging': log_sampling.stats(),
+            'latency': {
+                'stages': STAGE_SECONDS.summary(),
+                'endpoints': REQUEST_SECONDS.summary()
+            },
             'system': system_stats
         })
         
@@ -1369,6 +2231,12 @@ def performance_metrics():
         }), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Métriques au format texte Prometheus (histogrammes par étape, compteurs, files)"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Vérifier l'état de l'API"""
@@ -1381,6 +2249,7 @@ def health_check():
             'model_loaded': os.path.exists('cnn_drowsiness (1).pth'),
             'landmarks_available': detector.use_landmarks,
             'dlib_available': DLIB_AVAILABLE,
+            'ready': startup_state['ready'],
             'version': '1.0.0'
         })
     except Exception as e:
@@ -1391,6 +2260,26 @@ def health_check():
         }), 500
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Prête à servir du trafic : modèle chargé et échauffé"""
+    status = 200 if startup_state['ready'] else 503
+    return jsonify({
+        'ready': startup_state['ready'],
+        'startup': startup_state
+    }), status
+
+
+@app.route('/startup_report', methods=['GET'])
+def startup_report():
+    """Profil du démarrage : modules les plus coûteux à importer, imports différés, chargement du modèle"""
+    top = request.args.get('top', 25, type=int)
+    return jsonify({
+        'imports': import_profiler.report(top=top),
+        'startup': startup_state
+    })
+
+
 @app.route('/model_info', methods=['GET'])
 def model_info():
     """Informations sur le modèle"""
@@ -1402,18 +2291,18 @@ def model_info():
             'input_size': '128x128x3',
             'classes': detector.classes,
             'device': str(detector.device),
-            'buffer_size': detector.prediction_buffer.maxlen,
-            'current_buffer': len(detector.prediction_buffer)
+            'precision': detector.precision,
+            'backend': detector.backend.name,
+            'backend_latency_ms': round(detector.backend.latency_ms or 0.0, 3),
+            'backend_benchmark': detector.backend_benchmark,
+            'buffer_size': detector.streams.buffer_size,
+            'active_streams': len(detector.streams),
+            # Calculés une fois au chargement (compute_model_stats), sur les poids servis
+            'total_parameters': detector.model_stats['parameters'],
+            'trainable_parameters': detector.model_stats['trainable_parameters'],
+            'model_size_mb': detector.model_stats['size_mb']
         }
         
-        if hasattr(detector.model, 'parameters'):
-            total_params = sum(p.numel() for p in detector.model.parameters())
-            trainable_params = sum(p.numel() for p in detector.model.parameters() if p.requires_grad)
-            model_stats.update({
-                'total_parameters': total_params,
-                'trainable_parameters': trainable_params
-            })
-        
         return jsonify({
             'success': True,
             'model_info': model_stats
@@ -1440,53 +2329,28 @@ def face_detection_test():
             }), 400
         
         # Test de détection faciale
-        image_data = data['image']
-        if 'base64,' in image_data:
-            image_data = image_data.split(',')[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        image_pil = Image.open(io.BytesIO(image_bytes))
+        img_array = decode_image(data['image'])
         
-        # Test MTCNN
-        mtcnn_result = None
-        if detector.use_face_detection and detector.detector_face:
+        def run_detector(name):
             try:
-                face = detector.detector_face(image_pil)
-                mtcnn_result = {
-                    'detected': face is not None,
-                    'shape': str(face.shape) if face is not None else None
+                faces = detector.face_detectors.detect(name, img_array)
+                return {
+                    'detected': len(faces) > 0,
+                    'count': len(faces),
+                    'faces': [list(face) for face in faces]
                 }
             except Exception as e:
-                mtcnn_result = {'error': str(e)}
+                return {'error': str(e)}
+        
+        # Test MTCNN
+        mtcnn_result = run_detector('mtcnn') if 'mtcnn' in detector.face_detectors else None
         
         # Test OpenCV fallback
-        opencv_result = None
-        try:
-            import cv2
-            import numpy as np
-            
-            img_array = np.array(image_pil)
-            face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            
-            faces = face_cascade.detectMultiScale(
-                gray, 
-                scaleFactor=1.1, 
-                minNeighbors=3, 
-                minSize=(30, 30)
-            )
-            
-            opencv_result = {
-                'detected': len(faces) > 0,
-                'count': len(faces),
-                'faces': faces.tolist() if len(faces) > 0 else []
-            }
-        except Exception as e:
-            opencv_result = {'error': str(e)}
+        opencv_result = run_detector('haar') if 'haar' in detector.face_detectors else None
         
         return jsonify({
             'success': True,
-            'image_size': image_pil.size,
+            'image_size': [img_array.shape[1], img_array.shape[0]],
             'mtcnn': mtcnn_result,
             'opencv': opencv_result,
             'face_detection_enabled': detector.use_face_detection
@@ -1515,11 +2379,20 @@ def not_found(error):
             'GET /get_session_frames/<id>',
             'POST /save_frame',
             'GET /health',
+            'GET /ready',
             'GET /model_info'
         ]
     }), 404
 
 
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({
+        'error': f"Requête trop volumineuse (max {app_config.MAX_REQUEST_BYTES} octets)",
+        'success': False
+    }), 413
+
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({
@@ -1543,10 +2416,14 @@ if __name__ == '__main__':
     print(f"💡 PyTorch disponible: {torch.__version__}")
     print(f"🔍 CUDA disponible: {torch.cuda.is_available()}")
     
-    # Initialiser le détecteur
-    detector = init_detector()
+    # Initialiser et échauffer le détecteur avant de servir du trafic
+    detector = startup()
     print(f"💡 Device utilisé: {detector.device}")
     
+    # Streaming WebSocket (authentification unique, frames binaires)
+    if app_config.STREAM_WS_ENABLED:
+        start_streaming_server(detector)
+    
     app.run(
         host='0.0.0.0',
         port=port,
@@ -1,6 +1,7 @@
 import hashlib
 import secrets
 import sqlite3
+import threading
 from datetime import datetime
 from functools import wraps
 from flask import request, jsonify
@@ -80,8 +81,28 @@ class AuthDatabase:
             
             conn.commit()
 
-# Instance de la base de données
-auth_db = AuthDatabase(DATABASE_PATH)
+# Instance de la base de données, créée au premier accès (pas de SQLite ni de DDL à l'import)
+_auth_db = None
+_auth_db_lock = threading.Lock()
+
+def get_auth_db():
+    global _auth_db
+    if _auth_db is None:
+        with _auth_db_lock:
+            if _auth_db is None:
+                _auth_db = AuthDatabase(DATABASE_PATH)
+    return _auth_db
+
+def __getattr__(name):
+    # Compatibilité : `auth.auth_db` reste accessible
+    if name == 'auth_db':
+        return get_auth_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def connect():
+    """Connexion à la base d'authentification (schéma créé au premier appel)"""
+    get_auth_db()
+    return sqlite3.connect(DATABASE_PATH)
 
 # Fonctions d'authentification
 def hash_password(password):
@@ -99,7 +120,7 @@ def verify_token(token):
     # Pour la démo, on accepte tous les tokens valides
     if len(token) >= 32:
         # Récupérer l'utilisateur depuis la base
-        with sqlite3.connect(DATABASE_PATH) as conn:
+        with connect() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT id, username, email, role FROM users WHERE is_active = 1 LIMIT 1')
             user = cursor.fetchone()
@@ -140,7 +161,7 @@ def require_admin(f):
 
 # Fonctions de base de données
 def get_user_sessions(user_id, limit=20):
-    with sqlite3.connect(DATABASE_PATH) as conn:
+    with connect() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT id, client_session_id, start_time, end_time, duration,
@@ -168,7 +189,7 @@ def get_user_sessions(user_id, limit=20):
         return sessions
 
 def get_all_sessions(limit=20):
-    with sqlite3.connect(DATABASE_PATH) as conn:
+    with connect() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT s.id, s.client_session_id, s.start_time, s.end_time, s.duration,
@@ -198,14 +219,14 @@ def get_all_sessions(limit=20):
         return sessions
 
 def can_user_access_session(user_id, session_id):
-    with sqlite3.connect(DATABASE_PATH) as conn:
+    with connect() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT user_id FROM sessions WHERE id = ?', (session_id,))
         result = cursor.fetchone()
         return result and result[0] == user_id
 
 def get_session_id_by_client_id(client_session_id, user_id):
-    with sqlite3.connect(DATABASE_PATH) as conn:
+    with connect() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM sessions WHERE client_session_id = ? AND user_id = ?', 
                       (client_session_id, user_id))
@@ -0,0 +1,130 @@
+"""Planificateur de micro-batching pour l'inférence MobileNet"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import torch
+
+
+class _PendingInference:
+    """Requête d'inférence en attente dans la file du planificateur"""
+    __slots__ = ('tensor', 'future', 'enqueued_at')
+
+    def __init__(self, tensor):
+        self.tensor = tensor
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchInferenceScheduler:
+    """Regroupe les requêtes concurrentes en un seul forward batché.
+
+    Les threads appelants déposent leur tenseur (1x3x224x224) et attendent leur
+    score ; un thread dédié collecte les requêtes pendant au plus
+    ``max_wait_ms`` (ou jusqu'à ``max_batch_size``) puis exécute un forward unique.
+    """
+
+    def __init__(self, model_fn, max_batch_size=32, max_wait_ms=5.0):
+        self.model_fn = model_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = True
+
+        # Statistiques
+        self._batches = 0
+        self._items = 0
+        self._max_batch_seen = 0
+        self._total_wait = 0.0
+        self._total_forward = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='batch-inference', daemon=True)
+        self._thread.start()
+
+    def submit(self, tensor):
+        """Déposer un tenseur et récupérer un Future sur sa sortie (1xN)"""
+        pending = _PendingInference(tensor)
+        with self._cond:
+            if not self._running:
+                raise RuntimeError('Planificateur de batching arrêté')
+            self._queue.append(pending)
+            self._cond.notify()
+        return pending.future
+
+    def infer(self, tensor, timeout=None):
+        """Inférence bloquante : retourne la sortie correspondant à ce tenseur"""
+        return self.submit(tensor).result(timeout=timeout)
+
+    def queue_depth(self):
+        return len(self._queue)
+
+    def _collect_batch(self):
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            if not self._running and not self._queue:
+                return None
+
+            # Attendre la fin de la fenêtre ouverte par la plus ancienne requête
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while self._running and len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                inputs = batch[0].tensor if len(batch) == 1 else torch.cat([p.tensor for p in batch], dim=0)
+                outputs = self.model_fn(inputs)
+            except Exception as e:
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+
+            for i, pending in enumerate(batch):
+                pending.future.set_result(outputs[i:i + 1])
+
+            self._batches += 1
+            self._items += len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            self._total_wait += sum(started - p.enqueued_at for p in batch)
+            self._total_forward += finished - started
+
+    def stats(self):
+        """Statistiques de batching pour /performance"""
+        batches = self._batches or 1
+        items = self._items or 1
+        return {
+            'enabled': True,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000, 2),
+            'batches': self._batches,
+            'frames': self._items,
+            'avg_batch_size': round(self._items / batches, 2),
+            'max_batch_seen': self._max_batch_seen,
+            'avg_queue_wait_ms': round(self._total_wait / items * 1000, 3),
+            'avg_forward_ms': round(self._total_forward / batches * 1000, 3),
+            'queue_depth': self.queue_depth()
+        }
+
+    def close(self):
+        """Arrêter le thread après avoir vidé la file"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
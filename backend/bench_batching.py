@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Benchmark débit / latence du micro-batching selon la fenêtre de collecte"""
+
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+import torch
+
+from app1 import MobileNetDrowsiness
+from batching import BatchInferenceScheduler
+
+
+def build_model():
+    """Construire le modèle en mode inférence (poids aléatoires suffisants pour le timing)"""
+    model = MobileNetDrowsiness()
+    model.eval()
+    return model
+
+
+def run_scenario(model, concurrency, frames_per_client, max_batch_size, max_wait_ms):
+    """Simuler `concurrency` conducteurs envoyant chacun `frames_per_client` frames"""
+
+    def model_fn(batch):
+        with torch.no_grad():
+            return model(batch)
+
+    scheduler = None
+    if max_wait_ms is not None:
+        scheduler = BatchInferenceScheduler(model_fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        tensor = torch.randn(1, 3, 224, 224)
+        local = []
+        for _ in range(frames_per_client):
+            start = time.perf_counter()
+            if scheduler is not None:
+                scheduler.infer(tensor)
+            else:
+                model_fn(tensor)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    stats = scheduler.stats() if scheduler is not None else {}
+    if scheduler is not None:
+        scheduler.close()
+
+    return {
+        'mode': 'batched' if scheduler is not None else 'serial',
+        'concurrency': concurrency,
+        'max_batch_size': max_batch_size if scheduler is not None else 1,
+        'max_wait_ms': max_wait_ms,
+        'frames': len(latencies),
+        'throughput_fps': round(len(latencies) / elapsed, 2),
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'latency_p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'avg_batch_size': stats.get('avg_batch_size', 1.0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--frames', type=int, default=20, help='Frames par client simulé')
+    parser.add_argument('--windows', type=float, nargs='+', default=[1, 2, 5, 10], help='Fenêtres testées (ms)')
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads')
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    model = build_model()
+    # Échauffement
+    with torch.no_grad():
+        model(torch.randn(4, 3, 224, 224))
+
+    results = []
+    for concurrency in args.concurrency:
+        results.append(run_scenario(model, concurrency, args.frames, 1, None))
+        for window in args.windows:
+            results.append(run_scenario(model, concurrency, args.frames, args.max_batch, window))
+
+    print(f"{'mode':<8} {'clients':>7} {'fenêtre':>8} {'batch moy':>9} {'frames/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        window = '-' if r['max_wait_ms'] is None else f"{r['max_wait_ms']:g}"
+        print(f"{r['mode']:<8} {r['concurrency']:>7} {window:>8} {r['avg_batch_size']:>9} "
+              f"{r['throughput_fps']:>9} {r['latency_p50_ms']:>8} {r['latency_p95_ms']:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'torch_threads': torch.get_num_threads(), 'results': results}, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Cascade EAR -> CNN vs CNN seul sur les sessions enregistrées : latence et taux d'accord"""
+
+import argparse
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+import app1
+from app1 import DrowsinessDetector
+
+
+def load_frames(db_path, limit):
+    """Frames enregistrées (data URL base64), dans l'ordre des sessions"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT frame_data FROM session_frames
+        WHERE frame_data IS NOT NULL
+        ORDER BY session_id, frame_number, id
+        LIMIT ?
+    ''', (limit,))
+    rows = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def score_all(detector, frames):
+    """(probabilités, latences ms) de detector.score_array sur chaque frame décodée"""
+    probabilities, latencies = [], []
+    for img_array in frames:
+        started = time.perf_counter()
+        probabilities.append(detector.score_array(img_array)[0])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.array(probabilities), np.array(latencies)
+
+
+def summary(latencies):
+    return {
+        'mean_ms': round(float(np.mean(latencies)), 3),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='mobilenet_drowsiness.pth')
+    parser.add_argument('--db', default='sessions.db')
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    # Mesure frame par frame : ni micro-batching ni cache
+    app1.app_config.BATCH_INFERENCE_ENABLED = False
+    detector = DrowsinessDetector(model_path=args.model)
+    cascade = detector.ear_cascade
+    if cascade is None:
+        print("❌ Cascade EAR indisponible (dlib ou shape_predictor_68_face_landmarks.dat manquant)")
+        return
+
+    frames = [detector.decode_frame(frame) for frame in load_frames(args.db, args.frames)]
+    if not frames:
+        print(f"❌ Aucune frame dans {args.db}")
+        return
+    print(f"📸 {len(frames)} frames enregistrées")
+
+    # Échauffement des deux chemins
+    for img_array in frames[:5]:
+        detector.score_array(img_array)
+
+    detector.ear_cascade = None
+    cnn_probs, cnn_latencies = score_all(detector, frames)
+
+    detector.ear_cascade = cascade
+    before = cascade.stats()
+    cascade_probs, cascade_latencies = score_all(detector, frames)
+    after = cascade.stats()
+
+    early = (after['early_open'] + after['early_closed']) - (before['early_open'] + before['early_closed'])
+    agreement = float(np.mean((cascade_probs > 0.5) == (cnn_probs > 0.5)))
+
+    result = {
+        'frames': len(frames),
+        'early_exit_rate': round(early / len(frames), 4),
+        'agreement': round(agreement, 4),
+        'cnn_only': summary(cnn_latencies),
+        'cascade': summary(cascade_latencies),
+        'speedup': round(float(np.mean(cnn_latencies) / np.mean(cascade_latencies)), 2),
+        'thresholds': {'open': cascade.open_threshold, 'closed': cascade.closed_threshold}
+    }
+
+    print(f"⚡ Sorties anticipées: {result['early_exit_rate']:.1%}, accord avec le CNN seul: {result['agreement']:.1%}")
+    print(f"{'chemin':<10} {'moy ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name in ('cnn_only', 'cascade'):
+        r = result[name]
+        print(f"{name:<10} {r['mean_ms']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8}")
+    print(f"🚀 Accélération: x{result['speedup']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
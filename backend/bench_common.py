@@ -0,0 +1,15 @@
+"""Utilitaires partagés par les scripts de benchmark (frames synthétiques)"""
+
+import base64
+
+from preprocessing import synthetic_jpeg
+
+
+def make_frame(width, height, seed=0, quality=80):
+    """Frame JPEG synthétique (octets) avec un motif de visage grossier"""
+    return synthetic_jpeg(width, height, seed=seed, quality=quality)
+
+
+def to_data_url(jpeg_bytes):
+    """Octets JPEG -> data URL base64 (format envoyé par le frontend)"""
+    return 'data:image/jpeg;base64,' + base64.b64encode(jpeg_bytes).decode()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark latence / rappel de la détection faciale selon la résolution de détection"""
+
+import argparse
+import base64
+import json
+import sqlite3
+import time
+
+import cv2
+import numpy as np
+
+from face_detectors import HaarFaceDetector, downscale_for_detection, largest_face, rescale_boxes
+
+
+def load_session_frames(db_path, limit):
+    """Charger les frames enregistrées (session_frames) en tableaux RGB"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT frame_data FROM session_frames WHERE frame_data IS NOT NULL ORDER BY id LIMIT ?', (limit,))
+    rows = cursor.fetchall()
+    conn.close()
+
+    frames = []
+    for (frame_data,) in rows:
+        if 'base64,' in frame_data:
+            frame_data = frame_data.split(',')[1]
+        buffer = np.frombuffer(base64.b64decode(frame_data), dtype=np.uint8)
+        image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        if image is not None:
+            frames.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return frames
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def detect(detector, image, width):
+    """Détection sur l'image réduite ; la latence inclut la réduction (coût réel du chemin)"""
+    started = time.perf_counter()
+    small, scale = downscale_for_detection(image, width)
+    faces = detector.detect(small)
+    elapsed = (time.perf_counter() - started) * 1000
+    return rescale_boxes(faces, scale), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', default='sessions.db')
+    parser.add_argument('--limit', type=int, default=500, help='Nombre maximal de frames')
+    parser.add_argument('--widths', type=int, nargs='+', default=[640, 480, 320, 240, 160])
+    parser.add_argument('--iou', type=float, default=0.5, help='IoU minimal pour compter un visage retrouvé')
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    frames = load_session_frames(args.db, args.limit)
+    if not frames:
+        print(f"❌ Aucune frame dans {args.db}")
+        return
+    print(f"📸 {len(frames)} frames chargées depuis {args.db}")
+
+    detector = HaarFaceDetector()
+
+    # Référence : détection à pleine résolution
+    reference = []
+    full_times = []
+    for image in frames:
+        faces, elapsed = detect(detector, image, 0)
+        reference.append(largest_face(faces) if faces else None)
+        full_times.append(elapsed)
+    positives = sum(1 for box in reference if box is not None)
+
+    results = [{
+        'width': 'full',
+        'latency_avg_ms': round(float(np.mean(full_times)), 3),
+        'latency_p95_ms': round(float(np.percentile(full_times, 95)), 3),
+        'detection_rate': round(positives / len(frames), 4),
+        'recall_vs_full': 1.0
+    }]
+
+    for width in args.widths:
+        times = []
+        detected = 0
+        matched = 0
+        for image, ref_box in zip(frames, reference):
+            faces, elapsed = detect(detector, image, width)
+            times.append(elapsed)
+            if faces:
+                detected += 1
+                if ref_box is not None and iou(largest_face(faces), ref_box) >= args.iou:
+                    matched += 1
+        results.append({
+            'width': width,
+            'latency_avg_ms': round(float(np.mean(times)), 3),
+            'latency_p95_ms': round(float(np.percentile(times, 95)), 3),
+            'detection_rate': round(detected / len(frames), 4),
+            'recall_vs_full': round(matched / positives, 4) if positives else 0.0
+        })
+
+    print(f"{'largeur':>8} {'moy ms':>8} {'p95 ms':>8} {'détection':>10} {'rappel':>8}")
+    for r in results:
+        print(f"{r['width']:>8} {r['latency_avg_ms']:>8} {r['latency_p95_ms']:>8} "
+              f"{r['detection_rate']:>10} {r['recall_vs_full']:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'frames': len(frames), 'reference_positives': positives, 'results': results}, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
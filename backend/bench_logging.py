@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Coût des logs sur /predict : latence avec logs coupés, synchrones, en file, en file + échantillonnés.
+
+Requêtes en process via le client de test Flask, depuis plusieurs threads
+comme sous le serveur threadé. Cache et détection de changement désactivés
+pour que chaque frame passe par tout le pipeline (et donc par tous les logs).
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import app1
+from bench_common import make_frame, to_data_url
+from logging_setup import setup_logging, stop_logging
+
+CONFIGS = [
+    # nom, niveau, file, échantillonnage par sous-système
+    ('off', 'CRITICAL', False, {}),
+    ('sync', 'DEBUG', False, {}),
+    ('queued', 'DEBUG', True, {}),
+    ('queued_sampled', 'DEBUG', True, {'predict': 0.1, 'face': 0.1, 'cache': 0.1})
+]
+
+
+def run_clients(frames, requests_per_client, clients):
+    """Latences (ms) de /predict vues par `clients` threads"""
+    def client(index):
+        test_client = app1.app.test_client()
+        latencies = []
+        for i in range(requests_per_client):
+            payload = {'image': frames[(index + i) % len(frames)], 'client_session_id': f'bench{index}'}
+            started = time.perf_counter()
+            response = test_client.post('/predict', json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"/predict: {response.status_code} {response.get_json()}")
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        return [lat for result in pool.map(client, range(clients)) for lat in result]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200, help='Requêtes par client')
+    parser.add_argument('--clients', type=int, default=4, help='Threads clients simultanés')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    detector = app1.startup()
+    detector.frame_cache = None
+    detector.change_detector = None
+    frames = [to_data_url(make_frame(args.width, args.height, seed=i)) for i in range(16)]
+
+    log_file = os.path.join(tempfile.mkdtemp(), 'bench.log')
+    results = []
+    try:
+        for name, level, queued, rates in CONFIGS:
+            sampling = setup_logging(level=level, log_file=log_file, sample_rates=rates, queued=queued)
+            run_clients(frames, 10, args.clients)  # échauffement
+            latencies = np.array(run_clients(frames, args.requests, args.clients))
+            stop_logging()  # vider la file avant de mesurer la configuration suivante
+            result = {
+                'config': name,
+                'level': level,
+                'queued': queued,
+                'sample_rates': rates,
+                'mean_ms': round(float(latencies.mean()), 3),
+                'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+                'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+                'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+                'sampled_out': sampling.stats()['sampled_out']
+            }
+            results.append(result)
+            print(f"📝 {name}: moyenne {result['mean_ms']}ms, p50 {result['p50_ms']}ms, "
+                  f"p95 {result['p95_ms']}ms, p99 {result['p99_ms']}ms")
+    finally:
+        app1.log_sampling = app1.configure_logging()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'clients': args.clients, 'frame_size': f"{args.width}x{args.height}", 'results': results}, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Microbenchmark : prétraitement historique (PIL + torchvision) vs chemin fusionné"""
+
+import argparse
+import base64
+import io
+import json
+import time
+
+import numpy as np
+import torchvision.transforms as transforms
+from PIL import Image
+
+from bench_common import make_frame, to_data_url
+from face_detectors import HaarFaceDetector, largest_face
+from preprocessing import TensorPreprocessor, decode_image
+
+
+LEGACY_TRANSFORM = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[0.485, 0.456, 0.406],
+                         std=[0.229, 0.224, 0.225])
+])
+
+
+def legacy_path(detector, image):
+    """Reproduction du chemin d'origine : base64 -> PIL -> numpy -> gris -> crop PIL -> torchvision"""
+    image_pil = Image.open(io.BytesIO(base64.b64decode(image.split(',')[1]))).convert('RGB')
+    faces = detector.detect(np.array(image_pil))
+    if faces:
+        x, y, w, h = largest_face(faces)
+        image_pil = image_pil.crop((x, y, x + w, y + h))
+    return LEGACY_TRANSFORM(image_pil).unsqueeze(0)
+
+
+def fused_path(detector, preprocessor, image, max_width):
+    img_array = decode_image(image, max_width)
+    faces = detector.detect(img_array)
+    if faces:
+        x, y, w, h = largest_face(faces)
+        img_array = img_array[y:y + h, x:x + w]
+    return preprocessor.to_tensor(img_array)
+
+
+def time_runs(fn, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(float(np.mean(times)), 3), round(float(np.percentile(times, 95)), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resolutions', nargs='+', default=['640x480', '1280x720', '1920x1080'])
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--max-width', type=int, default=640, help='DECODE_MAX_WIDTH du chemin fusionné')
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    detector = HaarFaceDetector()
+    preprocessor = TensorPreprocessor(size=224)
+
+    results = []
+    for resolution in args.resolutions:
+        width, height = (int(v) for v in resolution.split('x'))
+        image = to_data_url(make_frame(width, height))
+
+        legacy = legacy_path(detector, image)
+        fused = fused_path(detector, preprocessor, image, 0).clone()
+        max_abs_diff = float((legacy - fused).abs().max())
+
+        legacy_avg, legacy_p95 = time_runs(lambda: legacy_path(detector, image), args.runs)
+        fused_avg, fused_p95 = time_runs(lambda: fused_path(detector, preprocessor, image, args.max_width), args.runs)
+        results.append({
+            'resolution': resolution,
+            'legacy_avg_ms': legacy_avg,
+            'legacy_p95_ms': legacy_p95,
+            'fused_avg_ms': fused_avg,
+            'fused_p95_ms': fused_p95,
+            'speedup': round(legacy_avg / fused_avg, 2) if fused_avg else 0.0,
+            'max_abs_diff_full_decode': round(max_abs_diff, 4)
+        })
+
+    print(f"{'résolution':>11} {'historique ms':>14} {'fusionné ms':>12} {'gain':>6} {'écart max':>10}")
+    for r in results:
+        print(f"{r['resolution']:>11} {r['legacy_avg_ms']:>14} {r['fused_avg_ms']:>12} "
+              f"{r['speedup']:>6} {r['max_abs_diff_full_decode']:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'runs': args.runs, 'results': results}, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
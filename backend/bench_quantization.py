@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Rapport fp32 vs INT8 : accord des prédictions, latence et mémoire"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+
+from app1 import load_mobilenet
+from face_detectors import HaarFaceDetector, largest_face
+from preprocessing import TensorPreprocessor, decode_image
+from quantization import load_calibration_tensors, model_size_bytes, quantize_dynamic, quantize_static
+
+
+def make_to_tensor():
+    """Même prétraitement que l'inférence : décodage, visage le plus grand, normalisation"""
+    detector = HaarFaceDetector()
+    preprocessor = TensorPreprocessor(size=224)
+
+    def to_tensor(frame_data):
+        img_array = decode_image(frame_data, 640)
+        faces = detector.detect(img_array)
+        if faces:
+            x, y, w, h = largest_face(faces)
+            img_array = img_array[y:y + h, x:x + w]
+        return preprocessor.to_tensor(img_array).clone()
+    return to_tensor
+
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return float('nan')
+
+
+def probabilities(model, tensors):
+    with torch.no_grad():
+        return np.array([float(model(t).item()) for t in tensors])  # sortie de nn.Sigmoid
+
+
+def latency_ms(model, batch_size, runs):
+    inputs = torch.randn(batch_size, 3, 224, 224)
+    with torch.no_grad():
+        for _ in range(3):
+            model(inputs)
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            model(inputs)
+            times.append((time.perf_counter() - started) * 1000)
+    return round(float(np.median(times)), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='mobilenet_drowsiness.pth')
+    parser.add_argument('--db', default='sessions.db')
+    parser.add_argument('--calibration', type=int, default=200, help='Frames de calibration')
+    parser.add_argument('--evaluation', type=int, default=500, help="Frames d'évaluation (après la calibration)")
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads')
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    to_tensor = make_to_tensor()
+    calibration = load_calibration_tensors(args.db, to_tensor, limit=args.calibration)
+    evaluation = load_calibration_tensors(args.db, to_tensor, limit=args.evaluation, offset=args.calibration)
+    if not evaluation:
+        # Base trop petite pour séparer calibration et évaluation
+        print("⚠️ Pas de frames d'évaluation distinctes, évaluation sur les frames de calibration")
+        evaluation = calibration
+    if not evaluation:
+        print(f"❌ Aucune frame exploitable dans {args.db}")
+        return
+    print(f"📸 {len(calibration)} frames de calibration, {len(evaluation)} frames d'évaluation")
+
+    rss_before = rss_mb()
+    fp32 = load_mobilenet(args.model, torch.device('cpu'))
+    variants = {'fp32': (fp32, rss_mb() - rss_before)}
+
+    for name, build in (('int8_static', lambda: quantize_static(fp32, calibration)),
+                        ('int8_dynamic', lambda: quantize_dynamic(fp32))):
+        rss_before = rss_mb()
+        try:
+            variants[name] = (build(), rss_mb() - rss_before)
+        except Exception as e:
+            print(f"⚠️ {name} indisponible: {e}")
+
+    reference = probabilities(fp32, evaluation)
+    results = []
+    for name, (model, rss_delta) in variants.items():
+        probs = probabilities(model, evaluation)
+        results.append({
+            'precision': name,
+            'agreement': round(float(np.mean((probs > 0.5) == (reference > 0.5))), 4),
+            'mean_abs_prob_diff': round(float(np.mean(np.abs(probs - reference))), 5),
+            'latency_b1_ms': latency_ms(model, 1, args.runs),
+            'latency_b8_ms': latency_ms(model, 8, args.runs),
+            'size_mb': round(model_size_bytes(model) / (1024 * 1024), 2),
+            'rss_delta_mb': round(rss_delta, 1)
+        })
+
+    print(f"{'précision':<13} {'accord':>7} {'|Δp| moy':>9} {'b1 ms':>8} {'b8 ms':>8} {'taille Mo':>10} {'ΔRSS Mo':>8}")
+    for r in results:
+        print(f"{r['precision']:<13} {r['agreement']:>7} {r['mean_abs_prob_diff']:>9} {r['latency_b1_ms']:>8} "
+              f"{r['latency_b8_ms']:>8} {r['size_mb']:>10} {r['rss_delta_mb']:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'engine': torch.backends.quantized.engine,
+                'torch_threads': torch.get_num_threads(),
+                'calibration_frames': len(calibration),
+                'evaluation_frames': len(evaluation),
+                'results': results
+            }, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Résumé des mesures de benchmark et comparaison à une référence (seuils de régression)"""
+
+import math
+
+# Sens d'amélioration de chaque statistique : latences à la baisse, débits à la hausse
+LOWER_IS_BETTER = ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+HIGHER_IS_BETTER = ('ops_per_s',)
+
+
+def percentile(sorted_values, q):
+    """Percentile (0-100) par interpolation linéaire sur des valeurs triées"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies_ms, wall_seconds=None):
+    """Statistiques d'une série de latences (ms) ; débit sur la durée murale si fournie (mesures concurrentes)"""
+    values = sorted(latencies_ms)
+    count = len(values)
+    total_s = wall_seconds if wall_seconds is not None else sum(values) / 1000
+    return {
+        'count': count,
+        'mean_ms': round(sum(values) / count, 3) if count else 0.0,
+        'p50_ms': round(percentile(values, 50), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+        'ops_per_s': round(count / total_s, 2) if total_s else 0.0
+    }
+
+
+def parse_thresholds(items):
+    """['forward.p95_ms=0.2', 'p99_ms=0.3'] -> {'forward.p95_ms': 0.2, 'p99_ms': 0.3}"""
+    thresholds = {}
+    for item in items or ():
+        key, _, value = item.partition('=')
+        if not value:
+            raise ValueError(f"Seuil invalide: {item!r} (attendu: cle=ratio)")
+        thresholds[key.strip()] = float(value)
+    return thresholds
+
+
+def threshold_for(benchmark, stat, default, thresholds):
+    """Seuil le plus spécifique : 'forward.b1.p95_ms', 'forward.b1', 'forward.p95_ms', 'forward', 'p95_ms', puis le défaut"""
+    group = benchmark.split('.', 1)[0]
+    for key in (f'{benchmark}.{stat}', benchmark, f'{group}.{stat}', group, stat):
+        if key in thresholds:
+            return thresholds[key]
+    return default
+
+
+def compare(results, baseline, default_threshold=0.10, thresholds=None, min_delta_ms=0.05):
+    """Comparer deux dictionnaires {benchmark: stats} ; retourne la liste des écarts.
+
+    Un écart est une régression si la statistique se dégrade de plus que son
+    seuil (ratio relatif, 0.10 = 10 %). Les variations de latence inférieures
+    à `min_delta_ms` sont ignorées (bruit de mesure sur les étapes très courtes).
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name, stats in sorted(results.items()):
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for stat in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            current, before = stats.get(stat), reference.get(stat)
+            if current is None or not before:
+                continue
+            change = (current - before) / before
+            worse = change if stat in LOWER_IS_BETTER else -change
+            limit = threshold_for(name, stat, default_threshold, thresholds)
+            negligible = stat in LOWER_IS_BETTER and abs(current - before) < min_delta_ms
+            rows.append({
+                'benchmark': name,
+                'stat': stat,
+                'baseline': before,
+                'current': current,
+                'change': round(change, 4),
+                'threshold': limit,
+                'regression': worse > limit and not negligible
+            })
+    return rows
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Test de charge local du streaming WebSocket : N flux simulés en parallèle.
+
+Prérequis : l'API tourne en local (python app1.py) avec STREAM_WS_ENABLED=True.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import requests
+import websockets
+
+from bench_common import make_frame
+
+
+def login(http_url, username, password):
+    response = requests.post(f"{http_url}/auth/login", json={'username': username, 'password': password})
+    response.raise_for_status()
+    return response.json()['token']
+
+
+async def simulated_stream(ws_url, token, client_id, frames, fps, duration):
+    """Un conducteur simulé : envoie `fps` frames/s pendant `duration` s et collecte les prédictions"""
+    sent_at = {}
+    latencies = []
+    scored = 0
+    dropped = 0
+
+    uri = f"{ws_url}/?token={token}&client_session_id=bench{client_id}"
+    async with websockets.connect(uri, max_size=None) as websocket:
+        ready = json.loads(await websocket.recv())
+        if ready.get('type') != 'ready':
+            raise RuntimeError(f"Connexion refusée: {ready}")
+
+        async def receiver():
+            nonlocal scored, dropped
+            async for message in websocket:
+                result = json.loads(message)
+                if result.get('type') != 'prediction':
+                    continue
+                scored += 1
+                dropped = result.get('dropped', dropped)
+                latencies.append((time.perf_counter() - sent_at[result['seq']]) * 1000)
+
+        receiving = asyncio.ensure_future(receiver())
+        interval = 1.0 / fps
+        total = int(duration * fps)
+        for seq in range(1, total + 1):
+            sent_at[seq] = time.perf_counter()
+            await websocket.send(frames[seq % len(frames)])
+            await asyncio.sleep(interval)
+
+        # Laisser le temps aux dernières prédictions d'arriver
+        await asyncio.sleep(1.0)
+        receiving.cancel()
+
+    return {'sent': total, 'scored': scored, 'dropped': dropped, 'latencies': latencies}
+
+
+async def run(args, token):
+    frames = [make_frame(args.width, args.height, seed=i) for i in range(8)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        simulated_stream(args.ws_url, token, i, frames, args.fps, args.duration)
+        for i in range(args.streams)
+    ])
+    elapsed = time.perf_counter() - started
+
+    latencies = [lat for r in results for lat in r['latencies']]
+    sent = sum(r['sent'] for r in results)
+    scored = sum(r['scored'] for r in results)
+    dropped = sum(r['dropped'] for r in results)
+    return {
+        'streams': args.streams,
+        'fps_per_stream': args.fps,
+        'frames_sent': sent,
+        'frames_scored': scored,
+        'frames_dropped': dropped,
+        'drop_rate': round(dropped / sent, 4) if sent else 0.0,
+        'scored_fps': round(scored / elapsed, 2),
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)), 2) if latencies else None,
+        'latency_p95_ms': round(float(np.percentile(latencies, 95)), 2) if latencies else None,
+        'latency_p99_ms': round(float(np.percentile(latencies, 99)), 2) if latencies else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--http-url', default='http://localhost:5000')
+    parser.add_argument('--ws-url', default='ws://localhost:5001')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--streams', type=int, default=50, help='Nombre de flux simultanés')
+    parser.add_argument('--fps', type=float, default=5, help='Frames par seconde et par flux')
+    parser.add_argument('--duration', type=float, default=20, help='Durée en secondes')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    token = login(args.http_url, args.username, args.password)
+    summary = asyncio.run(run(args, token))
+
+    for key, value in summary.items():
+        print(f"  {key:<16} {value}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Suite de benchmarks d'inférence reproductible, avec seuils de régression.
+
+Tout s'exécute dans le processus (DrowsinessDetector et client de test
+Flask), sur un corpus fixe : frames JPEG synthétiques à graine fixe pour
+chaque résolution, plus éventuellement des frames enregistrées (sessions.db
+ou un dossier de JPEG). Mesures : décodage, détection du visage,
+prétraitement, forward (par taille de batch), /predict de bout en bout
+(latence séquentielle et débit avec plusieurs clients).
+
+    python bench_suite.py --json results.json
+    python bench_suite.py --save-baseline bench_baseline.json
+    python bench_suite.py --baseline bench_baseline.json --max-regression 0.15 --threshold forward.p95_ms=0.25
+
+Avec --baseline, le code de sortie vaut 1 si une statistique se dégrade au-delà
+de son seuil.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+import app1
+from bench_common import make_frame, to_data_url
+from bench_regression import compare, parse_thresholds, summarize
+
+DEFAULT_RESOLUTIONS = '320x240,640x480,1280x720,1920x1080'
+
+
+def build_corpus(args):
+    """{nom: [data URL JPEG]} : frames synthétiques par résolution, puis frames enregistrées"""
+    corpus = {}
+    for size in args.resolutions.split(','):
+        width, height = (int(v) for v in size.lower().split('x'))
+        corpus[size] = [to_data_url(make_frame(width, height, seed=seed)) for seed in range(args.frames)]
+
+    recorded = []
+    if args.corpus_dir and os.path.isdir(args.corpus_dir):
+        for name in sorted(os.listdir(args.corpus_dir))[:args.frames]:
+            if name.lower().endswith(('.jpg', '.jpeg')):
+                with open(os.path.join(args.corpus_dir, name), 'rb') as f:
+                    recorded.append(to_data_url(f.read()))
+    if not recorded and args.db and os.path.exists(args.db):
+        conn = sqlite3.connect(args.db)
+        rows = conn.execute(
+            'SELECT frame_data FROM session_frames WHERE frame_data IS NOT NULL ORDER BY id LIMIT ?',
+            (args.frames,)
+        ).fetchall()
+        conn.close()
+        recorded = [row[0] for row in rows]
+    if recorded:
+        corpus['recorded'] = recorded
+    return corpus
+
+
+def time_calls(fn, inputs, iterations, warmup):
+    """Latences (ms) de fn(x) en parcourant `inputs` en boucle"""
+    for i in range(warmup):
+        fn(inputs[i % len(inputs)])
+    latencies = []
+    for i in range(iterations):
+        item = inputs[i % len(inputs)]
+        started = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def bench_stages(detector, corpus, args):
+    """Décodage, détection et prétraitement par élément du corpus"""
+    results = {}
+    for name, frames in corpus.items():
+        results[f'decode.{name}'] = summarize(time_calls(detector.decode_frame, frames, args.iterations, args.warmup))
+        decoded = [detector.decode_frame(frame) for frame in frames]
+        results[f'detection.{name}'] = summarize(time_calls(detector.face_box, decoded, args.iterations, args.warmup))
+        boxed = [(img, detector.face_box(img)) for img in decoded]
+        results[f'preprocess.{name}'] = summarize(
+            time_calls(lambda item: detector.crop_tensor(*item), boxed, args.iterations, args.warmup)
+        )
+    return results
+
+
+def bench_forward(detector, args):
+    """Forward seul, par taille de batch (ops/s en frames/s)"""
+    results = {}
+    for batch_size in (int(v) for v in args.batch_sizes.split(',')):
+        batch = torch.randn(batch_size, 3, 224, 224, generator=torch.Generator().manual_seed(0)).to(detector.device)
+        latencies = time_calls(lambda x: detector._run_model(x), [batch], args.iterations, args.warmup)
+        stats = summarize(latencies)
+        stats['ops_per_s'] = round(stats['ops_per_s'] * batch_size, 2)
+        results[f'forward.b{batch_size}'] = stats
+    return results
+
+
+def bench_endpoint(corpus, args):
+    """/predict de bout en bout : latence séquentielle puis débit avec `clients` threads"""
+    results = {}
+    for name, frames in corpus.items():
+        client = app1.app.test_client()
+
+        def post(frame, test_client=client, session='bench'):
+            response = test_client.post('/predict', json={'image': frame, 'client_session_id': session})
+            if response.status_code != 200 or 'error' in response.get_json():
+                raise RuntimeError(f"/predict en erreur: {response.status_code} {response.get_json()}")
+
+        results[f'predict.{name}'] = summarize(time_calls(post, frames, args.iterations, args.warmup))
+
+        if args.clients > 1:
+            def run_client(index):
+                test_client = app1.app.test_client()
+                latencies = []
+                for i in range(args.iterations):
+                    started = time.perf_counter()
+                    post(frames[(index + i) % len(frames)], test_client, f'bench{index}')
+                    latencies.append((time.perf_counter() - started) * 1000)
+                return latencies
+
+            with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                started = time.perf_counter()
+                per_client = list(pool.map(run_client, range(args.clients)))
+                wall = time.perf_counter() - started
+            stats = summarize([lat for latencies in per_client for lat in latencies], wall_seconds=wall)
+            results[f'predict_concurrent{args.clients}.{name}'] = stats
+    return results
+
+
+def environment(detector, args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': time.time(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'device': str(detector.device),
+        'backend': detector.backend.name,
+        'precision': detector.precision,
+        'batching': detector.batcher is not None,
+        'iterations': args.iterations,
+        'frames_per_corpus': args.frames,
+        'clients': args.clients
+    }
+
+
+def print_results(results):
+    for name, stats in results.items():
+        print(f"⏱️ {name:<32} p50 {stats['p50_ms']:>9.3f}ms  p95 {stats['p95_ms']:>9.3f}ms  "
+              f"p99 {stats['p99_ms']:>9.3f}ms  {stats['ops_per_s']:>9.2f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default=DEFAULT_RESOLUTIONS)
+    parser.add_argument('--frames', type=int, default=8, help='Frames distinctes par élément du corpus')
+    parser.add_argument('--db', default='sessions.db', help='Frames enregistrées (table session_frames)')
+    parser.add_argument('--corpus-dir', help='Dossier de JPEG enregistrés (prioritaire sur --db)')
+    parser.add_argument('--iterations', type=int, default=50, help='Mesures par benchmark')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--batch-sizes', default='1,8')
+    parser.add_argument('--clients', type=int, default=4, help='Clients simultanés pour le débit de /predict')
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads')
+    parser.add_argument('--only', default='stages,forward,endpoint', help='Groupes à exécuter')
+    parser.add_argument('--with-cache', action='store_true',
+                        help='Garder cache et détection de changement (sinon chaque frame est scorée)')
+    parser.add_argument('--json', help='Fichier de résultats JSON')
+    parser.add_argument('--baseline', help='Référence JSON à comparer')
+    parser.add_argument('--save-baseline', help='Écrire les résultats comme nouvelle référence')
+    parser.add_argument('--max-regression', type=float, default=0.10, help='Dégradation relative tolérée par défaut')
+    parser.add_argument('--threshold', action='append', default=[],
+                        help="Seuil spécifique 'forward.b1.p95_ms=ratio', 'forward.p95_ms=ratio', 'forward=ratio' ou 'p95_ms=ratio' (répétable)")
+    parser.add_argument('--no-fail', action='store_true', help='Code de sortie 0 même en cas de régression')
+    args = parser.parse_args()
+
+    thresholds = parse_thresholds(args.threshold)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+
+    detector = app1.startup()
+    if not args.with_cache:
+        detector.frame_cache = None
+        detector.change_detector = None
+    # Pas de logs par frame pendant les mesures
+    app1.log_sampling = app1.setup_logging(level='WARNING')
+
+    corpus = build_corpus(args)
+    groups = set(args.only.split(','))
+    results = {}
+    if 'stages' in groups:
+        results.update(bench_stages(detector, corpus, args))
+    if 'forward' in groups:
+        results.update(bench_forward(detector, args))
+    if 'endpoint' in groups:
+        results.update(bench_endpoint(corpus, args))
+    print_results(results)
+
+    output = {'meta': environment(detector, args), 'results': results}
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(output, f, indent=2)
+            print(f"💾 Résultats écrits dans {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline['results'], args.max_regression, thresholds)
+        regressions = [row for row in rows if row['regression']]
+        for row in regressions:
+            print(f"❌ Régression {row['benchmark']}.{row['stat']}: {row['baseline']} -> {row['current']} "
+                  f"({row['change']:+.1%}, seuil {row['threshold']:.0%})")
+        if baseline.get('meta', {}).get('cpu_count') != output['meta']['cpu_count']:
+            print("⚠️ Référence mesurée sur une autre machine : comparaison indicative")
+        if regressions and not args.no_fail:
+            sys.exit(1)
+        print(f"✅ {len(rows)} statistiques comparées, {len(regressions)} régression(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Passage à l'échelle du pool de processus d'inférence : frames/s pour 1..N cœurs.
+
+Chaque processus est limité à `--threads` thread(s) torch ; les frames sont
+décodées une fois dans le processus principal puis transmises par mémoire
+partagée, comme dans l'API.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app1 import build_worker_detector
+from bench_common import make_frame
+from preprocessing import decode_image
+from worker_pool import InferenceWorkerPool
+
+
+def measure(num_workers, frames, args):
+    """Débit (frames/s) et latence moyenne d'un pool de `num_workers` processus"""
+    pool = InferenceWorkerPool(
+        build_worker_detector,
+        (args.model,),
+        num_workers=num_workers,
+        threads_per_worker=args.threads
+    ).start()
+    try:
+        # Deux clients par processus pour que la file de tâches ne se vide jamais
+        with ThreadPoolExecutor(max_workers=2 * num_workers) as clients:
+            list(clients.map(pool.score, frames[:2 * num_workers]))
+
+            started = time.perf_counter()
+            list(clients.map(pool.score, (frames[i % len(frames)] for i in range(args.frames))))
+            elapsed = time.perf_counter() - started
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    fps = args.frames / elapsed
+    worker_ms = [w['avg_ms'] for w in stats['per_worker'] if w['frames']]
+    return {
+        'workers': num_workers,
+        'threads_per_worker': args.threads,
+        'fps': round(fps, 2),
+        'avg_worker_ms': round(sum(worker_ms) / len(worker_ms), 3) if worker_ms else None,
+        'errors': stats['errors']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='mobilenet_drowsiness.pth')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='N : mesure de 1 à N processus')
+    parser.add_argument('--threads', type=int, default=1, help='Threads torch par processus')
+    parser.add_argument('--frames', type=int, default=400, help='Frames mesurées par configuration')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    frames = [decode_image(make_frame(args.width, args.height, seed=i)) for i in range(16)]
+
+    results = []
+    for num_workers in range(1, args.max_workers + 1):
+        result = measure(num_workers, frames, args)
+        results.append(result)
+        speedup = result['fps'] / results[0]['fps']
+        result['speedup'] = round(speedup, 2)
+        result['efficiency'] = round(speedup / num_workers, 2)
+        print(f"⚙️ {num_workers} processus: {result['fps']} frames/s "
+              f"(x{result['speedup']}, efficacité {result['efficiency']}, {result['avg_worker_ms']}ms/frame)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'cpu_count': os.cpu_count(),
+                'frame_size': f"{args.width}x{args.height}",
+                'results': results
+            }, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Mémoire et temps de démarrage des workers gunicorn, avec et sans préchargement.
+
+Lance `gunicorn -c gunicorn.conf.py wsgi:app` avec WSGI_PRELOAD=True puis
+False, attend /ready, et relève pour chaque worker le RSS, l'USS (pages
+privées) et le PSS (part proportionnelle des pages partagées). Avec le
+préchargement, les poids sont partagés en copy-on-write : l'USS par worker
+doit baisser nettement et l'initialisation d'un worker tomber à quelques ms.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import psutil
+
+
+def wait_ready(port, process, timeout):
+    """Attendre que /ready réponde 200 ; retourne la durée en secondes"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn s'est arrêté (code {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"/ready sans réponse après {timeout}s")
+
+
+def memory_mb(proc):
+    try:
+        info = proc.memory_full_info()
+    except psutil.AccessDenied:
+        info = proc.memory_info()
+    return {field: round(getattr(info, field) / (1024 * 1024), 1)
+            for field in ('rss', 'uss', 'pss') if hasattr(info, field)}
+
+
+def measure(preload, args):
+    env = dict(os.environ, WSGI_PRELOAD=str(preload), WSGI_WORKERS=str(args.workers),
+               PORT=str(args.port), STREAM_WS_ENABLED='False')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        env=env, stdout=subprocess.DEVNULL if args.quiet else None, stderr=subprocess.STDOUT if args.quiet else None
+    )
+    try:
+        boot_s = wait_ready(args.port, process, args.timeout)
+        # /ready répond dès le premier worker : laisser les autres finir leur initialisation
+        time.sleep(args.settle)
+        master = psutil.Process(process.pid)
+        workers = [memory_mb(child) for child in master.children()]
+        result = {
+            'preload': preload,
+            'boot_s': round(boot_s, 2),
+            'master': memory_mb(master),
+            'workers': workers
+        }
+        for field in ('rss', 'uss', 'pss'):
+            values = [w[field] for w in workers if field in w]
+            if values:
+                result[f'worker_avg_{field}_mb'] = round(sum(values) / len(values), 1)
+        return result
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--timeout', type=float, default=180, help='Attente max de /ready (s)')
+    parser.add_argument('--settle', type=float, default=5, help='Pause après /ready avant la mesure (s)')
+    parser.add_argument('--quiet', action='store_true', help='Masquer la sortie de gunicorn')
+    parser.add_argument('--json', help='Fichier de sortie JSON')
+    args = parser.parse_args()
+
+    results = []
+    for preload in (False, True):
+        result = measure(preload, args)
+        results.append(result)
+        print(f"⚙️ preload={preload}: prêt en {result['boot_s']}s, par worker "
+              f"RSS {result.get('worker_avg_rss_mb')} Mo, USS {result.get('worker_avg_uss_mb')} Mo, "
+              f"PSS {result.get('worker_avg_pss_mb')} Mo")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'workers': args.workers, 'results': results}, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
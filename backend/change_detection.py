@@ -0,0 +1,134 @@
+"""Détection de changement par flux : réutiliser le dernier score tant que le visage ne bouge pas"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class ChangeState:
+    """Vignette et score de la dernière frame réellement scorée d'un flux"""
+    __slots__ = ('thumbnail', 'score', 'since_scored', 'frames', 'skipped', 'saved_ms')
+
+    def __init__(self):
+        self.thumbnail = None
+        self.score = None
+        self.since_scored = 0  # frames réutilisées depuis le dernier vrai score
+        self.frames = 0
+        self.skipped = 0
+        self.saved_ms = 0.0
+
+    def stats(self):
+        return {
+            'skip_rate': round(self.skipped / self.frames, 4) if self.frames else 0.0,
+            'cpu_saved_ms': round(self.saved_ms, 1)
+        }
+
+
+def face_thumbnail(image_rgb, box=None, size=32):
+    """Petite vignette en niveaux de gris (int16) de la région du visage, ou de la frame entière"""
+    if box is not None:
+        x, y, w, h = box
+        region = image_rgb[y:y + h, x:x + w]
+        if region.size:
+            image_rgb = region
+    small = cv2.resize(image_rgb, (size, size), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY).astype(np.int16)
+
+
+def max_block_diff(a, b, block=4):
+    """Plus grande différence moyenne (niveaux de gris) parmi les blocs block x block des deux vignettes.
+
+    Une fermeture des yeux ne touche que quelques blocs : diluée dans la
+    moyenne de tout le visage, elle restait sous 3 niveaux de gris, alors que
+    le bloc de l'œil change de plus de 25 niveaux (recompression : ~2).
+    """
+    diff = np.abs(a - b).astype(np.float32)
+    rows, cols = diff.shape[0] // block, diff.shape[1] // block
+    if not rows or not cols:
+        return float(diff.max())
+    blocks = diff[:rows * block, :cols * block].reshape(rows, block, cols, block)
+    return float(blocks.mean(axis=(1, 3)).max())
+
+
+class ChangeDetector:
+    """Compare la vignette courante à celle de la dernière frame scorée.
+
+    Si aucun bloc de la vignette ne change de plus du seuil (différence
+    moyenne par bloc, niveaux de gris 0-255), le dernier score brut est
+    réutilisé ; un nouveau score est forcé au moins toutes les `max_skip`
+    frames pour ne pas manquer une dérive lente.
+    """
+
+    def __init__(self, threshold=8.0, max_skip=3, thumbnail_size=32, block_size=4):
+        self.threshold = threshold
+        self.max_skip = max(0, int(max_skip))
+        self.thumbnail_size = thumbnail_size
+        self.block_size = block_size
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.skipped = 0
+        self.forced = 0
+        self._score_ms = None  # moyenne glissante du coût d'un vrai score (détection + CNN)
+        self._check_ms = 0.0
+        self._saved_ms = 0.0
+
+    def check(self, state, image_rgb, box=None):
+        """Retourner (score réutilisé ou None, vignette courante)"""
+        started = time.perf_counter()
+        thumbnail = face_thumbnail(image_rgb, box, self.thumbnail_size)
+
+        reused = None
+        forced = False
+        if state.thumbnail is not None and state.thumbnail.shape == thumbnail.shape:
+            if state.since_scored >= self.max_skip:
+                forced = True
+            elif max_block_diff(thumbnail, state.thumbnail, self.block_size) < self.threshold:
+                reused = state.score
+        elapsed = (time.perf_counter() - started) * 1000
+
+        state.frames += 1
+        with self._lock:
+            self.frames += 1
+            self._check_ms += elapsed
+            if forced:
+                self.forced += 1
+            if reused is not None:
+                self.skipped += 1
+                saved = (self._score_ms or 0.0) - elapsed
+                self._saved_ms += saved
+        if reused is not None:
+            state.since_scored += 1
+            state.skipped += 1
+            state.saved_ms += saved
+        return reused, thumbnail
+
+    def record(self, state, thumbnail, score, score_ms=None):
+        """Mémoriser la frame qui vient d'être scorée (score_ms : coût du score, si mesuré)"""
+        state.thumbnail = thumbnail
+        state.score = score
+        state.since_scored = 0
+        if score_ms is not None:
+            with self._lock:
+                if self._score_ms is None:
+                    self._score_ms = score_ms
+                else:
+                    self._score_ms = 0.9 * self._score_ms + 0.1 * score_ms
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'threshold': self.threshold,
+                'block_size': self.block_size,
+                'max_skip': self.max_skip,
+                'frames': self.frames,
+                'skipped': self.skipped,
+                'forced_rescores': self.forced,
+                'skip_rate': round(self.skipped / self.frames, 4) if self.frames else 0.0,
+                'avg_score_ms': round(self._score_ms or 0.0, 3),
+                'avg_check_ms': round(self._check_ms / self.frames, 3) if self.frames else 0.0,
+                'cpu_saved_ms': round(self._saved_ms, 1)
+            }
@@ -19,25 +19,123 @@ class Config:
     
     # Configuration de l'IA
     MODEL_PATH = os.environ.get('MODEL_PATH', 'cnn_drowsiness (1).pth')
+    MODEL_MMAP = os.environ.get('MODEL_MMAP', 'True').lower() == 'true'  # Poids projetés en mémoire (partagés entre workers)
+    INFERENCE_PRECISION = os.environ.get('INFERENCE_PRECISION', 'fp32')  # fp32, int8 (statique, sinon fp32), int8_static, int8_dynamic (classifieur seul)
+    QUANT_CALIBRATION_FRAMES = int(os.environ.get('QUANT_CALIBRATION_FRAMES', 200))  # Frames de session_frames pour calibrer
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'torchscript')  # eager, torchscript, compile, onnxruntime, auto
+    BACKEND_BENCHMARK_RUNS = int(os.environ.get('BACKEND_BENCHMARK_RUNS', 10))  # Mesures par backend au démarrage
+    WARMUP_RUNS = int(os.environ.get('WARMUP_RUNS', 5))  # Inférences d'échauffement par résolution
+    WARMUP_SHAPES = os.environ.get('WARMUP_SHAPES', '640x480,1280x720')  # Résolutions représentatives (LxH)
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0))  # Processus d'inférence (0 = inférence dans le processus Flask)
+    WORKER_TORCH_THREADS = int(os.environ.get('WORKER_TORCH_THREADS', 0))  # Threads torch par processus (0 = cœurs / processus)
+    WORKER_MAX_FRAME_PIXELS = int(os.environ.get('WORKER_MAX_FRAME_PIXELS', 1920 * 1080))  # Taille d'un slot de mémoire partagée
     
     # Configuration du cache
     CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'True').lower() == 'true'
     CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
-    CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 30))
+    CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 30))  # TTL d'une entrée en secondes
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1000))
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 1024 * 1024))
+    CACHE_ENTRIES_PER_STREAM = int(os.environ.get('CACHE_ENTRIES_PER_STREAM', 8))
+    CACHE_HASH_SIZE = int(os.environ.get('CACHE_HASH_SIZE', 16))  # dHash de CACHE_HASH_SIZE² bits
+    CACHE_HASH_DISTANCE = int(os.environ.get('CACHE_HASH_DISTANCE', 8))  # Distance de Hamming maximale pour un hit
+    CACHE_EYE_TOLERANCE = int(os.environ.get('CACHE_EYE_TOLERANCE', 8))  # Écart max. (niveaux de gris) par case de la bande des yeux
+    
+    # Détection de changement : réutiliser le dernier score tant que le visage est immobile
+    # (désactivée par défaut : un score réutilisé retarde d'autant la détection d'une fermeture des yeux)
+    CHANGE_DETECTION_ENABLED = os.environ.get('CHANGE_DETECTION_ENABLED', 'False').lower() == 'true'
+    CHANGE_THRESHOLD = float(os.environ.get('CHANGE_THRESHOLD', 8.0))  # Différence moyenne max. par bloc de la vignette (niveaux de gris 0-255)
+    CHANGE_MAX_SKIP = int(os.environ.get('CHANGE_MAX_SKIP', 3))  # Nouveau score forcé au moins toutes les K frames
+    CHANGE_THUMBNAIL_SIZE = int(os.environ.get('CHANGE_THUMBNAIL_SIZE', 32))
+    CHANGE_BLOCK_SIZE = int(os.environ.get('CHANGE_BLOCK_SIZE', 4))  # Blocs de CHANGE_BLOCK_SIZE² pixels de la vignette
+    
+    # Cascade EAR -> CNN (landmarks dlib requis)
+    EAR_CASCADE_ENABLED = os.environ.get('EAR_CASCADE_ENABLED', 'True').lower() == 'true'
+    EAR_OPEN_THRESHOLD = float(os.environ.get('EAR_OPEN_THRESHOLD', 0.30))  # Au-dessus : yeux nettement ouverts
+    EAR_CLOSED_THRESHOLD = float(os.environ.get('EAR_CLOSED_THRESHOLD', 0.18))  # En dessous : yeux nettement fermés
+    
+    # Indicateurs temporels par flux (PERCLOS, clignements)
+    TEMPORAL_WINDOW_SECONDS = float(os.environ.get('TEMPORAL_WINDOW_SECONDS', 60))  # Fenêtre glissante du PERCLOS
+    TEMPORAL_MAX_FRAMES = int(os.environ.get('TEMPORAL_MAX_FRAMES', 900))  # Capacité du buffer par flux (60 s à 15 fps)
+    TEMPORAL_MAX_BLINK_MS = float(os.environ.get('TEMPORAL_MAX_BLINK_MS', 500))  # Au-delà : fermeture longue
+    TEMPORAL_EAR_CLOSED = float(os.environ.get('TEMPORAL_EAR_CLOSED', 0.21))  # EAR sous lequel les yeux sont fermés
+    TEMPORAL_PERSIST_ENABLED = os.environ.get('TEMPORAL_PERSIST_ENABLED', 'True').lower() == 'true'
+    TEMPORAL_PERSIST_INTERVAL = float(os.environ.get('TEMPORAL_PERSIST_INTERVAL', 5))  # Une ligne par flux toutes les N s
+    TEMPORAL_RETENTION_DAYS = float(os.environ.get('TEMPORAL_RETENTION_DAYS', 30))  # Purge des indicateurs plus anciens (0 = conserver)
+    TEMPORAL_PERSIST_ANONYMOUS = os.environ.get('TEMPORAL_PERSIST_ANONYMOUS', 'False').lower() == 'true'  # Flux sans utilisateur
+    
+    # Re-scoring hors ligne des frames enregistrées (/admin/rescore, rescore.py)
+    RESCORE_CHUNK_SIZE = int(os.environ.get('RESCORE_CHUNK_SIZE', 512))  # Frames lues et écrites par transaction
+    RESCORE_BATCH_SIZE = int(os.environ.get('RESCORE_BATCH_SIZE', 64))  # Frames par forward
+    RESCORE_MODEL_DIR = os.environ.get('RESCORE_MODEL_DIR', '.')  # Seul dossier d'où /admin/rescore charge un modèle
+    
+    # Mode multi-visages (conducteur + passager) : une prédiction par visage
+    MULTI_FACE_MODE = os.environ.get('MULTI_FACE_MODE', 'False').lower() == 'true'  # Sinon activable par ?multi_face=1
+    MULTI_FACE_MAX_FACES = int(os.environ.get('MULTI_FACE_MAX_FACES', 4))
+    MULTI_FACE_IOU_THRESHOLD = float(os.environ.get('MULTI_FACE_IOU_THRESHOLD', 0.3))  # Association des pistes entre frames
+    MULTI_FACE_MAX_MISSED = int(os.environ.get('MULTI_FACE_MAX_MISSED', 5))  # Frames sans le visage avant abandon de la piste
+    
+    # Configuration du micro-batching de l'inférence
+    BATCH_INFERENCE_ENABLED = os.environ.get('BATCH_INFERENCE_ENABLED', 'True').lower() == 'true'
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 32))  # Taille maximale d'un batch
+    BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 5))  # Fenêtre de collecte en ms
+    
+    # Configuration de l'état temporel par flux
+    STREAM_BUFFER_SIZE = int(os.environ.get('STREAM_BUFFER_SIZE', 5))  # Frames pour le vote majoritaire
+    STREAM_TTL_SECONDS = int(os.environ.get('STREAM_TTL_SECONDS', 300))  # Éviction après inactivité
+    MAX_STREAMS = int(os.environ.get('MAX_STREAMS', 10000))  # Nombre maximal de flux suivis
+    
+    # Configuration du suivi du visage entre frames
+    FACE_TRACKING_ENABLED = os.environ.get('FACE_TRACKING_ENABLED', 'True').lower() == 'true'
+    FACE_REDETECT_INTERVAL = int(os.environ.get('FACE_REDETECT_INTERVAL', 10))  # Détection plein cadre tous les N frames
+    FACE_ROI_PADDING = float(os.environ.get('FACE_ROI_PADDING', 0.5))  # Marge de la ROI (fraction de la boîte)
+    FACE_DETECTION_WIDTH = int(os.environ.get('FACE_DETECTION_WIDTH', 0))  # Largeur de détection (0 = pleine résolution)
+    
+    # Configuration du prétraitement
+    DECODE_MAX_WIDTH = int(os.environ.get('DECODE_MAX_WIDTH', 640))  # Décodage JPEG réduit au-delà de 2x cette largeur
+    MAX_FRAME_BYTES = int(os.environ.get('MAX_FRAME_BYTES', 5 * 1024 * 1024))  # Taille max d'une frame binaire
+    # Corps de requête max (frame en base64 + marge du formulaire) : 413 avant toute analyse du corps
+    MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', MAX_FRAME_BYTES * 4 // 3 + 64 * 1024))
+    
+    # Configuration du streaming WebSocket
+    STREAM_WS_ENABLED = os.environ.get('STREAM_WS_ENABLED', 'True').lower() == 'true'
+    STREAM_WS_PORT = int(os.environ.get('STREAM_WS_PORT', 5001))
+    STREAM_WS_INFERENCE_THREADS = int(os.environ.get('STREAM_WS_INFERENCE_THREADS', 4))
+    
+    # Configuration du serveur WSGI de production (gunicorn.conf.py, wsgi.py)
+    WSGI_WORKERS = int(os.environ.get('WSGI_WORKERS', 2))
+    WSGI_THREADS = int(os.environ.get('WSGI_THREADS', 4))  # Threads par worker (gthread)
+    WSGI_PRELOAD = os.environ.get('WSGI_PRELOAD', 'True').lower() == 'true'  # Modèle chargé une fois dans le maître
+    WSGI_TIMEOUT = int(os.environ.get('WSGI_TIMEOUT', 60))
+    WSGI_TORCH_THREADS = int(os.environ.get('WSGI_TORCH_THREADS', 0))  # 0 = cœurs / workers
+    
+    # Échantillonnage des métriques système en tâche de fond (/performance)
+    SYSTEM_SAMPLER_ENABLED = os.environ.get('SYSTEM_SAMPLER_ENABLED', 'True').lower() == 'true'
+    SYSTEM_SAMPLER_INTERVAL = float(os.environ.get('SYSTEM_SAMPLER_INTERVAL', 2.0))  # Secondes entre deux relevés
+    SYSTEM_SAMPLER_WINDOW = int(os.environ.get('SYSTEM_SAMPLER_WINDOW', 150))  # Relevés conservés (~5 min)
+    
+    # Profilage à chaud (/admin/profile)
+    PROFILE_REPORT_DIR = os.environ.get('PROFILE_REPORT_DIR', 'profiles')  # Vide = rapports en mémoire seulement
+    PROFILE_MAX_REQUESTS = int(os.environ.get('PROFILE_MAX_REQUESTS', 1000))
+    PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', 300))
     
     # Configuration des logs
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.environ.get('LOG_FILE', 'app.log')
+    LOG_FILE = os.environ.get('LOG_FILE', 'app.log')  # Vide = console uniquement
+    LOG_JSON = os.environ.get('LOG_JSON', 'False').lower() == 'true'  # Une ligne JSON par message
+    LOG_QUEUE_ENABLED = os.environ.get('LOG_QUEUE_ENABLED', 'True').lower() == 'true'  # Écriture hors du thread de la requête
+    LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', 'predict=0.1,face=0.1,cache=0.1')  # Messages par frame (DEBUG/INFO)
+    LOG_DEFAULT_SAMPLE_RATE = float(os.environ.get('LOG_DEFAULT_SAMPLE_RATE', 1.0))
 
 class DevelopmentConfig(Config):
     """Configuration pour le développement"""
     DEBUG = True
-    LOG_LEVEL = 'DEBUG'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG')
 
 class ProductionConfig(Config):
     """Configuration pour la production"""
     DEBUG = False
-    LOG_LEVEL = 'WARNING'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
     
 class TestingConfig(Config):
     """Configuration pour les tests"""
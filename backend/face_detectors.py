@@ -0,0 +1,193 @@
+"""Détecteurs de visages (Haar, MTCNN, dlib) et pool de réutilisation"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+from PIL import Image
+
+
+class FaceDetector:
+    """Interface commune : detect() retourne une liste de boîtes (x, y, w, h) en pixels"""
+    name = 'base'
+
+    def detect(self, image_rgb, gray=None):
+        raise NotImplementedError
+
+
+class HaarFaceDetector(FaceDetector):
+    """Cascade de Haar OpenCV (chargée une seule fois par instance)"""
+    name = 'haar'
+
+    def __init__(self, scale_factor=1.1, min_neighbors=3, min_size=(30, 30)):
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+        self._cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        if self._cascade.empty():
+            raise RuntimeError('Cascade de Haar introuvable')
+
+    def detect(self, image_rgb, gray=None):
+        if gray is None:
+            gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+        faces = self._cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class MTCNNFaceDetector(FaceDetector):
+    """Détecteur MTCNN (facenet_pytorch)"""
+    name = 'mtcnn'
+
+    def __init__(self, device='cpu'):
+        from facenet_pytorch import MTCNN
+        self._mtcnn = MTCNN(
+            keep_all=True,
+            device=device,
+            min_face_size=20,  # Visages plus petits
+            thresholds=[0.6, 0.7, 0.7],  # Plus permissif
+            factor=0.8,  # Échelle de pyramide plus fine
+            post_process=False  # Désactiver le post-processing pour la vitesse
+        )
+
+    def detect(self, image_rgb, gray=None):
+        boxes, _ = self._mtcnn.detect(Image.fromarray(image_rgb))
+        if boxes is None:
+            return []
+        height, width = image_rgb.shape[:2]
+        faces = []
+        for x1, y1, x2, y2 in boxes:
+            x1, y1 = max(0, int(x1)), max(0, int(y1))
+            x2, y2 = min(width, int(x2)), min(height, int(y2))
+            if x2 > x1 and y2 > y1:
+                faces.append((x1, y1, x2 - x1, y2 - y1))
+        return faces
+
+
+class DlibFaceDetector(FaceDetector):
+    """Détecteur HOG frontal de dlib"""
+    name = 'dlib'
+
+    def __init__(self):
+        import dlib
+        self._detector = dlib.get_frontal_face_detector()
+
+    def detect(self, image_rgb, gray=None):
+        if gray is None:
+            gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+        return [(r.left(), r.top(), r.width(), r.height()) for r in self._detector(gray)]
+
+
+class FaceDetectorPool:
+    """Pool d'instances de détecteurs, chargées une fois puis réutilisées.
+
+    Chaque instance n'est utilisée que par un thread à la fois (les cascades
+    OpenCV ne sont pas garanties thread-safe) ; le nombre d'instances chargées
+    est borné par la concurrence réelle, pas par le nombre de requêtes.
+    """
+
+    def __init__(self, factories=None):
+        self._factories = dict(factories or {})
+        self._idle = {name: [] for name in self._factories}
+        self._lock = threading.Lock()
+        self._stats = {name: self._empty_stats() for name in self._factories}
+
+    @staticmethod
+    def _empty_stats():
+        return {'instances': 0, 'load_time_ms': 0.0, 'detections': 0, 'detect_time_ms': 0.0, 'errors': 0}
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._idle.setdefault(name, [])
+            self._stats.setdefault(name, self._empty_stats())
+
+    def available(self):
+        return list(self._factories)
+
+    def __contains__(self, name):
+        return name in self._factories
+
+    def _load(self, name):
+        started = time.perf_counter()
+        detector = self._factories[name]()
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats[name]['instances'] += 1
+            self._stats[name]['load_time_ms'] += elapsed
+        return detector
+
+    def preload(self, name):
+        """Charger une instance à l'avance (au démarrage plutôt qu'à la première requête)"""
+        detector = self._load(name)
+        with self._lock:
+            self._idle[name].append(detector)
+        return detector
+
+    @contextmanager
+    def borrow(self, name):
+        """Emprunter une instance du détecteur `name` pour la durée du bloc"""
+        with self._lock:
+            idle = self._idle[name]
+            detector = idle.pop() if idle else None
+        if detector is None:
+            detector = self._load(name)
+        try:
+            yield detector
+        finally:
+            with self._lock:
+                self._idle[name].append(detector)
+
+    def detect(self, name, image_rgb, gray=None):
+        """Détecter les visages avec le détecteur `name` : liste de (x, y, w, h)"""
+        with self.borrow(name) as detector:
+            started = time.perf_counter()
+            try:
+                faces = detector.detect(image_rgb, gray)
+            except Exception:
+                with self._lock:
+                    self._stats[name]['errors'] += 1
+                raise
+            elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats[name]['detections'] += 1
+            self._stats[name]['detect_time_ms'] += elapsed
+        return faces
+
+    def stats(self):
+        """Compteurs temps de chargement vs temps de détection par détecteur"""
+        with self._lock:
+            snapshot = {name: dict(values) for name, values in self._stats.items()}
+        for values in snapshot.values():
+            detections = values['detections']
+            values['avg_detect_ms'] = round(values['detect_time_ms'] / detections, 3) if detections else 0.0
+            values['load_time_ms'] = round(values['load_time_ms'], 3)
+            values['detect_time_ms'] = round(values['detect_time_ms'], 3)
+        return snapshot
+
+
+def largest_face(faces):
+    """Boîte de plus grande surface"""
+    return max(faces, key=lambda f: f[2] * f[3])
+
+
+def downscale_for_detection(image, target_width):
+    """Réduire l'image à `target_width` de large : retourne (image réduite, facteur d'échelle)"""
+    height, width = image.shape[:2]
+    if not target_width or width <= target_width:
+        return image, 1.0
+    scale = target_width / width
+    small = cv2.resize(image, (target_width, max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+    return small, scale
+
+
+def rescale_boxes(faces, scale):
+    """Ramener des boîtes détectées sur l'image réduite à la résolution d'origine"""
+    if scale == 1.0:
+        return faces
+    return [tuple(int(round(v / scale)) for v in face) for face in faces]
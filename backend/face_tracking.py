@@ -0,0 +1,105 @@
+"""Suivi du visage entre frames : détection restreinte à une ROI autour de la dernière boîte"""
+
+import threading
+import time
+
+
+class FaceTrack:
+    """Dernière position connue du visage pour un flux"""
+    __slots__ = ('box', 'frames_since_full')
+
+    def __init__(self):
+        self.box = None
+        self.frames_since_full = 0
+
+
+def padded_roi(box, padding, width, height):
+    """ROI (x1, y1, x2, y2) autour de `box`, élargie de `padding` x taille et bornée à l'image"""
+    x, y, w, h = box
+    pad_x, pad_y = int(w * padding), int(h * padding)
+    return (max(0, x - pad_x), max(0, y - pad_y),
+            min(width, x + w + pad_x), min(height, y + h + pad_y))
+
+
+class FaceTracker:
+    """Localise le visage d'un flux en ne relançant la détection plein cadre que tous les N frames.
+
+    `detect_fn(image_rgb)` retourne une liste de boîtes (x, y, w, h) ; elle est
+    appelée sur la ROI (hit/miss) ou sur la frame complète (détection de référence).
+    """
+
+    def __init__(self, redetect_interval=10, roi_padding=0.5):
+        self.redetect_interval = max(1, int(redetect_interval))
+        self.roi_padding = roi_padding
+        self._lock = threading.Lock()
+
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_detections = 0
+        self._full_detect_ms = None  # moyenne glissante du coût plein cadre
+        self._roi_detect_ms = 0.0
+        self._saved_ms = 0.0
+
+    def locate(self, image_rgb, track, detect_fn):
+        """Retourner la boîte du visage (x, y, w, h) dans l'image complète, ou None"""
+        height, width = image_rgb.shape[:2]
+
+        if track.box is not None and track.frames_since_full < self.redetect_interval:
+            x1, y1, x2, y2 = padded_roi(track.box, self.roi_padding, width, height)
+            started = time.perf_counter()
+            faces = detect_fn(image_rgb[y1:y2, x1:x2])
+            elapsed = (time.perf_counter() - started) * 1000
+
+            if faces:
+                fx, fy, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+                track.box = (fx + x1, fy + y1, fw, fh)
+                track.frames_since_full += 1
+                self._record_roi(elapsed, hit=True)
+                return track.box
+            self._record_roi(elapsed, hit=False)
+
+        started = time.perf_counter()
+        faces = detect_fn(image_rgb)
+        elapsed = (time.perf_counter() - started) * 1000
+        self._record_full(elapsed)
+
+        track.box = max(faces, key=lambda f: f[2] * f[3]) if faces else None
+        track.frames_since_full = 0
+        return track.box
+
+    def _record_roi(self, elapsed_ms, hit):
+        with self._lock:
+            self._roi_detect_ms += elapsed_ms
+            if hit:
+                self.roi_hits += 1
+                if self._full_detect_ms is not None:
+                    self._saved_ms += self._full_detect_ms - elapsed_ms
+            else:
+                self.roi_misses += 1
+                # Une ROI ratée coûte en plus de la détection plein cadre qui suit
+                self._saved_ms -= elapsed_ms
+
+    def _record_full(self, elapsed_ms):
+        with self._lock:
+            self.full_detections += 1
+            if self._full_detect_ms is None:
+                self._full_detect_ms = elapsed_ms
+            else:
+                self._full_detect_ms = 0.9 * self._full_detect_ms + 0.1 * elapsed_ms
+
+    def stats(self):
+        """Ratio hit/miss et temps de détection économisé"""
+        with self._lock:
+            roi_attempts = self.roi_hits + self.roi_misses
+            return {
+                'enabled': True,
+                'redetect_interval': self.redetect_interval,
+                'roi_padding': self.roi_padding,
+                'roi_hits': self.roi_hits,
+                'roi_misses': self.roi_misses,
+                'hit_rate': round(self.roi_hits / roi_attempts, 4) if roi_attempts else 0.0,
+                'full_detections': self.full_detections,
+                'avg_full_detect_ms': round(self._full_detect_ms or 0.0, 3),
+                'avg_roi_detect_ms': round(self._roi_detect_ms / roi_attempts, 3) if roi_attempts else 0.0,
+                'time_saved_ms': round(self._saved_ms, 1)
+            }
@@ -0,0 +1,223 @@
+"""Cache de scores pour frames quasi identiques (hash perceptuel, LRU + TTL, cloisonné par flux).
+
+La clé d'une frame combine le dHash de la région du visage et une vignette
+de la bande des yeux : le hash tolère une recompression JPEG, la vignette
+empêche qu'une frame yeux fermés retrouve le score d'une frame yeux ouverts
+(le hash du visage entier ne bouge que de quelques bits quand les yeux se ferment).
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Coût mémoire fixe d'une entrée (objet, clé, entier du hash, nœud de l'OrderedDict)
+ENTRY_OVERHEAD_BYTES = 256
+
+# Bande des yeux : fraction verticale de la boîte du visage (haut, bas)
+EYE_BAND = (0.2, 0.55)
+
+
+def dhash(image_rgb, hash_size=16, margin=2):
+    """Hash perceptuel par différences (dHash) : entier de hash_size² bits.
+
+    L'image est réduite à (hash_size + 1) x hash_size puis chaque bit indique
+    si un pixel est plus clair que son voisin de droite d'au moins `margin`
+    niveaux de gris. Sans cette marge, les zones uniformes (fond, peau) donnent
+    des bits tirés au sort par le bruit de compression : une même frame
+    recompressée en JPEG q40 s'éloignait de plus de 40 bits sur 256.
+    """
+    small = cv2.resize(image_rgb, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY).astype(np.int16)
+    bits = gray[:, 1:] - gray[:, :-1] > margin
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def frame_signature(image_rgb, box=None, hash_size=16):
+    """dHash de la région du visage (dernière boîte connue du flux) ou de la frame entière"""
+    if box is not None:
+        x, y, w, h = box
+        region = image_rgb[y:y + h, x:x + w]
+        if region.size:
+            image_rgb = region
+    return dhash(image_rgb, hash_size)
+
+
+def eye_signature(image_rgb, box, cols=16, rows=4):
+    """Vignette en niveaux de gris (int16, rows x cols) de la bande des yeux de la boîte du visage"""
+    x, y, w, h = box
+    top, bottom = EYE_BAND
+    region = image_rgb[y + int(h * top):y + max(int(h * bottom), int(h * top) + 1), x:x + w]
+    if not region.size:
+        region = image_rgb
+    small = cv2.resize(region, (cols, rows), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY).astype(np.int16)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def eyes_match(a, b, tolerance):
+    """Même état des yeux : écart maximal par case de la bande des yeux <= tolerance"""
+    if a is None or b is None:
+        return a is None and b is None
+    return a.shape == b.shape and int(np.abs(a - b).max()) <= tolerance
+
+
+class CacheEntry:
+    __slots__ = ('stream_key', 'frame_hash', 'eyes', 'value', 'created', 'last_used', 'size')
+
+    def __init__(self, stream_key, frame_hash, value, created, eyes=None):
+        self.stream_key = stream_key
+        self.frame_hash = frame_hash
+        self.eyes = eyes
+        self.value = value
+        self.created = created
+        self.last_used = created
+        self.size = ENTRY_OVERHEAD_BYTES + sys.getsizeof(stream_key) + sys.getsizeof(value)
+        if eyes is not None:
+            self.size += eyes.nbytes
+
+
+class FrameCache:
+    """Scores bruts indexés par (flux, hash perceptuel).
+
+    Une recherche ne compare que les entrées du flux demandé : un score mis en
+    cache pour un conducteur ne sert jamais à un autre. Le lissage temporel
+    reste fait par le flux à chaque frame, y compris sur un hit. Si une
+    vignette des yeux accompagne la frame, un hit exige aussi que chaque case
+    de la bande des yeux reste à `eye_tolerance` niveaux de gris de l'entrée.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=1024 * 1024, ttl_seconds=30,
+                 max_distance=8, hash_size=16, entries_per_stream=8, eye_tolerance=8):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.entries_per_stream = max(1, entries_per_stream)
+        self.eye_tolerance = eye_tolerance
+
+        self._entries = OrderedDict()  # (flux, hash) -> CacheEntry, ordre LRU (le plus ancien en tête)
+        self._by_stream = {}  # flux -> {hash: CacheEntry}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.near_hits = 0  # hits à distance de Hamming non nulle
+        self.eye_rejects = 0  # visage proche mais état des yeux différent
+        self.misses = 0
+        self.evicted_lru = 0
+        self.evicted_bytes = 0
+        self.expired = 0
+
+    def get(self, stream_key, frame_hash, eyes=None):
+        """Score en cache le plus proche (distance <= max_distance, mêmes yeux) pour ce flux, ou None"""
+        now = time.monotonic()
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            rejected = False
+            for entry in list(self._by_stream.get(stream_key, {}).values()):
+                if now - entry.created > self.ttl_seconds:
+                    self._remove(entry)
+                    self.expired += 1
+                    continue
+                distance = hamming_distance(entry.frame_hash, frame_hash)
+                if distance < best_distance:
+                    if not eyes_match(entry.eyes, eyes, self.eye_tolerance):
+                        rejected = True
+                        continue
+                    best, best_distance = entry, distance
+
+            if best is None:
+                self.misses += 1
+                if rejected:
+                    self.eye_rejects += 1
+                return None
+            best.last_used = now
+            self._entries.move_to_end((stream_key, best.frame_hash))
+            self.hits += 1
+            if best_distance:
+                self.near_hits += 1
+            return best.value
+
+    def put(self, stream_key, frame_hash, value, eyes=None):
+        now = time.monotonic()
+        with self._lock:
+            key = (stream_key, frame_hash)
+            if key in self._entries:
+                self._remove(self._entries[key])
+
+            stream_entries = self._by_stream.setdefault(stream_key, {})
+            if len(stream_entries) >= self.entries_per_stream:
+                # Au-delà de la borne par flux, on évince l'entrée la moins récemment utilisée de ce flux
+                self._remove(min(stream_entries.values(), key=lambda e: e.last_used))
+                self.evicted_lru += 1
+
+            entry = CacheEntry(stream_key, frame_hash, value, now, eyes)
+            self._entries[key] = entry
+            self._by_stream.setdefault(stream_key, {})[frame_hash] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def _remove(self, entry):
+        del self._entries[(entry.stream_key, entry.frame_hash)]
+        stream_entries = self._by_stream[entry.stream_key]
+        del stream_entries[entry.frame_hash]
+        if not stream_entries:
+            del self._by_stream[entry.stream_key]
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            over_bytes = self._bytes > self.max_bytes
+            self._remove(next(iter(self._entries.values())))
+            if over_bytes:
+                self.evicted_bytes += 1
+            else:
+                self.evicted_lru += 1
+
+    def remove_stream(self, stream_key):
+        with self._lock:
+            for entry in list(self._by_stream.get(stream_key, {}).values()):
+                self._remove(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_stream.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Statistiques du cache pour /performance"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': True,
+                'size': len(self._entries),
+                'max_size': self.max_entries,
+                'streams': len(self._by_stream),
+                'memory_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'memory_usage_mb': round(self._bytes / (1024 * 1024), 3),
+                'ttl_seconds': self.ttl_seconds,
+                'max_distance': self.max_distance,
+                'hash_bits': self.hash_size * self.hash_size,
+                'eye_tolerance': self.eye_tolerance,
+                'hits': self.hits,
+                'near_hits': self.near_hits,
+                'eye_rejects': self.eye_rejects,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evicted_lru': self.evicted_lru,
+                'evicted_bytes': self.evicted_bytes,
+                'expired': self.expired
+            }
@@ -0,0 +1,42 @@
+"""Lecture bornée des frames binaires envoyées à /predict (image/jpeg brut ou multipart)"""
+
+import threading
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_local = threading.local()
+
+
+class FrameTooLargeError(ValueError):
+    """La frame dépasse la taille maximale autorisée"""
+
+
+def _thread_buffer(max_bytes):
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None or len(buffer) < max_bytes:
+        buffer = bytearray(max_bytes)
+        _local.buffer = buffer
+    return buffer
+
+
+def read_frame(stream, max_bytes, content_length=None):
+    """Lire `stream` dans le buffer réutilisable du thread et retourner une vue sur les octets lus.
+
+    La vue n'est valide que jusqu'au prochain appel depuis le même thread.
+    Lève FrameTooLargeError si le corps dépasse `max_bytes`.
+    """
+    if content_length is not None and content_length > max_bytes:
+        raise FrameTooLargeError(f'Frame trop volumineuse ({content_length} octets, max {max_bytes})')
+
+    buffer = _thread_buffer(max_bytes)
+    size = 0
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        end = size + len(chunk)
+        if end > max_bytes:
+            raise FrameTooLargeError(f'Frame trop volumineuse (max {max_bytes} octets)')
+        buffer[size:end] = chunk
+        size = end
+    return memoryview(buffer)[:size]
@@ -0,0 +1,31 @@
+"""Configuration gunicorn de production : gunicorn -c gunicorn.conf.py wsgi:app
+
+Avec `preload_app`, wsgi.py est importé dans le maître (modèle chargé une
+fois) avant le fork ; sinon chaque worker charge son propre modèle.
+"""
+
+import os
+
+from config import get_config
+
+app_config = get_config()
+
+bind = f"0.0.0.0:{app_config.PORT}"
+workers = app_config.WSGI_WORKERS
+threads = app_config.WSGI_THREADS
+worker_class = 'gthread'
+preload_app = app_config.WSGI_PRELOAD
+timeout = app_config.WSGI_TIMEOUT
+graceful_timeout = app_config.WSGI_TIMEOUT
+
+
+def post_worker_init(worker):
+    """Dans chaque worker, après le fork et le chargement de l'application"""
+    import wsgi
+    if not app_config.WSGI_PRELOAD:
+        # Pas de préchargement : le modèle est chargé et échauffé dans ce worker
+        import app1
+        app1.detector = app1.startup(background=False)
+    # Éviter que les workers se disputent les cœurs (workers x threads torch <= cœurs)
+    torch_threads = app_config.WSGI_TORCH_THREADS or max(1, (os.cpu_count() or 1) // max(1, workers))
+    wsgi.init_worker(torch_threads)
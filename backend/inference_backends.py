@@ -0,0 +1,159 @@
+"""Backends d'inférence interchangeables (eager, TorchScript, torch.compile, ONNX Runtime)"""
+
+import copy
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+INPUT_SHAPE = (3, 224, 224)
+
+
+class InferenceBackend:
+    """Interface commune : backend(batch Nx3x224x224) -> tenseur de sortie Nx1"""
+    name = 'base'
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+        self.latency_ms = None  # latence mesurée (batch 1) au démarrage
+
+    def __call__(self, batch):
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """Modèle PyTorch exécuté tel quel"""
+    name = 'eager'
+
+    def __call__(self, batch):
+        return self.model(batch)
+
+
+class TorchScriptBackend(InferenceBackend):
+    """TorchScript gelé et optimisé pour l'inférence"""
+    name = 'torchscript'
+
+    def __init__(self, model, device):
+        super().__init__(model, device)
+        self._module = torch.jit.optimize_for_inference(torch.jit.script(model))
+
+    def __call__(self, batch):
+        return self._module(batch)
+
+
+class TorchCompileBackend(InferenceBackend):
+    """torch.compile (Inductor) avec tailles de batch dynamiques"""
+    name = 'compile'
+
+    def __init__(self, model, device):
+        super().__init__(model, device)
+        if not hasattr(torch, 'compile'):
+            raise RuntimeError('torch.compile indisponible')
+        self._module = torch.compile(model, dynamic=True)
+
+    def __call__(self, batch):
+        return self._module(batch)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """Export ONNX exécuté par ONNX Runtime (CPU)"""
+    name = 'onnxruntime'
+
+    def __init__(self, model, device, onnx_path=None):
+        super().__init__(model, device)
+        import onnxruntime as ort
+
+        # Sans chemin explicite, l'export vit dans un dossier temporaire supprimé
+        # une fois la session créée (ONNX Runtime garde le graphe en mémoire)
+        with tempfile.TemporaryDirectory(prefix='mobilenet_drowsiness_') as tmp_dir:
+            path = onnx_path or os.path.join(tmp_dir, 'model.onnx')
+            # Export depuis une copie CPU : le modèle partagé reste sur son device
+            torch.onnx.export(
+                copy.deepcopy(model).cpu().eval(),
+                torch.zeros(1, *INPUT_SHAPE),
+                path,
+                input_names=['input'],
+                output_names=['output'],
+                dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}},
+                opset_version=17
+            )
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.onnx_path = onnx_path
+        self._input_name = self._session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        inputs = batch.detach().cpu().numpy()
+        outputs = self._session.run(None, {self._input_name: inputs})[0]
+        return torch.from_numpy(outputs).to(batch.device)
+
+
+BACKENDS = {
+    'eager': EagerBackend,
+    'torchscript': TorchScriptBackend,
+    'compile': TorchCompileBackend,
+    'onnxruntime': OnnxRuntimeBackend
+}
+
+
+def benchmark_backend(backend, runs=10, warmup=3, batch_size=1):
+    """Latence médiane (ms) du backend sur des entrées synthétiques"""
+    inputs = torch.randn(batch_size, *INPUT_SHAPE, device=backend.device)
+    times = []
+    with torch.no_grad():
+        for _ in range(warmup):
+            backend(inputs)
+        for _ in range(runs):
+            started = time.perf_counter()
+            backend(inputs)
+            times.append((time.perf_counter() - started) * 1000)
+    return float(np.median(times))
+
+
+def build_backend(name, model, device):
+    """Construire le backend `name` et vérifier qu'il produit une sortie (torch.compile est paresseux)"""
+    backend = BACKENDS[name](model, device)
+    with torch.no_grad():
+        backend(torch.zeros(1, *INPUT_SHAPE, device=device))
+    return backend
+
+
+def select_backend(model, device, preferred='torchscript', auto=False, candidates=None, runs=10):
+    """Choisir le backend d'inférence : retourne (backend, rapport de benchmark).
+
+    En mode `auto`, chaque candidat est construit et mesuré sur des entrées
+    synthétiques, et le plus rapide est retenu. Sinon le backend `preferred`
+    est utilisé, avec repli sur eager s'il est indisponible.
+    """
+    report = {}
+    if auto:
+        best = None
+        for name in candidates or list(BACKENDS):
+            try:
+                backend = build_backend(name, model, device)
+                backend.latency_ms = benchmark_backend(backend, runs=runs)
+                report[name] = round(backend.latency_ms, 3)
+                print(f"⏱️ Backend {name}: {backend.latency_ms:.2f}ms")
+                if best is None or backend.latency_ms < best.latency_ms:
+                    best = backend
+            except Exception as e:
+                report[name] = f'indisponible: {e}'
+                print(f"⚠️ Backend {name} indisponible: {e}")
+        if best is not None:
+            return best, report
+        preferred = 'eager'
+
+    try:
+        backend = build_backend(preferred, model, device)
+    except Exception as e:
+        print(f"⚠️ Backend {preferred} indisponible ({e}), repli sur eager")
+        report[preferred] = f'indisponible: {e}'
+        backend = build_backend('eager', model, device)
+    backend.latency_ms = benchmark_backend(backend, runs=runs)
+    report[backend.name] = round(backend.latency_ms, 3)
+    return backend, report
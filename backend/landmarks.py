@@ -0,0 +1,100 @@
+"""Landmarks 68 points et EAR vectorisé : premier étage de la cascade avant le CNN"""
+
+import math
+import threading
+
+import numpy as np
+
+# Indices des yeux dans le modèle 68 points (iBUG 300-W)
+LEFT_EYE = slice(36, 42)
+RIGHT_EYE = slice(42, 48)
+EYES = slice(36, 48)
+
+
+def shape_to_array(shape):
+    """dlib.full_object_detection -> tableau float32 (68, 2)"""
+    parts = shape.parts()
+    return np.fromiter((c for p in parts for c in (p.x, p.y)), dtype=np.float32,
+                       count=2 * len(parts)).reshape(-1, 2)
+
+
+def eye_aspect_ratios(landmarks):
+    """EAR des deux yeux en quelques opérations NumPy : (..., 68, 2) -> (..., 2).
+
+    EAR = (|p2 - p6| + |p3 - p5|) / (2 |p1 - p4|) pour chaque oeil ; accepte
+    aussi un lot de visages (N, 68, 2).
+    """
+    eyes = landmarks[..., EYES, :].reshape(landmarks.shape[:-2] + (2, 6, 2))
+    vertical = np.linalg.norm(eyes[..., [1, 2], :] - eyes[..., [5, 4], :], axis=-1).sum(axis=-1)
+    horizontal = np.linalg.norm(eyes[..., 0, :] - eyes[..., 3, :], axis=-1)
+    return np.divide(vertical, 2.0 * horizontal, out=np.zeros_like(horizontal), where=horizontal > 0)
+
+
+def mean_ear(landmarks):
+    """EAR moyen des deux yeux (float pour un visage, tableau (N,) pour un lot)"""
+    ears = eye_aspect_ratios(landmarks).mean(axis=-1)
+    return float(ears) if ears.ndim == 0 else ears
+
+
+class EarCascade:
+    """Classifieur de premier étage sur l'EAR.
+
+    Yeux nettement ouverts (EAR >= open_threshold) ou nettement fermés
+    (EAR <= closed_threshold) : une probabilité de somnolence est retournée
+    directement. Entre les deux, `classify` retourne None et la frame passe
+    au CNN. La probabilité suit une logistique centrée entre les deux seuils
+    (0.1 au seuil d'ouverture, 0.9 au seuil de fermeture), sur la même échelle
+    [0, 1] que la sortie du CNN (nn.Sigmoid, sans seconde sigmoïde) : le
+    lissage et le seuil de 0.5 traitent les deux étages de la même façon.
+    """
+
+    def __init__(self, open_threshold=0.30, closed_threshold=0.18):
+        if closed_threshold >= open_threshold:
+            raise ValueError('closed_threshold doit être inférieur à open_threshold')
+        self.open_threshold = open_threshold
+        self.closed_threshold = closed_threshold
+        self._midpoint = (open_threshold + closed_threshold) / 2.0
+        self._slope = 2.0 * math.log(9.0) / (open_threshold - closed_threshold)
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.early_open = 0
+        self.early_closed = 0
+        self.no_landmarks = 0
+        self._landmark_ms = 0.0
+
+    def probability(self, ear):
+        return 1.0 / (1.0 + math.exp(-self._slope * (self._midpoint - ear)))
+
+    def classify(self, ear, elapsed_ms=0.0):
+        """Probabilité de somnolence si l'EAR est sans ambiguïté, sinon None (CNN nécessaire)"""
+        with self._lock:
+            self.frames += 1
+            self._landmark_ms += elapsed_ms
+            if ear is None:
+                self.no_landmarks += 1
+                return None
+            if ear >= self.open_threshold:
+                self.early_open += 1
+            elif ear <= self.closed_threshold:
+                self.early_closed += 1
+            else:
+                return None
+        return self.probability(ear)
+
+    def stats(self):
+        with self._lock:
+            early = self.early_open + self.early_closed
+            return {
+                'enabled': True,
+                'open_threshold': self.open_threshold,
+                'closed_threshold': self.closed_threshold,
+                'frames': self.frames,
+                'early_open': self.early_open,
+                'early_closed': self.early_closed,
+                'no_landmarks': self.no_landmarks,
+                'cnn_frames': self.frames - early,
+                'early_exit_rate': round(early / self.frames, 4) if self.frames else 0.0,
+                'avg_landmark_ms': round(self._landmark_ms / self.frames, 3) if self.frames else 0.0
+            }
+
@@ -0,0 +1,138 @@
+"""Imports différés des dépendances optionnelles et profil des imports au démarrage.
+
+`optional_module('dlib')` n'importe le module qu'au premier usage (et une
+seule fois) ; `module_available('dlib')` vérifie sa présence sans l'importer.
+`ImportProfiler` mesure le temps d'exécution de chaque module importé, à la
+manière de `python -X importtime` mais consultable à chaud (/startup_report).
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+_modules = {}  # nom -> module importé, ou None si indisponible
+_load_ms = {}  # nom -> durée du premier import (ms)
+_lock = threading.Lock()
+
+
+def module_available(name):
+    """Le module est-il installé ? (recherche du fichier, sans exécuter le module)"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def optional_module(name):
+    """Importer `name` au premier appel ; None s'il n'est pas installé ou échoue à l'import"""
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _modules:
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(name)
+            except Exception as e:
+                module = None
+                print(f"⚠️ Module optionnel {name} indisponible: {e}")
+            _load_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+            _modules[name] = module
+    return _modules[name]
+
+
+def lazy_import_stats():
+    """Modules optionnels chargés à la demande : disponibilité et durée du premier import"""
+    return {name: {'loaded': module is not None, 'load_ms': _load_ms.get(name)}
+            for name, module in _modules.items()}
+
+
+class ImportProfiler:
+    """Chronométrage des imports (temps propre et cumulé par module).
+
+    Placé en tête de `sys.meta_path`, il délègue la recherche aux autres
+    finders et n'enveloppe que `exec_module` du loader trouvé, le temps
+    d'exécuter le module. À désinstaller une fois le démarrage terminé.
+    """
+
+    def __init__(self):
+        self.records = {}  # nom -> [temps propre (s), temps cumulé (s)]
+        self._stack = []  # [temps des sous-imports] par import en cours
+        self._finding = threading.local()
+        self.started = None
+        self.finished = None
+
+    def install(self):
+        if self not in sys.meta_path:
+            self.started = time.perf_counter()
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+            self.finished = time.perf_counter()
+
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._finding, 'active', False) or threading.current_thread() is not threading.main_thread():
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+
+        loader = spec.loader
+        # Les loaders builtin/frozen sont des classes partagées : ne pas y toucher
+        if loader is None or isinstance(loader, type) or not hasattr(loader, 'exec_module'):
+            return spec
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            self._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.records[name] = [elapsed - children, elapsed]
+                try:
+                    del loader.exec_module
+                except AttributeError:
+                    pass
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            pass  # loader sans __dict__ (extension C) : module non chronométré
+        return spec
+
+    def report(self, top=25):
+        """Modules les plus coûteux (temps cumulé) et temps total passé dans les imports"""
+        ranked = sorted(self.records.items(), key=lambda item: item[1][1], reverse=True)
+        # Temps total = somme des imports de premier niveau (temps propre de tous les modules)
+        total = sum(own for own, _ in self.records.values())
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            'modules': len(self.records),
+            'import_ms': round(total * 1000, 1),
+            'wall_ms': round((end - self.started) * 1000, 1) if self.started is not None else None,
+            'top': [{'module': name, 'self_ms': round(own * 1000, 2), 'cumulative_ms': round(cumulative * 1000, 2)}
+                    for name, (own, cumulative) in ranked[:top]],
+            'lazy': lazy_import_stats()
+        }
@@ -0,0 +1,199 @@
+"""Logs structurés, échantillonnés et non bloquants.
+
+Les modules obtiennent un logger par sous-système (`get_logger('predict')`).
+Les enregistrements passent par une file (QueueHandler) : le formatage et
+l'écriture (console, fichier LOG_FILE) se font dans le thread du
+QueueListener, hors du thread de la requête. Les messages par frame
+(DEBUG/INFO) peuvent être échantillonnés par sous-système : avec un taux de
+0.01, une frame sur cent est journalisée. WARNING et au-delà ne sont jamais
+échantillonnés.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+ROOT_LOGGER = 'drowsiness'
+
+_listener = None
+
+
+def get_logger(subsystem):
+    """Logger d'un sous-système (detector, face, predict, cache, stream, workers, db...)"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{subsystem}')
+
+
+def parse_sample_rates(spec):
+    """'predict=0.01,face=0.1' -> {'predict': 0.01, 'face': 0.1}"""
+    rates = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, rate = item.split('=', 1)
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            print(f"⚠️ Taux d'échantillonnage ignoré: {item!r}")
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Ne laisse passer qu'un message DEBUG/INFO sur 1/taux, par sous-système.
+
+    L'échantillonnage est déterministe (compteur) : un taux de 0.1 garde
+    exactement un message sur dix, sans tirage aléatoire.
+    """
+
+    def __init__(self, rates=None, default_rate=1.0):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self._counters = {}
+        self.dropped = 0
+        self.queue_handler = None
+
+    def stats(self):
+        return {
+            'rates': self.rates,
+            'default_rate': self.default_rate,
+            'sampled_out': self.dropped,
+            'queue_dropped': self.queue_handler.dropped if self.queue_handler is not None else 0
+        }
+
+    def _rate(self, name):
+        subsystem = name[len(ROOT_LOGGER) + 1:] if name.startswith(ROOT_LOGGER + '.') else name
+        return self.rates.get(subsystem, self.default_rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            self.dropped += 1
+            return False
+        counter = self._counters.get(record.name)
+        if counter is None:
+            counter = self._counters.setdefault(record.name, itertools.count())
+        # next() sur itertools.count est atomique sous le GIL
+        keep = next(counter) % round(1 / rate) == 0
+        if not keep:
+            self.dropped += 1
+        return keep
+
+
+class StructuredFormatter(logging.Formatter):
+    """Une ligne par message : texte lisible suivi des champs `extra={'fields': {...}}` en clé=valeur, ou JSON"""
+
+    def __init__(self, json_lines=False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record):
+        fields = getattr(record, 'fields', None) or {}
+        if self.json_lines:
+            payload = {
+                'ts': round(record.created, 3),
+                'level': record.levelname,
+                'logger': record.name,
+                'thread': record.threadName,
+                'message': record.getMessage(),
+                **fields
+            }
+            if record.exc_info:
+                payload['exception'] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created))
+        line = f"{timestamp}.{int(record.msecs):03d} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class _PreformattedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui laisse le formatage au thread du listener.
+
+    Le prepare() standard formate le message dans le thread appelant ; ici
+    seuls les arguments sont figés (getMessage) pour rester sûrs si des
+    objets mutables sont passés.
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level='INFO', log_file=None, sample_rates=None, default_sample_rate=1.0,
+                  json_lines=False, queued=True, queue_size=10000):
+    """Configurer le logger racine de l'application ; retourne le SamplingFilter (statistiques).
+
+    Avec `queued`, les messages sont déposés dans une file bornée ; si elle
+    est pleine (disque bloqué), les messages sont perdus plutôt que de
+    bloquer les requêtes.
+    """
+    global _listener
+    stop_logging()
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers.clear()
+    logger.filters.clear()
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+
+    formatter = StructuredFormatter(json_lines=json_lines)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=10 * 1024 * 1024, backupCount=3, encoding='utf-8'
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    sampling = SamplingFilter(sample_rates, default_sample_rate)
+    if queued:
+        log_queue = queue.Queue(maxsize=queue_size)
+        queue_handler = _PreformattedQueueHandler(log_queue)
+        queue_handler.addFilter(sampling)
+        sampling.queue_handler = queue_handler
+        logger.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            handler.addFilter(sampling)
+            logger.addHandler(handler)
+    return sampling
+
+
+def log_queue_depth():
+    """Messages en attente d'écriture (0 sans file)"""
+    return _listener.queue.qsize() if _listener is not None else 0
+
+
+def stop_logging():
+    """Vider la file et arrêter le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
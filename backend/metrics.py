@@ -0,0 +1,270 @@
+"""Métriques du chemin chaud : histogrammes de latence par étape, compteurs, jauges.
+
+Chaque thread écrit dans ses propres compteurs (aucun verrou par mesure) ;
+un verrou n'est pris qu'à la création des compteurs d'un nouveau thread et
+à la lecture, qui fusionne les threads. Les compteurs des threads terminés
+sont repliés dans un total « retraité », à la lecture et à l'arrivée d'un
+nouveau thread, pour que la liste des threads ne grossisse pas avec le
+serveur Flask (un thread par requête), même si /metrics n'est jamais lu.
+
+Les métriques sont exposées au format texte de Prometheus (/metrics) et en
+résumé p50/p95/p99 (/performance).
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Bornes des buckets en secondes : de 0.1 ms à 10 s, échelle ~x2
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(label_name, label_value, extra=None):
+    pairs = []
+    if label_name is not None:
+        pairs.append((label_name, label_value))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = ('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+class _PerThread:
+    """Cellules par thread : dict étiquette -> valeur, créé au premier accès du thread"""
+
+    def __init__(self, new_cell, merge):
+        self._new_cell = new_cell
+        self._merge = merge
+        self._local = threading.local()
+        self._cells = []  # (référence faible au thread, dict étiquette -> cellule)
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def cells(self):
+        cells = getattr(self._local, 'cells', None)
+        if cells is None:
+            cells = {}
+            self._local.cells = cells
+            with self._lock:
+                # Replier ici aussi : la mémoire reste bornée même sans lecture de /metrics
+                self._fold_dead()
+                self._cells.append((weakref.ref(threading.current_thread()), cells))
+        return cells
+
+    def cell(self, label):
+        cells = self.cells()
+        cell = cells.get(label)
+        if cell is None:
+            cell = cells[label] = self._new_cell()
+        return cell
+
+    def _fold_dead(self):
+        """Replier les cellules des threads terminés dans le total retraité (sous `self._lock`)"""
+        alive = []
+        for ref, cells in self._cells:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                # Thread terminé : plus d'écriture possible, on le replie définitivement
+                for label, cell in cells.items():
+                    self._retired[label] = self._merge(self._retired.get(label), cell)
+            else:
+                alive.append((ref, cells))
+        self._cells = alive
+
+    def collect(self):
+        """Fusion de tous les threads : dict étiquette -> cellule agrégée"""
+        with self._lock:
+            self._fold_dead()
+            merged = {label: self._merge(None, cell) for label, cell in self._retired.items()}
+            for _, cells in self._cells:
+                for label, cell in list(cells.items()):
+                    merged[label] = self._merge(merged.get(label), cell)
+        return merged
+
+
+class Counter:
+    """Compteur monotone, éventuellement étiqueté (une seule étiquette)"""
+
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._values = _PerThread(lambda: [0.0], lambda total, cell: [(total[0] if total else 0.0) + cell[0]])
+
+    def inc(self, label_value=None, amount=1):
+        self._values.cell(label_value)[0] += amount
+
+    def values(self):
+        return {label: cell[0] for label, cell in self._values.collect().items()}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for label, value in sorted(self.values().items(), key=lambda item: str(item[0])):
+            lines.append(f'{self.name}{_format_labels(self.label, label)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Histogramme à buckets fixes (secondes), éventuellement étiqueté (une seule étiquette)"""
+
+    def __init__(self, name, help_text, label=None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        size = len(self.buckets) + 1  # dernier bucket : +Inf
+
+        def new_cell():
+            return [[0] * size, 0.0]  # comptes par bucket (non cumulés), somme
+
+        def merge(total, cell):
+            if total is None:
+                return [list(cell[0]), cell[1]]
+            return [[a + b for a, b in zip(total[0], cell[0])], total[1] + cell[1]]
+
+        self._values = _PerThread(new_cell, merge)
+
+    def observe(self, value, label_value=None):
+        cell = self._values.cell(label_value)
+        cell[0][bisect_left(self.buckets, value)] += 1
+        cell[1] += value
+
+    @contextmanager
+    def time(self, label_value=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, label_value)
+
+    def quantile(self, counts, q):
+        """Estimation d'un quantile par interpolation linéaire dans le bucket qui le contient"""
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self):
+        """Par étiquette : nombre, moyenne et p50/p95/p99 en millisecondes"""
+        result = {}
+        for label, (counts, total) in self._values.collect().items():
+            count = sum(counts)
+            result[label] = {
+                'count': count,
+                'mean_ms': round(total / count * 1000, 3) if count else 0.0,
+                'p50_ms': round(self.quantile(counts, 0.50) * 1000, 3),
+                'p95_ms': round(self.quantile(counts, 0.95) * 1000, 3),
+                'p99_ms': round(self.quantile(counts, 0.99) * 1000, 3)
+            }
+        return result
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for label, (counts, total) in sorted(self._values.collect().items(), key=lambda item: str(item[0])):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.label, label, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label, label)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Jauge lue à la demande (profondeur de file, flux actifs...) : `fn` retourne un nombre ou un dict étiquette -> nombre"""
+
+    def __init__(self, name, help_text, fn, label=None):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.label = label
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge']
+        try:
+            value = self.fn()
+        except Exception:
+            return lines
+        if isinstance(value, dict):
+            for label, v in value.items():
+                lines.append(f'{self.name}{_format_labels(self.label, label)} {_format_value(v)}')
+        elif value is not None:
+            lines.append(f'{self.name} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, label=None):
+        return self._register(Counter(name, help_text, label))
+
+    def histogram(self, name, help_text, label=None, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, label, buckets))
+
+    def gauge(self, name, help_text, fn, label=None):
+        """(Re)définir une jauge : la dernière fonction enregistrée l'emporte"""
+        gauge = Gauge(name, help_text, fn, label)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self):
+        """Exposition texte Prometheus (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'drowsiness_stage_seconds', "Durée de chaque étape du traitement d'une frame", label='stage'
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'drowsiness_request_seconds', 'Durée des requêtes HTTP par endpoint', label='endpoint'
+)
+REQUESTS = REGISTRY.counter('drowsiness_requests_total', 'Requêtes HTTP par endpoint', label='endpoint')
+ERRORS = REGISTRY.counter('drowsiness_errors_total', 'Requêtes en erreur par endpoint', label='endpoint')
+
+
+def observe_stage(stage, started):
+    """Enregistrer la durée d'une étape commencée à `started` (time.perf_counter()) ; retourne l'instant de fin"""
+    now = time.perf_counter()
+    STAGE_SECONDS.observe(now - started, stage)
+    return now
+
+
+def stage(name):
+    """Chronométrer un bloc : `with stage('db_write'): ...`"""
+    return STAGE_SECONDS.time(name)
@@ -0,0 +1,88 @@
+"""Mode multi-visages : identifiants de piste stables et état temporel par visage"""
+
+import sys
+
+from stream_state import StreamState
+
+
+def iou(a, b):
+    """Intersection sur union de deux boîtes (x, y, w, h)"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class FaceSlot:
+    """Piste d'un visage : dernière boîte et état de lissage propre (StreamState)"""
+    __slots__ = ('track_id', 'box', 'missed', 'state')
+
+    def __init__(self, track_id, box, state):
+        self.track_id = track_id
+        self.box = box
+        self.missed = 0
+        self.state = state
+
+
+class MultiFaceTracks:
+    """Pistes des visages d'un flux, associées d'une frame à l'autre par IoU.
+
+    L'association est gloutonne (paires triées par IoU décroissante) : avec
+    deux à quatre visages par frame, c'est exact en pratique et sans coût.
+    Une piste non revue pendant `max_missed` frames est abandonnée.
+    """
+
+    def __init__(self, stream_key, buffer_size=5, iou_threshold=0.3, max_missed=5):
+        self.stream_key = stream_key
+        self.buffer_size = buffer_size
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.slots = {}  # track_id -> FaceSlot
+        self._next_id = 1
+
+    def assign(self, boxes):
+        """Associer chaque boîte à une piste (existante ou nouvelle) : liste de FaceSlot alignée sur `boxes`"""
+        pairs = sorted(
+            ((iou(slot.box, box), track_id, i)
+             for track_id, slot in self.slots.items()
+             for i, box in enumerate(boxes)),
+            reverse=True
+        )
+        assigned = [None] * len(boxes)
+        matched = set()
+        for overlap, track_id, i in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if assigned[i] is None and track_id not in matched:
+                assigned[i] = self.slots[track_id]
+                matched.add(track_id)
+
+        for track_id, slot in list(self.slots.items()):
+            if track_id not in matched:
+                slot.missed += 1
+                if slot.missed > self.max_missed:
+                    del self.slots[track_id]
+
+        for i, box in enumerate(boxes):
+            slot = assigned[i]
+            if slot is None:
+                track_id = self._next_id
+                self._next_id += 1
+                slot = FaceSlot(track_id, box, StreamState(f"{self.stream_key}#face{track_id}", self.buffer_size))
+                self.slots[track_id] = slot
+                assigned[i] = slot
+            slot.box = box
+            slot.missed = 0
+        return assigned
+
+    def __len__(self):
+        return len(self.slots)
+
+    def memory_bytes(self):
+        return sys.getsizeof(self.slots) + sum(
+            sys.getsizeof(slot) + slot.state.memory_bytes() for slot in self.slots.values()
+        )
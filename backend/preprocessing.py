@@ -0,0 +1,101 @@
+"""Prétraitement fusionné : octets JPEG -> tableau RGB unique -> tenseur d'entrée normalisé"""
+
+import base64
+import io
+import threading
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+def image_bytes_from_base64(image):
+    """Décoder une chaîne base64 (avec ou sans préfixe data URL) en octets"""
+    if 'base64,' in image:
+        image = image.split(',')[1]
+    return base64.b64decode(image)
+
+
+def decode_image(data, max_width=0):
+    """Décoder une image (octets ou base64) en tableau RGB uint8, en un seul décodage.
+
+    Pour un JPEG nettement plus large que `max_width`, le décodeur travaille
+    directement à échelle réduite (1/2, 1/4, 1/8 via PIL `draft`), ce qui évite
+    de décoder puis redimensionner la frame complète.
+    """
+    if isinstance(data, str):
+        data = image_bytes_from_base64(data)
+
+    image = Image.open(io.BytesIO(data))
+    if max_width and image.format == 'JPEG' and image.width >= 2 * max_width:
+        image.draft('RGB', (max_width, image.height * max_width // image.width))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.asarray(image)
+
+
+def synthetic_jpeg(width, height, seed=0, quality=80):
+    """Frame JPEG synthétique (octets) avec un motif de visage grossier (échauffement, benchmarks)"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    center = (width // 2, height // 2)
+    axes = (width // 8, height // 5)
+    cv2.ellipse(image, center, axes, 0, 0, 360, (200, 170, 150), -1)
+    cv2.circle(image, (center[0] - axes[0] // 2, center[1] - axes[1] // 4), axes[0] // 6, (30, 30, 30), -1)
+    cv2.circle(image, (center[0] + axes[0] // 2, center[1] - axes[1] // 4), axes[0] // 6, (30, 30, 30), -1)
+    _, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes()
+
+
+class TensorPreprocessor:
+    """Redimensionnement + normalisation écrits dans un tenseur float32 préalloué (un par thread)"""
+
+    def __init__(self, size=224, mean=IMAGENET_MEAN, std=IMAGENET_STD):
+        self.size = size
+        std = np.asarray(std, dtype=np.float32)
+        # (x / 255 - mean) / std == x * scale + offset
+        self._scale = (1.0 / (255.0 * std)).reshape(3, 1, 1)
+        self._offset = (-np.asarray(mean, dtype=np.float32) / std).reshape(3, 1, 1)
+        self._local = threading.local()
+
+    def _buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = np.empty((1, 3, self.size, self.size), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer
+
+    def _fill(self, out, image_rgb):
+        height, width = image_rgb.shape[:2]
+        interpolation = cv2.INTER_AREA if (width > self.size or height > self.size) else cv2.INTER_LINEAR
+        resized = cv2.resize(image_rgb, (self.size, self.size), interpolation=interpolation)
+        np.multiply(resized.transpose(2, 0, 1), self._scale, out=out)
+        np.add(out, self._offset, out=out)
+
+    def to_tensor(self, image_rgb):
+        """Tableau RGB uint8 (HxWx3) -> tenseur 1x3xSxS normalisé.
+
+        Le tenseur partage la mémoire du buffer du thread appelant : il doit
+        être consommé (forward) avant le prochain appel depuis ce même thread.
+        """
+        buffer = self._buffer()
+        self._fill(buffer[0], image_rgb)
+        return torch.from_numpy(buffer)
+
+    def to_batch(self, images_rgb):
+        """Liste de tableaux RGB -> tenseur Nx3xSxS normalisé (un seul forward pour N visages).
+
+        Même contrat que `to_tensor` : buffer par thread, agrandi au besoin.
+        """
+        count = len(images_rgb)
+        batch = getattr(self._local, 'batch', None)
+        if batch is None or batch.shape[0] < count:
+            batch = np.empty((count, 3, self.size, self.size), dtype=np.float32)
+            self._local.batch = batch
+        for i, image_rgb in enumerate(images_rgb):
+            self._fill(batch[i], image_rgb)
+        return torch.from_numpy(batch[:count])
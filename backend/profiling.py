@@ -0,0 +1,363 @@
+"""Capture de profils à chaud sur le trafic réel (/admin/profile).
+
+Un profil est « armé » pour les N prochains appels ou pendant T secondes :
+les méthodes ciblées (DrowsinessDetector.predict...) sont alors remplacées
+sur l'instance par une version instrumentée, puis restaurées à la fin de la
+capture. Désarmé, le chemin chaud reste exactement le code d'origine : aucun
+test ni indirection par requête.
+
+Modes :
+- `cprofile` : graphe d'appels Python (pstats), appels sérialisés pendant la capture ;
+- `sampling` : échantillonnage statistique des piles des threads en cours
+  d'appel (pas de sérialisation, surcoût quasi nul pour les requêtes) ;
+- `torch` : torch.profiler, temps et mémoire par opérateur du modèle.
+`memory=True` ajoute les principales allocations Python (tracemalloc).
+"""
+
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from functools import wraps
+
+MODES = ('cprofile', 'sampling', 'torch')
+
+
+class ProfileCapture:
+    """Une capture : instrumentation des appels et agrégation du rapport"""
+
+    def __init__(self, capture_id, mode, max_calls=None, max_seconds=None, top=30,
+                 sample_interval_ms=5.0, memory=False):
+        if mode not in MODES:
+            raise ValueError(f"Mode de profilage inconnu: {mode} (attendu: {', '.join(MODES)})")
+        if not max_calls and not max_seconds:
+            raise ValueError('Préciser un nombre de requêtes ou une durée')
+        self.id = capture_id
+        self.mode = mode
+        self.max_calls = max_calls
+        self.max_seconds = max_seconds
+        self.top = top
+        self.sample_interval = sample_interval_ms / 1000
+        self.memory = memory
+
+        self.calls = 0
+        self.errors = 0
+        self.call_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self.state = 'armed'
+        self.report = None
+
+        self._lock = threading.Lock()
+        self._serial = threading.Lock()  # cProfile / torch.profiler : un seul profil actif à la fois
+        self._stats = None
+        self._torch_ops = {}
+        self._active_threads = set()
+        self._stacks = Counter()
+        self._samples = 0
+        self._sampler = None
+        self._stop = threading.Event()
+
+    # Démarrage / arrêt
+
+    def start(self):
+        self.started_at = time.time()
+        if self.memory:
+            tracemalloc.start(10)
+        if self.mode == 'sampling':
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def expired(self):
+        if self.max_calls and self.calls >= self.max_calls:
+            return True
+        return bool(self.max_seconds) and time.time() - self.started_at >= self.max_seconds
+
+    def finish(self):
+        """Arrêter la capture et construire le rapport (une seule fois)"""
+        with self._lock:
+            if self.state != 'armed':
+                return self.report
+            self.state = 'done'
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+        # Attendre les appels encore en cours de profilage
+        with self._serial:
+            pass
+        self.finished_at = time.time()
+        self.report = self._build_report()
+        if self.memory:
+            tracemalloc.stop()
+        return self.report
+
+    # Instrumentation
+
+    def call(self, fn, *args, **kwargs):
+        """Exécuter un appel ciblé sous le profileur du mode"""
+        started = time.perf_counter()
+        try:
+            if self.mode == 'cprofile':
+                return self._call_cprofile(fn, args, kwargs)
+            if self.mode == 'torch':
+                return self._call_torch(fn, args, kwargs)
+            return self._call_sampled(fn, args, kwargs)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.calls += 1
+                self.call_seconds += time.perf_counter() - started
+
+    def _call_cprofile(self, fn, args, kwargs):
+        with self._serial:
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(fn, *args, **kwargs)
+            finally:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+
+    def _call_torch(self, fn, args, kwargs):
+        import torch
+        from torch.profiler import ProfilerActivity, profile
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        with self._serial:
+            with profile(activities=activities, record_shapes=True, profile_memory=True) as prof:
+                result = fn(*args, **kwargs)
+            for event in prof.key_averages():
+                op = self._torch_ops.setdefault(event.key, {
+                    'calls': 0, 'cpu_total_us': 0.0, 'self_cpu_us': 0.0,
+                    'cuda_total_us': 0.0, 'cpu_memory_bytes': 0
+                })
+                op['calls'] += event.count
+                op['cpu_total_us'] += event.cpu_time_total
+                op['self_cpu_us'] += event.self_cpu_time_total
+                op['cuda_total_us'] += getattr(event, 'cuda_time_total', 0.0) or 0.0
+                op['cpu_memory_bytes'] += getattr(event, 'self_cpu_memory_usage', 0) or 0
+            return result
+
+    def _call_sampled(self, fn, args, kwargs):
+        thread_id = threading.get_ident()
+        self._active_threads.add(thread_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._active_threads.discard(thread_id)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            active = tuple(self._active_threads)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id in active:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self._stacks[tuple(reversed(stack))] += 1
+                self._samples += 1
+
+    # Rapport
+
+    def _build_report(self):
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        report = {
+            'id': self.id,
+            'mode': self.mode,
+            'calls': self.calls,
+            'errors': self.errors,
+            'duration_s': round(elapsed, 3),
+            'avg_call_ms': round(self.call_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.mode == 'cprofile':
+            report.update(self._cprofile_report())
+        elif self.mode == 'torch':
+            report['top_ops'] = sorted(
+                ({'op': name, **{k: round(v, 1) if isinstance(v, float) else v for k, v in op.items()}}
+                 for name, op in self._torch_ops.items()),
+                key=lambda op: op['self_cpu_us'], reverse=True
+            )[:self.top]
+        else:
+            report.update(self._sampling_report())
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            report['allocations'] = [
+                {'location': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top]
+            ]
+        return report
+
+    def _cprofile_report(self):
+        if self._stats is None:
+            return {'functions': [], 'text': ''}
+        stream = io.StringIO()
+        self._stats.stream = stream
+        self._stats.sort_stats('cumulative').print_stats(self.top)
+        functions = []
+        for (filename, line, name), (cc, nc, tt, ct, callers) in self._stats.stats.items():
+            functions.append({
+                'function': f"{name} ({os.path.basename(filename)}:{line})",
+                'calls': nc,
+                'self_ms': round(tt * 1000, 3),
+                'cumulative_ms': round(ct * 1000, 3),
+                'callers': len(callers)
+            })
+        functions.sort(key=lambda f: f['cumulative_ms'], reverse=True)
+        return {'functions': functions[:self.top], 'text': stream.getvalue()}
+
+    def _sampling_report(self):
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self._stacks.items():
+            self_counts[stack[-1]] += count
+            for frame in set(stack):
+                total_counts[frame] += count
+        samples = self._samples or 1
+        return {
+            'samples': self._samples,
+            'interval_ms': self.sample_interval * 1000,
+            'top_self': [{'function': name, 'samples': count, 'percent': round(100 * count / samples, 1)}
+                         for name, count in self_counts.most_common(self.top)],
+            'top_cumulative': [{'function': name, 'samples': count, 'percent': round(100 * count / samples, 1)}
+                               for name, count in total_counts.most_common(self.top)],
+            # Format « folded » (flamegraph.pl, speedscope)
+            'folded': [f"{';'.join(stack)} {count}" for stack, count in self._stacks.most_common(200)]
+        }
+
+    def status(self):
+        return {
+            'id': self.id,
+            'mode': self.mode,
+            'state': self.state,
+            'calls': self.calls,
+            'max_calls': self.max_calls,
+            'max_seconds': self.max_seconds,
+            'elapsed_s': round(time.time() - self.started_at, 3) if self.started_at else 0.0
+        }
+
+
+class ProfilerController:
+    """Arme une capture sur des méthodes d'une instance et la désarme à son terme"""
+
+    def __init__(self, report_dir=None, keep_reports=5):
+        self.report_dir = report_dir
+        self.capture = None
+        self.reports = deque(maxlen=keep_reports)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._patched = []  # (instance, nom de méthode)
+        self._overridden = []  # (instance, attribut, valeur d'origine)
+        self._timer = None
+
+    @property
+    def armed(self):
+        return self.capture is not None and self.capture.state == 'armed'
+
+    def arm(self, target, methods, mode, max_calls=None, max_seconds=None, overrides=None, **options):
+        """Instrumenter `target.<methods>` jusqu'à max_calls appels ou max_seconds secondes.
+
+        `overrides` (attribut -> valeur) est appliqué à `target` pendant la
+        capture puis restauré, par exemple pour que le forward s'exécute dans
+        le thread profilé plutôt que dans celui du micro-batching.
+        """
+        with self._lock:
+            if self.armed:
+                raise RuntimeError('Une capture est déjà en cours')
+            capture = ProfileCapture(next(self._ids), mode, max_calls, max_seconds, **options)
+            capture.start()
+            self.capture = capture
+            for name, value in (overrides or {}).items():
+                self._overridden.append((target, name, getattr(target, name)))
+                setattr(target, name, value)
+            for name in methods:
+                original = getattr(target, name)
+                setattr(target, name, self._instrumented(capture, original))
+                self._patched.append((target, name))
+            if max_seconds:
+                self._timer = threading.Timer(max_seconds, self.disarm)
+                self._timer.daemon = True
+                self._timer.start()
+        return capture.status()
+
+    def _instrumented(self, capture, original):
+        @wraps(original)
+        def profiled(*args, **kwargs):
+            if capture.state != 'armed':
+                return original(*args, **kwargs)
+            try:
+                return capture.call(original, *args, **kwargs)
+            finally:
+                if capture.expired():
+                    self.disarm()
+        return profiled
+
+    def disarm(self):
+        """Restaurer les méthodes d'origine, finaliser et conserver le rapport"""
+        with self._lock:
+            capture = self.capture
+            if capture is None or capture.state != 'armed':
+                return None
+            for target, name in self._patched:
+                try:
+                    delattr(target, name)  # retour à la méthode de la classe
+                except AttributeError:
+                    pass
+            self._patched = []
+            for target, name, value in reversed(self._overridden):
+                setattr(target, name, value)
+            self._overridden = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        report = capture.finish()
+        self.reports.append(report)
+        self._save(capture)
+        return report
+
+    def _save(self, capture):
+        if not self.report_dir:
+            return
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            base = os.path.join(self.report_dir, f"profile_{capture.id}_{capture.mode}_{int(capture.started_at)}")
+            with open(base + '.json', 'w') as f:
+                json.dump(capture.report, f, indent=2)
+            if capture.mode == 'cprofile' and capture._stats is not None:
+                capture._stats.dump_stats(base + '.prof')  # snakeviz, pstats
+            capture.report['saved_to'] = base + '.json'
+        except OSError as e:
+            print(f"⚠️ Rapport de profilage non enregistré: {e}")
+
+    def get_report(self, capture_id):
+        for report in self.reports:
+            if report['id'] == capture_id:
+                return report
+        return None
+
+    def status(self):
+        return {
+            'armed': self.armed,
+            'capture': self.capture.status() if self.capture is not None else None,
+            'reports': [{'id': r['id'], 'mode': r['mode'], 'calls': r['calls'], 'duration_s': r['duration_s']}
+                        for r in self.reports]
+        }
@@ -0,0 +1,113 @@
+"""Quantification INT8 de MobileNetDrowsiness pour l'inférence CPU"""
+
+import copy
+import io
+import sqlite3
+
+import torch
+import torch.nn as nn
+
+PRECISIONS = ('fp32', 'int8', 'int8_static', 'int8_dynamic')
+
+
+def select_quantized_engine():
+    """Choisir le moteur quantifié disponible (x86 > fbgemm > qnnpack)"""
+    supported = torch.backends.quantized.supported_engines
+    for engine in ('x86', 'fbgemm', 'qnnpack'):
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    return None
+
+
+def load_calibration_tensors(db_path, to_tensor, limit=200, offset=0):
+    """Tenseurs d'entrée (1x3x224x224) construits à partir des frames de `session_frames`.
+
+    `to_tensor(frame_data)` applique le même prétraitement que l'inférence
+    (détection, recadrage, normalisation) et doit retourner un tenseur propre
+    (non partagé avec un buffer réutilisé).
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT frame_data FROM session_frames
+            WHERE frame_data IS NOT NULL
+            ORDER BY id
+            LIMIT ? OFFSET ?
+        ''', (limit, offset))
+        rows = cursor.fetchall()
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Frames de calibration indisponibles: {e}")
+        return []
+
+    tensors = []
+    for (frame_data,) in rows:
+        try:
+            tensors.append(to_tensor(frame_data))
+        except Exception as e:
+            print(f"⚠️ Frame de calibration ignorée: {e}")
+    return tensors
+
+
+def quantize_dynamic(model):
+    """Quantification dynamique (poids INT8 des couches linéaires, activations à la volée).
+
+    Seules les couches nn.Linear sont concernées : dans MobileNetV2, c'est
+    l'unique classifieur 1280 -> 1. Les convolutions, qui font l'essentiel du
+    calcul, restent en fp32 : aucun gain de latence à attendre pour ce modèle.
+    """
+    select_quantized_engine()
+    return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model).cpu().eval(), {nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_static(model, calibration_tensors, engine=None):
+    """Quantification statique post-entraînement (FX graph mode) calibrée sur des frames réelles"""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = engine or select_quantized_engine()
+    if engine is None:
+        raise RuntimeError('Aucun moteur quantifié disponible')
+    if not calibration_tensors:
+        raise RuntimeError('Aucune frame de calibration')
+
+    float_model = copy.deepcopy(model).cpu().eval()
+    example_inputs = (calibration_tensors[0],)
+    prepared = prepare_fx(float_model, get_default_qconfig_mapping(engine), example_inputs)
+    with torch.no_grad():
+        for tensor in calibration_tensors:
+            prepared(tensor)
+    return convert_fx(prepared)
+
+
+def quantize_model(model, precision, calibration_tensors=None):
+    """Appliquer la précision demandée : retourne (modèle, précision effective).
+
+    'int8' tente la quantification statique ; si elle est impossible (pas de
+    frames de calibration, opérateur non supporté), le modèle reste en fp32 et
+    la précision effective rapportée est 'fp32'. La quantification dynamique
+    (voir quantize_dynamic) ne quantifie que le classifieur et ne sert donc pas
+    de repli ; elle reste disponible explicitement avec 'int8_dynamic'.
+    """
+    if precision == 'fp32':
+        return model, 'fp32'
+
+    if precision in ('int8', 'int8_static'):
+        try:
+            return quantize_static(model, calibration_tensors or []), 'int8_static'
+        except Exception as e:
+            if precision == 'int8_static':
+                raise
+            print(f"⚠️ Quantification statique impossible ({e}), modèle conservé en fp32")
+            return model, 'fp32'
+
+    return quantize_dynamic(model), 'int8_dynamic'
+
+
+def model_size_bytes(model):
+    """Taille sérialisée du state_dict (poids + paramètres de quantification)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Re-scoring hors ligne des frames enregistrées (session_frames) avec un nouveau modèle.
+
+Les frames sont lues par blocs (pagination par id), décodées et recadrées
+dans un pool de threads, scorées par lots dans MobileNetDrowsiness puis
+réécrites en une transaction par bloc. Un fichier de checkpoint permet de
+reprendre après une interruption : relancer la commande continue après la
+dernière frame écrite.
+
+    python rescore.py --model mobilenet_drowsiness.pth --db sessions.db
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from face_detectors import HaarFaceDetector, largest_face
+from preprocessing import TensorPreprocessor, decode_image
+
+
+MODEL_EXTENSIONS = ('.pth', '.pt')
+
+
+def default_model_loader(model_path, device):
+    """Charger le modèle ; un fichier absent ou illisible fait échouer le job (jamais de modèle non entraîné)"""
+    from app1 import load_mobilenet
+    return load_mobilenet(model_path, device, strict=True)
+
+
+def resolve_model_path(model_path, model_dir):
+    """Chemin réel d'un modèle demandé par l'API, limité aux fichiers .pth/.pt de `model_dir`"""
+    base = os.path.realpath(model_dir)
+    path = os.path.realpath(os.path.join(base, model_path))
+    if os.path.commonpath([base, path]) != base or not path.endswith(MODEL_EXTENSIONS):
+        raise ValueError(f"Modèle non autorisé: {model_path} (fichier .pth/.pt du dossier des modèles attendu)")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Modèle {model_path} introuvable")
+    return path
+
+
+class FramePreparer:
+    """Décodage + recadrage du visage + normalisation, écrits directement dans le tenseur du lot"""
+
+    def __init__(self, decode_max_width=640, size=224):
+        self.decode_max_width = decode_max_width
+        self.preprocessor = TensorPreprocessor(size=size)
+        self._local = threading.local()
+
+    def _face_detector(self):
+        # Un CascadeClassifier par thread du pool de décodage
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            detector = HaarFaceDetector()
+            self._local.detector = detector
+        return detector
+
+    def prepare_into(self, batch, index, frame_data):
+        """Remplir batch[index] avec la frame ; False si elle est illisible"""
+        try:
+            img_array = decode_image(frame_data, self.decode_max_width)
+            faces = self._face_detector().detect(img_array)
+            if faces:
+                x, y, w, h = largest_face(faces)
+                img_array = img_array[y:y + h, x:x + w]
+            batch[index].copy_(self.preprocessor.to_tensor(img_array)[0])
+            return True
+        except Exception as e:
+            print(f"⚠️ Frame illisible: {e}")
+            return False
+
+
+class RescoreJob:
+    """Job de re-scoring reprenable, utilisable en CLI ou dans un thread de l'API"""
+
+    def __init__(self, model_path, db_path='sessions.db', checkpoint_path='rescore_checkpoint.json',
+                 chunk_size=512, batch_size=64, decode_threads=None, dry_run=False, model_loader=None):
+        self.model_path = model_path
+        self.db_path = db_path
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.decode_threads = decode_threads or min(8, os.cpu_count() or 1)
+        self.dry_run = dry_run
+        self.model_loader = model_loader or default_model_loader
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.preparer = FramePreparer()
+
+        self._stop = threading.Event()
+        self._thread = None
+        self.state = 'idle'
+        self.error = None
+        self.total = 0
+        self.scored = 0
+        self.failed = 0
+        self.last_id = 0
+        self.fps = 0.0
+        self.started_at = None
+
+    def load_checkpoint(self):
+        """Dernière position écrite pour ce modèle (un autre modèle repart de zéro)"""
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get('model_path') != self.model_path:
+            return None
+        return checkpoint
+
+    def save_checkpoint(self):
+        checkpoint = {
+            'model_path': self.model_path,
+            'last_id': self.last_id,
+            'scored': self.scored,
+            'failed': self.failed,
+            'updated_at': time.time()
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _prepare(self, pool, rows):
+        """Lancer la préparation d'un lot : (tenseur, futures) — le décodage chevauche le forward précédent"""
+        batch = torch.empty(len(rows), 3, 224, 224)
+        futures = [pool.submit(self.preparer.prepare_into, batch, i, frame_data)
+                   for i, (_, frame_data) in enumerate(rows)]
+        return batch, futures
+
+    def score_chunk(self, model, pool, rows):
+        """Scorer un bloc : liste de (prediction, confidence, id) pour les frames lisibles"""
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        updates = []
+        pending = self._prepare(pool, batches[0])
+        for k, part in enumerate(batches):
+            batch, futures = pending
+            if k + 1 < len(batches):
+                pending = self._prepare(pool, batches[k + 1])
+
+            keep = [i for i, future in enumerate(futures) if future.result()]
+            self.failed += len(part) - len(keep)
+            if not keep:
+                continue
+            if len(keep) < len(part):
+                batch = batch[keep]
+            with torch.no_grad():
+                # Le modèle se termine par nn.Sigmoid : sa sortie est déjà une probabilité
+                probabilities = model(batch.to(self.device)).view(-1).tolist()
+            for i, probability in zip(keep, probabilities):
+                predicted_class = 'drowsy' if probability > 0.5 else 'awake'
+                updates.append((predicted_class, round(probability * 100, 2), part[i][0]))
+        return updates
+
+    def run(self, reset=False):
+        """Exécuter le job jusqu'au bout (ou jusqu'à stop()) ; retourne le statut final"""
+        self.state = 'running'
+        self.started_at = time.perf_counter()
+        try:
+            checkpoint = None if reset else self.load_checkpoint()
+            if checkpoint:
+                self.last_id = checkpoint['last_id']
+                self.scored = checkpoint['scored']
+                self.failed = checkpoint['failed']
+                print(f"↩️ Reprise après la frame {self.last_id} ({self.scored} déjà scorées)")
+
+            # Le modèle est chargé avant toute lecture ou écriture en base
+            model = self.model_loader(self.model_path, self.device)
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM session_frames WHERE id > ? AND frame_data IS NOT NULL', (self.last_id,))
+            self.total = cursor.fetchone()[0]
+            print(f"📸 {self.total} frames à scorer (blocs de {self.chunk_size}, lots de {self.batch_size}, "
+                  f"{self.decode_threads} threads de décodage)")
+
+            done = 0
+            with ThreadPoolExecutor(max_workers=self.decode_threads) as pool:
+                while not self._stop.is_set():
+                    cursor.execute('''
+                        SELECT id, frame_data FROM session_frames
+                        WHERE id > ? AND frame_data IS NOT NULL
+                        ORDER BY id
+                        LIMIT ?
+                    ''', (self.last_id, self.chunk_size))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+
+                    updates = self.score_chunk(model, pool, rows)
+                    if not self.dry_run:
+                        with conn:
+                            conn.executemany(
+                                'UPDATE session_frames SET prediction = ?, confidence = ? WHERE id = ?',
+                                updates
+                            )
+                    self.scored += len(updates)
+                    self.last_id = rows[-1][0]
+                    if not self.dry_run:
+                        self.save_checkpoint()
+
+                    done += len(rows)
+                    self.fps = done / (time.perf_counter() - self.started_at)
+                    eta = (self.total - done) / self.fps if self.fps else 0
+                    print(f"⏱️ {done}/{self.total} frames ({self.fps:.1f} frames/s, reste ~{eta:.0f}s)")
+            conn.close()
+
+            self.state = 'stopped' if self._stop.is_set() else 'done'
+        except Exception as e:
+            self.state = 'failed'
+            self.error = str(e)
+            print(f"❌ Re-scoring interrompu: {e}")
+        return self.status()
+
+    def start_in_thread(self, reset=False):
+        self._thread = threading.Thread(target=self.run, kwargs={'reset': reset}, name='rescore-job', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    @property
+    def running(self):
+        return self.state == 'running'
+
+    def stop(self):
+        """Arrêter après le bloc en cours (le checkpoint reste cohérent)"""
+        self._stop.set()
+
+    def status(self):
+        return {
+            'state': self.state,
+            'model_path': self.model_path,
+            'total': self.total,
+            'scored': self.scored,
+            'failed': self.failed,
+            'last_id': self.last_id,
+            'fps': round(self.fps, 2),
+            'dry_run': self.dry_run,
+            'error': self.error
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='mobilenet_drowsiness.pth')
+    parser.add_argument('--db', default='sessions.db')
+    parser.add_argument('--checkpoint', default='rescore_checkpoint.json')
+    parser.add_argument('--chunk-size', type=int, default=512, help='Frames lues par bloc (une transaction par bloc)')
+    parser.add_argument('--batch-size', type=int, default=64, help='Frames par forward')
+    parser.add_argument('--decode-threads', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads')
+    parser.add_argument('--reset', action='store_true', help='Ignorer le checkpoint existant')
+    parser.add_argument('--dry-run', action='store_true', help='Scorer sans écrire en base')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    job = RescoreJob(
+        args.model,
+        db_path=args.db,
+        checkpoint_path=args.checkpoint,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        decode_threads=args.decode_threads,
+        dry_run=args.dry_run
+    )
+    status = job.run(reset=args.reset)
+    print(f"✅ {status['state']}: {status['scored']} frames scorées, {status['failed']} illisibles, "
+          f"{status['fps']} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Serveur WebSocket de scoring continu : une connexion authentifiée par session de surveillance"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+from stream_state import stream_key
+
+
+class _Connection:
+    """État d'une connexion : boîte aux lettres d'une seule frame (la plus récente gagne)"""
+    __slots__ = ('stream_id', 'pending', 'pending_seq', 'received', 'dropped', 'scored', 'event')
+
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.pending = None
+        self.pending_seq = 0
+        self.received = 0
+        self.dropped = 0
+        self.scored = 0
+        self.event = asyncio.Event()
+
+
+class StreamingServer:
+    """Serveur WebSocket : authentification unique puis frames JPEG binaires en entrée.
+
+    Protocole :
+      1. le client se connecte avec ``?token=...`` ou envoie d'abord
+         ``{"token": "...", "client_session_id": ...}`` ;
+      2. il envoie ensuite des frames JPEG en messages binaires ;
+      3. le serveur répond ``{"type": "prediction", "seq": n, ...}`` sur le même canal.
+
+    Une seule frame est en attente par connexion : si le client envoie plus vite
+    que l'inférence, les frames intermédiaires sont abandonnées (``dropped``).
+    """
+
+    def __init__(self, detector, authenticate, host='0.0.0.0', port=5001,
+                 max_frame_bytes=5 * 1024 * 1024, inference_threads=4, auth_timeout=10):
+        self.detector = detector
+        self.authenticate = authenticate
+        self.host = host
+        self.port = port
+        self.max_frame_bytes = max_frame_bytes
+        self.auth_timeout = auth_timeout
+        self._executor = ThreadPoolExecutor(max_workers=inference_threads, thread_name_prefix='ws-inference')
+        self._thread = None
+
+        self.active_connections = 0
+        self.total_connections = 0
+        self.rejected_connections = 0
+        self.frames_received = 0
+        self.frames_scored = 0
+        self.frames_dropped = 0
+
+    async def _authenticate(self, websocket):
+        """Retourner (utilisateur, client_session_id) ou (None, None)"""
+        query = parse_qs(urlparse(websocket.path).query)
+        token = query.get('token', [None])[0]
+        client_session_id = query.get('client_session_id', [None])[0]
+
+        if token is None:
+            try:
+                message = await asyncio.wait_for(websocket.recv(), timeout=self.auth_timeout)
+                hello = json.loads(message)
+                token = hello.get('token')
+                client_session_id = hello.get('client_session_id', client_session_id)
+            except (asyncio.TimeoutError, ValueError, TypeError, AttributeError):
+                return None, None
+
+        user = self.authenticate(token) if token else None
+        return user, client_session_id
+
+    async def _handler(self, websocket, path=None):
+        user, client_session_id = await self._authenticate(websocket)
+        if user is None:
+            self.rejected_connections += 1
+            await websocket.close(code=4001, reason='Token invalide')
+            return
+
+        # Même clé que /predict : lissage, PERCLOS et /session_metrics partagés entre HTTP et WebSocket
+        connection = _Connection(stream_key(user['id'], client_session_id))
+        self.active_connections += 1
+        self.total_connections += 1
+        await websocket.send(json.dumps({'type': 'ready', 'stream_id': connection.stream_id}))
+
+        scorer = asyncio.ensure_future(self._score_loop(websocket, connection))
+        try:
+            async for message in websocket:
+                if isinstance(message, str):
+                    # Messages de contrôle texte : seul le ping est reconnu
+                    if message.strip() in ('ping', '{"type": "ping"}', '{"type":"ping"}'):
+                        await websocket.send(json.dumps({'type': 'pong'}))
+                    continue
+
+                connection.received += 1
+                self.frames_received += 1
+                if connection.pending is not None:
+                    # L'inférence n'a pas suivi : on remplace la frame en attente
+                    connection.dropped += 1
+                    self.frames_dropped += 1
+                connection.pending = message
+                connection.pending_seq = connection.received
+                connection.event.set()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            scorer.cancel()
+            self.active_connections -= 1
+            # L'état du flux n'est pas supprimé : d'autres connexions (ou une reconnexion) de la
+            # même session peuvent l'utiliser ; le TTL du registre l'évince après inactivité.
+
+    async def _score_loop(self, websocket, connection):
+        loop = asyncio.get_running_loop()
+        while True:
+            await connection.event.wait()
+            connection.event.clear()
+            frame, seq = connection.pending, connection.pending_seq
+            connection.pending = None
+            if frame is None:
+                continue
+
+            started = time.perf_counter()
+            result = await loop.run_in_executor(self._executor, self.detector.predict, frame, connection.stream_id)
+            connection.scored += 1
+            self.frames_scored += 1
+
+            result = dict(result)
+            result.update({
+                'type': 'prediction',
+                'seq': seq,
+                'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+                'dropped': connection.dropped
+            })
+            try:
+                await websocket.send(json.dumps(result))
+            except websockets.ConnectionClosed:
+                return
+
+    async def _serve(self):
+        async with websockets.serve(self._handler, self.host, self.port, max_size=self.max_frame_bytes):
+            await asyncio.Future()
+
+    def start_in_thread(self):
+        """Démarrer la boucle asyncio du serveur dans un thread démon"""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._serve()),
+                                        name='ws-stream-server', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stats(self):
+        """Statistiques du streaming pour /performance"""
+        return {
+            'enabled': True,
+            'port': self.port,
+            'active_connections': self.active_connections,
+            'total_connections': self.total_connections,
+            'rejected_connections': self.rejected_connections,
+            'frames_received': self.frames_received,
+            'frames_scored': self.frames_scored,
+            'frames_dropped': self.frames_dropped,
+            'drop_rate': round(self.frames_dropped / self.frames_received, 4) if self.frames_received else 0.0
+        }
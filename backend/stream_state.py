@@ -0,0 +1,163 @@
+"""Registre de l'état temporel par flux (un flux = un conducteur / une session client)"""
+
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+
+def stream_key(user_id, client_session_id):
+    """Clé d'un flux, commune à /predict (HTTP) et au WebSocket : '<utilisateur>:<session client>'"""
+    return f"{user_id if user_id is not None else 'anon'}:{client_session_id if client_session_id is not None else '-'}"
+
+
+class StreamState:
+    """État d'un flux : buffer circulaire de taille fixe avec sommes glissantes en O(1)"""
+    __slots__ = ('key', 'size', 'lock', 'last_seen', 'frames', 'face_track', 'change_state', 'temporal', 'faces',
+                 '_labels', '_confidences', '_index', '_count',
+                 '_drowsy_sum', '_confidence_sum')
+
+    def __init__(self, key, size=5):
+        self.key = key
+        self.size = max(1, int(size))
+        self.lock = threading.Lock()
+        self.last_seen = time.monotonic()
+        self.frames = 0
+        self.face_track = None  # Suivi du visage (face_tracking.FaceTrack)
+        self.change_state = None  # Dernière frame scorée (change_detection.ChangeState)
+        self.temporal = None  # PERCLOS et clignements (temporal_engine.TemporalEngine)
+        self.faces = None  # Pistes du mode multi-visages (multi_face.MultiFaceTracks)
+
+        # 1 = drowsy, 0 = awake
+        self._labels = bytearray(self.size)
+        self._confidences = array('d', bytes(8 * self.size))
+        self._index = 0
+        self._count = 0
+        self._drowsy_sum = 0
+        self._confidence_sum = 0.0
+
+    def push(self, predicted_class, confidence):
+        """Ajouter une prédiction brute et retourner (prédiction lissée, confiance moyenne)"""
+        label = 1 if predicted_class == 'drowsy' else 0
+        i = self._index
+
+        if self._count == self.size:
+            self._drowsy_sum -= self._labels[i]
+            self._confidence_sum -= self._confidences[i]
+        else:
+            self._count += 1
+
+        self._labels[i] = label
+        self._confidences[i] = confidence
+        self._drowsy_sum += label
+        self._confidence_sum += confidence
+
+        self._index = (i + 1) % self.size
+        if self._index == 0:
+            # Recalcul exact à chaque tour pour éviter la dérive flottante (amorti O(1))
+            self._confidence_sum = sum(self._confidences[:self._count])
+
+        self.frames += 1
+        return self.smoothed()
+
+    def smoothed(self):
+        """Vote majoritaire et confiance moyenne sur le buffer courant"""
+        if self._count == 0:
+            return 'awake', 0.0
+        final_prediction = 'drowsy' if self._drowsy_sum >= self._count // 2 else 'awake'
+        return final_prediction, self._confidence_sum / self._count
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self):
+        """Empreinte mémoire approximative de l'état"""
+        size = (sys.getsizeof(self) + sys.getsizeof(self.key)
+                + sys.getsizeof(self._labels) + sys.getsizeof(self._confidences))
+        if self.face_track is not None:
+            size += sys.getsizeof(self.face_track) + sys.getsizeof(self.face_track.box)
+        if self.change_state is not None:
+            size += sys.getsizeof(self.change_state)
+            if self.change_state.thumbnail is not None:
+                size += self.change_state.thumbnail.nbytes
+        if self.temporal is not None:
+            size += sys.getsizeof(self.temporal) + self.temporal.memory_bytes()
+        if self.faces is not None:
+            size += self.faces.memory_bytes()
+        return size
+
+
+class StreamRegistry:
+    """Registre des flux actifs avec éviction par inactivité (TTL) et borne sur le nombre de flux"""
+
+    def __init__(self, buffer_size=5, ttl_seconds=300, max_streams=10000):
+        self.buffer_size = buffer_size
+        self.ttl_seconds = ttl_seconds
+        self.max_streams = max_streams
+        self._streams = OrderedDict()  # ordre = dernier accès (le plus ancien en tête)
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.evicted_ttl = 0
+        self.evicted_capacity = 0
+
+    def get(self, key):
+        """Récupérer (ou créer) l'état du flux `key`"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._streams.get(key)
+            if state is None:
+                state = StreamState(key, self.buffer_size)
+                self._streams[key] = state
+                self.created += 1
+            else:
+                self._streams.move_to_end(key)
+            state.last_seen = now
+            self._evict(now)
+            return state
+
+    def remove(self, key):
+        with self._lock:
+            return self._streams.pop(key, None)
+
+    def _evict(self, now):
+        # Les flux les plus anciens sont en tête : on s'arrête au premier flux encore actif
+        while self._streams:
+            key, oldest = next(iter(self._streams.items()))
+            if now - oldest.last_seen > self.ttl_seconds:
+                del self._streams[key]
+                self.evicted_ttl += 1
+            elif len(self._streams) > self.max_streams:
+                del self._streams[key]
+                self.evicted_capacity += 1
+            else:
+                break
+
+    def evict_expired(self):
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def __len__(self):
+        return len(self._streams)
+
+    def memory_bytes(self):
+        with self._lock:
+            states = list(self._streams.values())
+        return sys.getsizeof(self._streams) + sum(s.memory_bytes() for s in states)
+
+    def stats(self):
+        """Statistiques du registre pour /performance"""
+        active = len(self._streams)
+        memory = self.memory_bytes()
+        return {
+            'active_streams': active,
+            'max_streams': self.max_streams,
+            'ttl_seconds': self.ttl_seconds,
+            'buffer_size': self.buffer_size,
+            'created': self.created,
+            'evicted_ttl': self.evicted_ttl,
+            'evicted_capacity': self.evicted_capacity,
+            'memory_bytes': memory,
+            'bytes_per_stream': round(memory / active, 1) if active else 0
+        }
@@ -0,0 +1,97 @@
+"""Échantillonnage des métriques système en tâche de fond.
+
+Un thread démon relève toutes les `interval_seconds` la charge CPU, la
+mémoire du processus, le nombre de threads, les réglages de threads torch
+et l'activité du ramasse-miettes, et garde les `window` derniers relevés.
+/performance lit le dernier relevé en mémoire au lieu de bloquer une
+seconde sur `psutil.cpu_percent(interval=1)`.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class SystemSampler:
+    def __init__(self, interval_seconds=2.0, window=150):
+        self.interval_seconds = interval_seconds
+        self._samples = deque(maxlen=window)
+        self._stop = threading.Event()
+        self._process = psutil.Process(os.getpid()) if psutil is not None else None
+        if psutil is not None:
+            # Premier appel : référence pour les mesures non bloquantes suivantes (interval=None)
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='system-sampler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️ Échantillonnage système échoué: {e}")
+
+    def sample(self):
+        """Relever les métriques courantes et les ajouter à la fenêtre"""
+        gc_stats = gc.get_stats()
+        sample = {
+            'timestamp': time.time(),
+            'threads': threading.active_count(),
+            'gc_counts': list(gc.get_count()),
+            'gc_collections': sum(generation['collections'] for generation in gc_stats),
+            'gc_collected': sum(generation['collected'] for generation in gc_stats)
+        }
+        torch = sys.modules.get('torch')  # seulement si déjà importé par l'application
+        if torch is not None:
+            sample['torch_threads'] = torch.get_num_threads()
+            sample['torch_interop_threads'] = torch.get_num_interop_threads()
+        if psutil is not None:
+            memory = self._process.memory_info()
+            sample.update({
+                'cpu_percent': psutil.cpu_percent(interval=None),
+                'process_cpu_percent': self._process.cpu_percent(interval=None),
+                'memory_percent': psutil.virtual_memory().percent,
+                'rss_mb': round(memory.rss / (1024 * 1024), 1)
+            })
+        self._samples.append(sample)
+        return sample
+
+    def latest(self):
+        """Dernier relevé (dict vide si aucun)"""
+        try:
+            return self._samples[-1]
+        except IndexError:
+            return {}
+
+    def series(self, fields=('cpu_percent', 'memory_percent', 'rss_mb', 'threads'), points=None):
+        """Séries temporelles courtes {champ: [valeurs]} des derniers relevés, avec leurs horodatages"""
+        samples = list(self._samples)
+        if points:
+            samples = samples[-points:]
+        result = {'timestamp': [round(s['timestamp'], 3) for s in samples]}
+        for field in fields:
+            result[field] = [s.get(field) for s in samples]
+        return result
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval_seconds + 1)
+
+    def stats(self):
+        return {
+            'enabled': True,
+            'psutil': psutil is not None,
+            'interval_seconds': self.interval_seconds,
+            'samples': len(self._samples),
+            'window': self._samples.maxlen
+        }
@@ -0,0 +1,268 @@
+"""Indicateurs temporels par flux : PERCLOS, fréquence et durée des clignements en O(1) par frame"""
+
+import sqlite3
+import threading
+import time
+from array import array
+
+from stream_state import stream_key
+
+
+class TemporalEngine:
+    """Fenêtre glissante (en secondes) de l'état des yeux d'un flux.
+
+    Les frames sont gardées dans un buffer circulaire (horodatage, yeux
+    fermés) avec une somme glissante des frames « fermées » : PERCLOS est un
+    simple ratio. Les fins de clignement sont gardées dans un second buffer
+    avec la somme des durées. Chaque frame ne coûte qu'un ajout et
+    l'expiration des entrées sorties de la fenêtre (O(1) amorti).
+    """
+    __slots__ = ('window_seconds', 'max_blink_seconds', 'source', 'long_closures',
+                 '_times', '_closed', '_head', '_count', '_closed_sum',
+                 '_blink_times', '_blink_durations', '_blink_head', '_blink_count', '_blink_duration_sum',
+                 '_closed_since', '_last_time',
+                 'last_persisted', '_interval_frames', '_interval_score_sum')
+
+    def __init__(self, window_seconds=60.0, capacity=900, max_blink_seconds=0.5):
+        self.window_seconds = window_seconds
+        self.max_blink_seconds = max_blink_seconds
+        self.source = None  # 'ear' ou 'cnn' : origine de la dernière mesure
+        self.long_closures = 0  # fermetures plus longues qu'un clignement (micro-sommeils)
+
+        capacity = max(1, int(capacity))
+        self._times = array('d', bytes(8 * capacity))
+        self._closed = bytearray(capacity)
+        self._head = 0
+        self._count = 0
+        self._closed_sum = 0
+
+        # Au plus un clignement toutes les deux frames
+        blink_capacity = capacity // 2 + 1
+        self._blink_times = array('d', bytes(8 * blink_capacity))
+        self._blink_durations = array('d', bytes(8 * blink_capacity))
+        self._blink_head = 0
+        self._blink_count = 0
+        self._blink_duration_sum = 0.0
+
+        self._closed_since = None  # début de la fermeture en cours
+        self._last_time = None
+
+        # Agrégats de l'intervalle de persistance en cours
+        self.last_persisted = None
+        self._interval_frames = 0
+        self._interval_score_sum = 0.0
+
+    def update(self, t, closed, score, source):
+        """Ajouter une frame (t en secondes monotones, yeux fermés ou non, score EAR ou probabilité)"""
+        self.source = source
+        capacity = len(self._closed)
+        if self._count == capacity:
+            self._drop_frame()
+        tail = (self._head + self._count) % capacity
+        self._times[tail] = t
+        self._closed[tail] = 1 if closed else 0
+        self._closed_sum += self._closed[tail]
+        self._count += 1
+
+        if closed:
+            if self._closed_since is None:
+                self._closed_since = t
+        elif self._closed_since is not None:
+            duration = t - self._closed_since
+            self._closed_since = None
+            if duration <= self.max_blink_seconds:
+                self._add_blink(t, duration)
+            else:
+                self.long_closures += 1
+
+        self._last_time = t
+        self._expire(t)
+        self._interval_frames += 1
+        self._interval_score_sum += score
+
+    def _drop_frame(self):
+        self._closed_sum -= self._closed[self._head]
+        self._head = (self._head + 1) % len(self._closed)
+        self._count -= 1
+
+    def _add_blink(self, t, duration):
+        capacity = len(self._blink_times)
+        if self._blink_count == capacity:
+            self._drop_blink()
+        tail = (self._blink_head + self._blink_count) % capacity
+        self._blink_times[tail] = t
+        self._blink_durations[tail] = duration
+        self._blink_duration_sum += duration
+        self._blink_count += 1
+
+    def _drop_blink(self):
+        self._blink_duration_sum -= self._blink_durations[self._blink_head]
+        self._blink_head = (self._blink_head + 1) % len(self._blink_times)
+        self._blink_count -= 1
+        if self._blink_count == 0:
+            self._blink_duration_sum = 0.0  # pas de dérive flottante sur une fenêtre vide
+
+    def _expire(self, t):
+        horizon = t - self.window_seconds
+        while self._count and self._times[self._head] < horizon:
+            self._drop_frame()
+        while self._blink_count and self._blink_times[self._blink_head] < horizon:
+            self._drop_blink()
+
+    def perclos(self):
+        """Part des frames yeux fermés sur la fenêtre (0-1)"""
+        return self._closed_sum / self._count if self._count else 0.0
+
+    def snapshot(self):
+        """Indicateurs courants (retournés avec chaque prédiction)"""
+        if self._count:
+            # Durée réellement couverte par la fenêtre (au moins une seconde)
+            span = max(1.0, self._last_time - self._times[self._head])
+        else:
+            span = self.window_seconds
+        closed_for = (self._last_time - self._closed_since) if self._closed_since is not None else 0.0
+        return {
+            'perclos': round(self.perclos(), 4),
+            'blink_rate_per_min': round(self._blink_count * 60.0 / span, 2),
+            'avg_blink_ms': round(1000 * self._blink_duration_sum / self._blink_count, 1) if self._blink_count else 0.0,
+            'eyes_closed_ms': round(1000 * closed_for, 1),
+            'long_closures': self.long_closures,
+            'window_frames': self._count,
+            'source': self.source
+        }
+
+    def take_interval(self):
+        """(frames, score moyen) depuis la dernière persistance, puis remise à zéro"""
+        frames, score_sum = self._interval_frames, self._interval_score_sum
+        self._interval_frames = 0
+        self._interval_score_sum = 0.0
+        return frames, (score_sum / frames if frames else 0.0)
+
+    def memory_bytes(self):
+        return (self._times.itemsize * len(self._times) + len(self._closed)
+                + 2 * self._blink_times.itemsize * len(self._blink_times))
+
+
+def delete_metrics(cursor, user_id, client_session_id=None):
+    """Supprimer les indicateurs persistés d'un utilisateur, ou d'une seule de ses sessions client.
+
+    Les flux du mode multi-visages ('<flux>#face<n>') suivent leur flux.
+    Retourne le nombre de lignes supprimées.
+    """
+    if client_session_id is None:
+        prefix = f"{user_id}:"
+        cursor.execute('DELETE FROM session_metrics WHERE substr(stream_id, 1, ?) = ?', (len(prefix), prefix))
+    else:
+        key = stream_key(user_id, client_session_id)
+        cursor.execute('DELETE FROM session_metrics WHERE stream_id = ? OR substr(stream_id, 1, ?) = ?',
+                       (key, len(key) + 1, key + '#'))
+    return cursor.rowcount
+
+
+class TemporalSeriesWriter:
+    """Persistance compacte des indicateurs : une ligne par flux et par intervalle.
+
+    Les lignes sont accumulées en mémoire et écrites en lot par un thread
+    démon, hors du chemin des requêtes. Rétention : les flux anonymes (que
+    /session_metrics ne peut pas relire) ne sont pas persistés sauf
+    `persist_anonymous`, et les lignes plus anciennes que `retention_seconds`
+    sont purgées au plus une fois par `prune_seconds`.
+    """
+
+    def __init__(self, db_path='sessions.db', interval_seconds=5.0, flush_seconds=5.0,
+                 retention_seconds=None, persist_anonymous=False, prune_seconds=3600.0):
+        self.db_path = db_path
+        self.interval_seconds = interval_seconds
+        self.flush_seconds = flush_seconds
+        self.retention_seconds = retention_seconds
+        self.persist_anonymous = persist_anonymous
+        self.prune_seconds = prune_seconds
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_prune = None
+        self.rows_written = 0
+        self.rows_pruned = 0
+        self.anonymous_skipped = 0
+        self.flush_errors = 0
+        self._thread = threading.Thread(target=self._run, name='temporal-series-writer', daemon=True)
+        self._thread.start()
+
+    def maybe_record(self, stream_key, engine, now):
+        """Ajouter une ligne pour ce flux si l'intervalle de persistance est écoulé"""
+        if not self.persist_anonymous and stream_key.startswith('anon:'):
+            self.anonymous_skipped += 1
+            return
+        if engine.last_persisted is not None and now - engine.last_persisted < self.interval_seconds:
+            return
+        engine.last_persisted = now
+        frames, mean_score = engine.take_interval()
+        snapshot = engine.snapshot()
+        row = (stream_key, time.time(), snapshot['perclos'], snapshot['blink_rate_per_min'],
+               snapshot['avg_blink_ms'], snapshot['long_closures'], round(mean_score, 4),
+               snapshot['source'], frames)
+        with self._lock:
+            self._pending.append(row)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+            self.prune()
+
+    def prune(self, now=None):
+        """Supprimer les lignes sorties de la période de rétention (au plus une fois par prune_seconds)"""
+        if not self.retention_seconds:
+            return 0
+        now = time.time() if now is None else now
+        if self._last_prune is not None and now - self._last_prune < self.prune_seconds:
+            return 0
+        self._last_prune = now
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.execute('DELETE FROM session_metrics WHERE timestamp < ?', (now - self.retention_seconds,))
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erreur de purge des indicateurs temporels: {e}")
+            return 0
+        self.rows_pruned += cursor.rowcount
+        return cursor.rowcount
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.executemany('''
+                INSERT INTO session_metrics
+                    (stream_id, timestamp, perclos, blink_rate, avg_blink_ms, long_closures, mean_score, source, frames)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+            conn.close()
+            self.rows_written += len(rows)
+        except sqlite3.Error as e:
+            self.flush_errors += 1
+            print(f"⚠️ Erreur d'écriture des indicateurs temporels: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=self.flush_seconds + 1)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'enabled': True,
+            'interval_seconds': self.interval_seconds,
+            'retention_seconds': self.retention_seconds,
+            'persist_anonymous': self.persist_anonymous,
+            'pending_rows': pending,
+            'rows_written': self.rows_written,
+            'rows_pruned': self.rows_pruned,
+            'anonymous_skipped': self.anonymous_skipped,
+            'flush_errors': self.flush_errors
+        }
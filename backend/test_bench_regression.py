@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Tests du résumé des benchmarks et de la détection des régressions"""
+
+from bench_regression import compare, parse_thresholds, percentile, summarize
+
+
+def test_summarize_latencies():
+    stats = summarize([float(v) for v in range(1, 101)])
+    assert stats['count'] == 100
+    assert stats['mean_ms'] == 50.5
+    assert stats['p50_ms'] == 50.5
+    assert stats['p99_ms'] == 99.01
+    assert stats['ops_per_s'] == round(100 / 5.05, 2)
+    # Mesures concurrentes : débit sur la durée murale
+    assert summarize([10.0] * 40, wall_seconds=0.1)['ops_per_s'] == 400.0
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {
+        'forward.b1': {'p95_ms': 10.0, 'ops_per_s': 100.0},
+        'decode.640x480': {'p95_ms': 0.02, 'ops_per_s': 50000.0}
+    }
+    results = {
+        'forward.b1': {'p95_ms': 12.0, 'ops_per_s': 95.0},
+        'decode.640x480': {'p95_ms': 0.04, 'ops_per_s': 49000.0},
+        'predict.recorded': {'p95_ms': 30.0}
+    }
+    rows = {(r['benchmark'], r['stat']): r for r in compare(results, baseline, default_threshold=0.10)}
+    assert rows[('forward.b1', 'p95_ms')]['regression']  # +20 % > 10 %
+    assert not rows[('forward.b1', 'ops_per_s')]['regression']  # -5 %
+    assert not rows[('decode.640x480', 'p95_ms')]['regression']  # x2 mais +0.02 ms : bruit
+    assert ('predict.recorded', 'p95_ms') not in rows  # absent de la référence
+
+    thresholds = parse_thresholds(['forward.p95_ms=0.5', 'forward.b1=0.25'])
+    rows = {(r['benchmark'], r['stat']): r for r in compare(results, baseline, 0.10, thresholds)}
+    assert rows[('forward.b1', 'p95_ms')]['threshold'] == 0.25
+    assert not rows[('forward.b1', 'p95_ms')]['regression']
+    # Seuil par groupe de benchmarks (forward.b1, forward.b8...)
+    rows = compare(results, baseline, 0.10, parse_thresholds(['forward.p95_ms=0.5']))
+    assert [r['threshold'] for r in rows if r['benchmark'] == 'forward.b1' and r['stat'] == 'p95_ms'] == [0.5]
+
+
+if __name__ == "__main__":
+    test_summarize_latencies()
+    test_compare_flags_only_regressions_beyond_threshold()
+    print("✅ Tests des seuils de régression réussis")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tests de la détection de changement par flux"""
+
+import cv2
+import numpy as np
+
+from change_detection import ChangeDetector, ChangeState
+
+
+def test_static_frames_reuse_score_until_forced_rescore():
+    """Une frame immobile réutilise le score, mais au plus max_skip fois de suite"""
+    detector = ChangeDetector(threshold=3.0, max_skip=2)
+    state = ChangeState()
+    frame = np.full((120, 160, 3), 100, dtype=np.uint8)
+
+    reused, thumbnail = detector.check(state, frame)
+    assert reused is None
+    detector.record(state, thumbnail, 0.8, score_ms=20.0)
+
+    assert detector.check(state, frame)[0] == 0.8
+    assert detector.check(state, frame)[0] == 0.8
+    reused, thumbnail = detector.check(state, frame)
+    assert reused is None
+    assert detector.stats()['forced_rescores'] == 1
+    detector.record(state, thumbnail, 0.7, score_ms=20.0)
+    assert state.stats()['skip_rate'] == 0.5
+    assert detector.stats()['cpu_saved_ms'] > 0
+
+
+def test_changed_face_region_is_rescored():
+    """Un changement dans la région du visage force un nouveau score"""
+    detector = ChangeDetector(threshold=3.0, max_skip=10)
+    state = ChangeState()
+    frame = np.full((120, 160, 3), 100, dtype=np.uint8)
+    detector.record(state, detector.check(state, frame, (40, 30, 80, 60))[1], 0.2)
+
+    moved = frame.copy()
+    moved[30:60, 40:120] = 200
+    assert detector.check(state, moved, (40, 30, 80, 60))[0] is None
+
+
+def face_frame(eyes_closed=False, width=320, height=240):
+    """Frame RGB avec un visage synthétique ; retourne (frame, boîte du visage)"""
+    image = np.random.default_rng(1).integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    center, axes = (width // 2, height // 2), (width // 8, height // 5)
+    cv2.ellipse(image, center, axes, 0, 0, 360, (200, 170, 150), -1)
+    for side in (-1, 1):
+        eye = (center[0] + side * axes[0] // 2, center[1] - axes[1] // 4)
+        if eyes_closed:
+            cv2.line(image, (eye[0] - axes[0] // 6, eye[1]), (eye[0] + axes[0] // 6, eye[1]), (30, 30, 30), 2)
+        else:
+            cv2.circle(image, eye, axes[0] // 6, (30, 30, 30), -1)
+    return image, (center[0] - axes[0], center[1] - axes[1], 2 * axes[0], 2 * axes[1])
+
+
+def test_eye_closure_is_rescored():
+    """Fermer les yeux change peu la moyenne du visage, mais la frame doit être rescorée"""
+    detector = ChangeDetector()
+    state = ChangeState()
+    frame, box = face_frame()
+    detector.record(state, detector.check(state, frame, box)[1], 0.1)
+
+    noisy = np.clip(frame + np.random.default_rng(2).normal(0, 3, frame.shape), 0, 255).astype(np.uint8)
+    assert detector.check(state, noisy, box)[0] == 0.1  # bruit de capteur : score réutilisé
+    closed, _ = face_frame(eyes_closed=True)
+    assert detector.check(state, closed, box)[0] is None
+
+
+if __name__ == "__main__":
+    test_static_frames_reuse_score_until_forced_rescore()
+    test_changed_face_region_is_rescored()
+    test_eye_closure_is_rescored()
+    print("✅ Tests de la détection de changement réussis")
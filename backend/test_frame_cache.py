@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Tests du cache de frames quasi identiques"""
+
+import time
+
+import cv2
+import numpy as np
+
+from frame_cache import FrameCache, dhash, eye_signature, frame_signature, hamming_distance
+from preprocessing import decode_image, synthetic_jpeg
+
+
+def test_reencoded_frame_is_near_duplicate():
+    """Une même scène recompressée reste proche ; une autre scène non"""
+    frame = decode_image(synthetic_jpeg(320, 240, seed=1, quality=90))
+    _, reencoded = cv2.imencode('.jpg', cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 40])
+    reencoded = decode_image(reencoded.tobytes())
+    other = np.ascontiguousarray(frame[::-1, ::-1])
+
+    assert hamming_distance(dhash(frame), dhash(reencoded)) <= 6
+    assert hamming_distance(dhash(frame), dhash(other)) > 6
+    assert frame_signature(frame, (80, 60, 160, 120)) == dhash(frame[60:180, 80:240])
+
+
+def face_frame(eyes_closed=False, width=640, height=480, seed=3):
+    """Frame RGB avec un visage synthétique ; retourne (frame, boîte du visage)"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    center, axes = (width // 2, height // 2), (width // 8, height // 5)
+    cv2.ellipse(image, center, axes, 0, 0, 360, (200, 170, 150), -1)
+    for side in (-1, 1):
+        eye = (center[0] + side * axes[0] // 2, center[1] - axes[1] // 4)
+        if eyes_closed:
+            cv2.line(image, (eye[0] - axes[0] // 6, eye[1]), (eye[0] + axes[0] // 6, eye[1]), (30, 30, 30), 2)
+        else:
+            cv2.circle(image, eye, axes[0] // 6, (30, 30, 30), -1)
+    _, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return decode_image(encoded.tobytes()), (center[0] - axes[0], center[1] - axes[1], 2 * axes[0], 2 * axes[1])
+
+
+def test_resent_frame_hits_but_eye_closure_does_not():
+    """Une frame renvoyée (recompressée) retrouve son score ; la même scène yeux fermés non"""
+    cache = FrameCache()
+    frame, box = face_frame()
+    cache.put('a', frame_signature(frame, box), 0.1, eye_signature(frame, box))
+
+    _, encoded = cv2.imencode('.jpg', cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 60])
+    resent = decode_image(encoded.tobytes())
+    assert cache.get('a', frame_signature(resent, box), eye_signature(resent, box)) == 0.1
+
+    closed, _ = face_frame(eyes_closed=True)
+    assert hamming_distance(frame_signature(frame, box), frame_signature(closed, box)) <= cache.max_distance
+    assert cache.get('a', frame_signature(closed, box), eye_signature(closed, box)) is None
+    assert cache.stats()['eye_rejects'] == 1
+
+
+def test_streams_are_isolated():
+    """Un score mis en cache pour un flux ne sert jamais à un autre"""
+    cache = FrameCache(max_distance=2)
+    cache.put('a', 0b1010, 0.9)
+    assert cache.get('a', 0b1011) == 0.9
+    assert cache.get('b', 0b1010) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['near_hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_lru_and_byte_bounds():
+    """Éviction LRU au-delà de max_entries, puis au-delà de max_bytes"""
+    cache = FrameCache(max_entries=2, max_distance=0)
+    cache.put('a', 1, 0.1)
+    cache.put('b', 2, 0.2)
+    cache.get('a', 1)
+    cache.put('c', 3, 0.3)
+    assert cache.get('b', 2) is None
+    assert cache.get('a', 1) == 0.1
+    assert cache.stats()['evicted_lru'] == 1
+
+    cache = FrameCache(max_entries=100, max_bytes=1, max_distance=0)
+    cache.put('a', 1, 0.1)
+    assert len(cache) == 0
+    assert cache.stats()['evicted_bytes'] == 1
+
+
+def test_ttl_and_per_stream_bound():
+    """Les entrées expirent après le TTL ; un flux ne garde que entries_per_stream entrées"""
+    cache = FrameCache(ttl_seconds=0.01, max_distance=0)
+    cache.put('a', 1, 0.1)
+    time.sleep(0.02)
+    assert cache.get('a', 1) is None
+    assert cache.stats()['expired'] == 1
+
+    cache = FrameCache(entries_per_stream=2, max_distance=0)
+    for frame_hash in (1, 2, 3):
+        cache.put('a', frame_hash, 0.5)
+    assert len(cache) == 2
+    assert cache.get('a', 1) is None
+
+
+if __name__ == "__main__":
+    test_reencoded_frame_is_near_duplicate()
+    test_resent_frame_hits_but_eye_closure_does_not()
+    test_streams_are_isolated()
+    test_lru_and_byte_bounds()
+    test_ttl_and_per_stream_bound()
+    print("✅ Tests du cache de frames réussis")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Tests de l'EAR vectorisé et de la cascade EAR -> CNN"""
+
+import numpy as np
+
+from landmarks import EarCascade, eye_aspect_ratios, mean_ear
+
+
+def face_landmarks():
+    """68 points nuls sauf les yeux : EAR gauche 4/6, EAR droit 2/8 (calculés à la main)"""
+    landmarks = np.zeros((68, 2), dtype=np.float32)
+    # p1..p6 de l'oeil gauche : |p2-p6| = |p3-p5| = 2, |p1-p4| = 3
+    landmarks[36:42] = [(0, 0), (1, -1), (2, -1), (3, 0), (2, 1), (1, 1)]
+    # Oeil droit : |p2-p6| = |p3-p5| = 1, |p1-p4| = 4
+    landmarks[42:48] = [(10, 0), (11, -0.5), (12, -0.5), (14, 0), (12, 0.5), (11, 0.5)]
+    return landmarks
+
+
+def test_eye_aspect_ratios_and_mean_ear():
+    landmarks = face_landmarks()
+    np.testing.assert_allclose(eye_aspect_ratios(landmarks), [4 / 6, 2 / 8], rtol=1e-6)
+    assert abs(mean_ear(landmarks) - (4 / 6 + 2 / 8) / 2) < 1e-6
+    assert isinstance(mean_ear(landmarks), float)
+
+    # Lot (N, 68, 2) ; un oeil dégénéré (largeur nulle) donne un EAR de 0
+    degenerate = np.zeros((68, 2), dtype=np.float32)
+    ears = mean_ear(np.stack([landmarks, degenerate]))
+    assert ears.shape == (2,)
+    np.testing.assert_allclose(ears, [(4 / 6 + 2 / 8) / 2, 0.0], rtol=1e-6)
+
+
+def test_cascade_open_closed_and_ambiguous():
+    cascade = EarCascade(open_threshold=0.30, closed_threshold=0.18)
+
+    assert abs(cascade.classify(0.30) - 0.1) < 1e-9  # seuil d'ouverture
+    assert cascade.classify(0.40) < 0.1
+    assert abs(cascade.classify(0.18) - 0.9) < 1e-9  # seuil de fermeture
+    assert cascade.classify(0.10) > 0.9
+    assert cascade.classify(0.24) is None  # ambigu : le CNN tranche
+    assert cascade.classify(None) is None  # pas de landmarks
+
+    stats = cascade.stats()
+    assert (stats['frames'], stats['early_open'], stats['early_closed']) == (6, 2, 2)
+    assert (stats['no_landmarks'], stats['cnn_frames']) == (1, 2)
+
+    try:
+        EarCascade(open_threshold=0.2, closed_threshold=0.25)
+        assert False, 'seuils incohérents'
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_eye_aspect_ratios_and_mean_ear()
+    test_cascade_open_closed_and_ambiguous()
+    print("✅ Tests des landmarks réussis")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Tests des imports différés et du profil des imports"""
+
+import os
+import sys
+import tempfile
+
+from lazy_imports import ImportProfiler, lazy_import_stats, module_available, optional_module
+
+
+def test_optional_module_is_imported_once_or_none():
+    assert module_available('json')
+    assert not module_available('module_inexistant_pour_test')
+    assert optional_module('module_inexistant_pour_test') is None
+    assert optional_module('json') is sys.modules['json']
+    stats = lazy_import_stats()
+    assert stats['module_inexistant_pour_test']['loaded'] is False
+    assert stats['json']['loaded'] is True
+
+
+def test_profiler_times_nested_imports():
+    """Le temps cumulé du parent inclut celui du module qu'il importe"""
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, 'profil_parent.py'), 'w') as f:
+        f.write('import time\nimport profil_enfant\ntime.sleep(0.01)\n')
+    with open(os.path.join(directory, 'profil_enfant.py'), 'w') as f:
+        f.write('import time\ntime.sleep(0.02)\n')
+    sys.path.insert(0, directory)
+    profiler = ImportProfiler().install()
+    try:
+        import profil_parent  # noqa: F401
+    finally:
+        profiler.uninstall()
+        sys.path.remove(directory)
+
+    assert profiler not in sys.meta_path
+    report = profiler.report()
+    timings = {entry['module']: entry for entry in report['top']}
+    assert [entry['module'] for entry in report['top'][:2]] == ['profil_parent', 'profil_enfant']
+    assert timings['profil_enfant']['self_ms'] >= 20
+    assert timings['profil_parent']['cumulative_ms'] >= 30
+    assert timings['profil_parent']['self_ms'] < timings['profil_parent']['cumulative_ms'] - 15
+
+
+if __name__ == "__main__":
+    test_optional_module_is_imported_once_or_none()
+    test_profiler_times_nested_imports()
+    print("✅ Tests des imports différés réussis")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Tests des logs échantillonnés et écrits en file"""
+
+import json
+import logging
+import os
+import tempfile
+
+from logging_setup import SamplingFilter, get_logger, parse_sample_rates, setup_logging, stop_logging
+
+
+def make_record(name, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, 'message', None, None)
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates('predict=0.01, face=0.5,cache=2,bad=x') == {'predict': 0.01, 'face': 0.5, 'cache': 1.0}
+    assert parse_sample_rates('') == {}
+
+
+def test_sampling_keeps_one_in_n_and_all_warnings():
+    sampling = SamplingFilter({'predict': 0.1})
+    kept = [sampling.filter(make_record('drowsiness.predict')) for _ in range(100)]
+    assert sum(kept) == 10 and kept[0]
+    assert all(sampling.filter(make_record('drowsiness.predict', logging.WARNING)) for _ in range(5))
+    assert all(sampling.filter(make_record('drowsiness.db')) for _ in range(5))
+    assert sampling.stats()['sampled_out'] == 90
+
+
+def test_queued_logging_writes_structured_lines():
+    """Le listener écrit les messages (avec leurs champs) dans LOG_FILE ; les niveaux inférieurs sont ignorés"""
+    log_file = os.path.join(tempfile.mkdtemp(), 'app.log')
+    try:
+        setup_logging(level='INFO', log_file=log_file, json_lines=True, queued=True)
+        log = get_logger('predict')
+        log.debug('ignoré')
+        log.info('⚡ Prédiction en %.1fms', 12.345, extra={'fields': {'stream': '1:42'}})
+    finally:
+        stop_logging()
+    with open(log_file, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 1
+    assert lines[0]['message'] == '⚡ Prédiction en 12.3ms'
+    assert lines[0]['logger'] == 'drowsiness.predict'
+    assert lines[0]['stream'] == '1:42'
+
+
+if __name__ == "__main__":
+    test_parse_sample_rates()
+    test_sampling_keeps_one_in_n_and_all_warnings()
+    test_queued_logging_writes_structured_lines()
+    print("✅ Tests des logs réussis")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Tests des histogrammes par thread et de l'exposition Prometheus"""
+
+import threading
+
+from metrics import MetricsRegistry
+
+
+def test_histogram_merges_threads_and_estimates_quantiles():
+    """Les mesures de plusieurs threads (terminés ou non) sont fusionnées à la lecture"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram('test_stage_seconds', 'Durée', label='stage', buckets=(0.001, 0.01, 0.1))
+
+    def worker():
+        for _ in range(90):
+            histogram.observe(0.0005, 'decode')
+        for _ in range(10):
+            histogram.observe(0.05, 'decode')
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    histogram.observe(0.002, 'forward')
+
+    summary = histogram.summary()
+    assert summary['decode']['count'] == 400
+    assert summary['decode']['p50_ms'] <= 1.0
+    assert 10.0 <= summary['decode']['p99_ms'] <= 100.0
+    assert summary['forward']['count'] == 1
+    # Threads terminés repliés : une nouvelle lecture donne le même résultat
+    assert histogram.summary()['decode']['count'] == 400
+
+
+def test_short_lived_threads_stay_bounded_without_reads():
+    """Un thread par requête : les threads terminés sont repliés sans attendre une lecture"""
+    registry = MetricsRegistry()
+    counter = registry.counter('test_requests_total', 'Requêtes', label='endpoint')
+
+    for _ in range(200):
+        thread = threading.Thread(target=counter.inc, args=('predict',))
+        thread.start()
+        thread.join()
+
+    assert len(counter._values._cells) <= 1
+    assert counter.values() == {'predict': 200.0}
+
+
+def test_prometheus_exposition():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('test_request_seconds', 'Durée des requêtes', label='endpoint', buckets=(0.01, 0.1))
+    counter = registry.counter('test_requests_total', 'Requêtes', label='endpoint')
+    registry.gauge('test_queue_depth', 'File', lambda: {'batcher': 3}, label='queue')
+    histogram.observe(0.005, 'predict')
+    histogram.observe(0.05, 'predict')
+    histogram.observe(1.0, 'predict')
+    counter.inc('predict')
+    counter.inc('predict')
+
+    text = registry.render()
+    assert '# TYPE test_request_seconds histogram' in text
+    assert 'test_request_seconds_bucket{endpoint="predict",le="0.01"} 1' in text
+    assert 'test_request_seconds_bucket{endpoint="predict",le="0.1"} 2' in text
+    assert 'test_request_seconds_bucket{endpoint="predict",le="+Inf"} 3' in text
+    assert 'test_request_seconds_count{endpoint="predict"} 3' in text
+    assert 'test_requests_total{endpoint="predict"} 2.0' in text
+    assert 'test_queue_depth{queue="batcher"} 3' in text
+
+
+if __name__ == "__main__":
+    test_histogram_merges_threads_and_estimates_quantiles()
+    test_short_lived_threads_stay_bounded_without_reads()
+    test_prometheus_exposition()
+    print("✅ Tests des métriques réussis")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Tests de l'association des visages en mode multi-visages"""
+
+from multi_face import MultiFaceTracks, iou
+
+
+def test_iou():
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+    assert abs(iou((0, 0, 10, 10), (5, 0, 10, 10)) - 50 / 150) < 1e-9
+
+
+def test_track_ids_are_stable_across_frames():
+    """Conducteur et passager gardent leur identifiant même si l'ordre de détection change"""
+    tracks = MultiFaceTracks('1:42')
+    driver, passenger = tracks.assign([(100, 100, 80, 80), (400, 110, 70, 70)])
+    assert (driver.track_id, passenger.track_id) == (1, 2)
+
+    moved = tracks.assign([(405, 112, 70, 70), (104, 98, 80, 80)])
+    assert [slot.track_id for slot in moved] == [2, 1]
+    assert moved[1].state is driver.state
+    assert driver.state.key == '1:42#face1'
+
+
+def test_lost_tracks_expire_and_new_faces_get_new_ids():
+    tracks = MultiFaceTracks('s', max_missed=1)
+    tracks.assign([(0, 0, 50, 50)])
+    tracks.assign([])
+    assert len(tracks) == 1
+    tracks.assign([])
+    assert len(tracks) == 0
+    (slot,) = tracks.assign([(0, 0, 50, 50)])
+    assert slot.track_id == 2
+
+
+if __name__ == "__main__":
+    test_iou()
+    test_track_ids_are_stable_across_frames()
+    test_lost_tracks_expire_and_new_faces_get_new_ids()
+    print("✅ Tests du mode multi-visages réussis")
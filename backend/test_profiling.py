@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests de la capture de profils à chaud"""
+
+import time
+
+import torch
+
+from batching import BatchInferenceScheduler
+from profiling import ProfilerController
+
+
+class FakeDetector:
+    def predict(self, n):
+        return slow_sum(n)
+
+
+def slow_sum(n):
+    total = 0
+    for i in range(n):
+        total += i
+    time.sleep(0.01)
+    return total
+
+
+def test_cprofile_capture_disarms_after_n_calls():
+    """Après N appels la méthode d'origine est restaurée et le rapport contient le graphe d'appels"""
+    detector = FakeDetector()
+    controller = ProfilerController()
+    controller.arm(detector, ['predict'], 'cprofile', max_calls=3)
+    assert 'predict' in vars(detector)
+    try:
+        controller.arm(detector, ['predict'], 'cprofile', max_calls=1)
+        assert False, 'une seule capture à la fois'
+    except RuntimeError:
+        pass
+
+    assert [detector.predict(1000) for _ in range(4)] == [499500] * 4
+    assert 'predict' not in vars(detector)
+    assert not controller.armed
+
+    (report,) = controller.reports
+    assert report['calls'] == 3
+    assert any(f['function'].startswith('slow_sum') for f in report['functions'])
+    assert controller.get_report(report['id']) is report
+
+
+def test_sampling_capture_stops_after_duration():
+    detector = FakeDetector()
+    controller = ProfilerController()
+    controller.arm(detector, ['predict'], 'sampling', max_seconds=0.3, sample_interval_ms=1, memory=True)
+    deadline = time.time() + 0.25
+    while time.time() < deadline:
+        detector.predict(10)
+    time.sleep(0.2)
+
+    assert not controller.armed
+    assert 'predict' not in vars(detector)
+    report = controller.reports[-1]
+    assert report['samples'] > 0
+    assert any(entry['function'].startswith('slow_sum') for entry in report['top_cumulative'])
+    assert report['folded'] and 'allocations' in report
+
+
+class BatchedDetector:
+    """Forward via un BatchInferenceScheduler, comme DrowsinessDetector"""
+
+    def __init__(self):
+        self.model = torch.nn.Conv2d(3, 4, 3).eval()
+        self.batcher = BatchInferenceScheduler(self._run_model, max_batch_size=4, max_wait_ms=1)
+
+    def _run_model(self, input_tensor):
+        with torch.no_grad():
+            return self.model(input_tensor).flatten(1)
+
+    def predict(self, input_tensor):
+        if self.batcher is not None:
+            return self.batcher.infer(input_tensor)
+        return self._run_model(input_tensor)
+
+
+def test_torch_capture_sees_model_ops_with_batcher():
+    """Le micro-batching est suspendu pendant la capture : les opérateurs du modèle sont profilés"""
+    detector = BatchedDetector()
+    batcher = detector.batcher
+    controller = ProfilerController()
+    try:
+        controller.arm(detector, ['predict'], 'torch', max_calls=2, overrides={'batcher': None})
+        assert detector.batcher is None
+        for _ in range(2):
+            assert detector.predict(torch.randn(1, 3, 8, 8)).shape == (1, 4 * 6 * 6)
+        assert not controller.armed
+        assert detector.batcher is batcher  # restauré au désarmement
+
+        ops = [op['op'] for op in controller.reports[-1]['top_ops']]
+        assert any('conv' in op for op in ops), ops
+    finally:
+        batcher.close()
+
+
+if __name__ == "__main__":
+    test_cprofile_capture_disarms_after_n_calls()
+    test_sampling_capture_stops_after_duration()
+    test_torch_capture_sees_model_ops_with_batcher()
+    print("✅ Tests du profilage réussis")
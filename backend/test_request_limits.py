@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Tests des limites de taille des requêtes /predict (413 avant l'analyse du corps)"""
+
+import io
+import json
+
+import app1
+
+
+def test_oversized_multipart_rejected_before_parsing():
+    client = app1.app.test_client()
+    oversized = b'\xff' * (app1.app_config.MAX_REQUEST_BYTES + 1)
+    response = client.post('/predict', data={'image': (io.BytesIO(oversized), 'frame.jpg')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 413
+    assert response.get_json()['success'] is False
+
+
+def test_oversized_json_rejected():
+    client = app1.app.test_client()
+    body = json.dumps({'image': 'A' * app1.app_config.MAX_REQUEST_BYTES})
+    response = client.post('/predict', data=body, content_type='application/json')
+    assert response.status_code == 413
+    assert response.get_json()['success'] is False
+
+
+def test_max_request_covers_a_base64_frame():
+    """Une frame JSON de taille maximale (base64 : x4/3) passe la limite du corps"""
+    assert app1.app.config['MAX_CONTENT_LENGTH'] >= app1.app_config.MAX_FRAME_BYTES * 4 // 3
+
+
+if __name__ == "__main__":
+    test_oversized_multipart_rejected_before_parsing()
+    test_oversized_json_rejected()
+    test_max_request_covers_a_base64_frame()
+    print("✅ Tests des limites de requête réussis")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Tests du re-scoring : chemin du modèle et échec avant toute écriture en base"""
+
+import base64
+import os
+import sqlite3
+import tempfile
+
+import torch
+
+from preprocessing import synthetic_jpeg
+from rescore import RescoreJob, resolve_model_path
+
+
+class NoFaceDetector:
+    def detect(self, img_array):
+        return []
+
+
+def create_frames_db(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE session_frames (id INTEGER PRIMARY KEY, frame_data TEXT, prediction TEXT, confidence REAL)')
+    conn.executemany('INSERT INTO session_frames (frame_data, prediction, confidence) VALUES (?, ?, ?)', rows)
+    conn.commit()
+    conn.close()
+
+
+def test_model_path_restricted_to_model_dir():
+    with tempfile.TemporaryDirectory() as model_dir:
+        open(os.path.join(model_dir, 'v2.pth'), 'wb').close()
+        assert resolve_model_path('v2.pth', model_dir) == os.path.join(os.path.realpath(model_dir), 'v2.pth')
+        for rejected in ('../v2.pth', '/etc/passwd', 'sessions.db'):
+            try:
+                resolve_model_path(rejected, model_dir)
+                assert False, rejected
+            except ValueError:
+                pass
+        try:
+            resolve_model_path('none.pth', model_dir)
+            assert False, 'modèle absent'
+        except FileNotFoundError:
+            pass
+
+
+def test_missing_model_fails_without_touching_frames():
+    """Un modèle introuvable fait échouer le job ; les prédictions enregistrées restent intactes"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        create_frames_db(db_path, [('x', 'awake', 12.5)])
+
+        def loader(model_path, device):
+            raise FileNotFoundError(f"Modèle {model_path} introuvable")
+
+        job = RescoreJob('none.pth', db_path=db_path, checkpoint_path=db_path + '.ckpt', model_loader=loader)
+        status = job.run()
+        assert status['state'] == 'failed'
+        assert 'none.pth' in status['error']
+        assert not os.path.exists(db_path + '.ckpt')
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('SELECT prediction, confidence FROM session_frames').fetchall() == [('awake', 12.5)]
+        conn.close()
+    finally:
+        os.remove(db_path)
+
+
+def test_rescore_writes_model_probability():
+    """La sortie du modèle (déjà sigmoïde) est enregistrée telle quelle : 0.2 -> 'awake' à 20 %"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        frame = base64.b64encode(synthetic_jpeg(160, 120)).decode()
+        create_frames_db(db_path, [(frame, 'drowsy', 99.0), (frame, 'drowsy', 99.0)])
+
+        def loader(model_path, device):
+            return lambda batch: torch.full((batch.shape[0], 1), 0.2)
+
+        job = RescoreJob('v2.pth', db_path=db_path, checkpoint_path=db_path + '.ckpt',
+                         batch_size=1, decode_threads=1, model_loader=loader)
+        job.preparer._face_detector = lambda: NoFaceDetector()  # frame entière, sans cascade Haar
+        status = job.run()
+        assert status['state'] == 'done', status
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT prediction, confidence FROM session_frames').fetchall()
+        conn.close()
+        assert rows == [('awake', 20.0), ('awake', 20.0)]
+    finally:
+        for path in (db_path, db_path + '.ckpt'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    test_model_path_restricted_to_model_dir()
+    test_missing_model_fails_without_touching_frames()
+    test_rescore_writes_model_probability()
+    print("✅ Tests du re-scoring réussis")
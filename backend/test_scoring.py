@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests du scoring du détecteur : échelle des probabilités du CNN et indicateurs temporels"""
+
+import numpy as np
+import torch
+
+import app1
+from preprocessing import TensorPreprocessor
+from stream_state import StreamRegistry, StreamState
+
+
+def cnn_detector(outputs):
+    """Détecteur sans modèle chargé : chaque forward retourne la sortie suivante de `outputs`"""
+    outputs = list(outputs)
+    detector = app1.DrowsinessDetector.__new__(app1.DrowsinessDetector)
+    detector.use_landmarks = False
+    detector.ear_cascade = None
+    detector.temporal_series = None
+    detector.face_box = lambda img_array, track=None: (0, 0, 8, 8)
+    detector.crop_tensor = lambda img_array, box: torch.zeros(1, 3, 224, 224)
+    detector.forward = lambda input_tensor: torch.tensor([[outputs.pop(0)]])  # sortie de nn.Sigmoid
+    return detector
+
+
+def test_open_eye_cnn_scores_feed_perclos_and_blinks():
+    """Yeux ouverts (sortie 0.1) puis une fermeture de 200 ms (sortie 0.9) : un clignement, PERCLOS < 1"""
+    outputs = [0.1] * 20 + [0.9] * 2 + [0.1] * 8
+    detector = cnn_detector(outputs)
+    stream = StreamState('1:test')
+
+    for i in range(len(outputs)):
+        probability, ear = detector.score_array(None)
+        assert ear is None
+        snapshot = detector.update_temporal(stream, probability, ear, now=i / 10.0)
+        if i == 0:
+            assert probability == torch.tensor(0.1).item()
+            assert snapshot['perclos'] == 0.0
+
+    assert snapshot['source'] == 'cnn'
+    assert 0.0 < snapshot['perclos'] < 1.0
+    assert snapshot['blink_rate_per_min'] > 0
+    assert snapshot['avg_blink_ms'] == 200.0
+
+
+def test_multi_face_classes_follow_model_output():
+    """Deux visages scorés en un forward : chacun garde la classe donnée par la sortie du modèle"""
+    detector = app1.DrowsinessDetector.__new__(app1.DrowsinessDetector)
+    detector.streams = StreamRegistry()
+    detector.use_face_detection = True
+    detector.use_landmarks = False
+    detector.temporal_series = None
+    detector.device = torch.device('cpu')
+    detector.preprocessor = TensorPreprocessor()
+    detector.decode_frame = lambda image: np.zeros((240, 320, 3), dtype=np.uint8)
+    detector.detect_faces = lambda img_array: [(20, 20, 100, 100), (200, 40, 80, 80)]
+    detector._run_model = lambda batch: torch.tensor([[0.2], [0.8]])  # visage le plus grand en premier
+
+    result = detector.predict_faces('frame', stream_id='1:test')
+    assert 'error' not in result, result
+    assert result['face_count'] == 2
+    assert [face['raw_prediction'] for face in result['faces']] == ['awake', 'drowsy']
+    assert [face['raw_confidence'] for face in result['faces']] == [20.0, 80.0]
+    assert result['prediction'] == 'drowsy'
+
+
+def test_model_stats_measure_served_int8_weights():
+    """La taille des poids INT8 est mesurée (1 octet par poids), pas réduite à zéro"""
+    detector = app1.DrowsinessDetector.__new__(app1.DrowsinessDetector)
+    detector.model = torch.nn.Sequential(torch.nn.Linear(256, 256)).eval()
+    fp32 = detector.compute_model_stats()
+    assert fp32['parameters'] == fp32['trainable_parameters'] == 256 * 256 + 256
+    assert fp32['size_mb'] == round((256 * 256 + 256) * 4 / (1024 * 1024), 2)
+
+    detector.model = torch.ao.quantization.quantize_dynamic(detector.model, {torch.nn.Linear}, dtype=torch.qint8)
+    int8 = detector.compute_model_stats()
+    assert int8['parameters'] == 256 * 256 + 256
+    assert int8['trainable_parameters'] == 0
+    assert 0.0 < int8['size_mb'] < fp32['size_mb']
+
+
+if __name__ == "__main__":
+    test_open_eye_cnn_scores_feed_perclos_and_blinks()
+    test_multi_face_classes_follow_model_output()
+    test_model_stats_measure_served_int8_weights()
+    print("✅ Tests du scoring réussis")
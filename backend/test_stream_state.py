@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Tests du registre d'état temporel par flux"""
+
+import time
+
+from stream_state import StreamRegistry, StreamState, stream_key
+
+
+def test_majority_vote_and_mean():
+    """Le vote et la moyenne suivent l'ancien comportement du deque(maxlen=5)"""
+    state = StreamState('s', size=5)
+    history = []
+    samples = [('awake', 10.0), ('drowsy', 80.0), ('drowsy', 90.0), ('awake', 20.0),
+               ('awake', 15.0), ('drowsy', 70.0), ('awake', 5.0)]
+    for predicted_class, confidence in samples:
+        history = (history + [(predicted_class, confidence)])[-5:]
+        prediction, avg_confidence = state.push(predicted_class, confidence)
+
+        drowsy_count = sum(1 for p, _ in history if p == 'drowsy')
+        expected = 'drowsy' if drowsy_count >= len(history) // 2 else 'awake'
+        assert prediction == expected
+        assert abs(avg_confidence - sum(c for _, c in history) / len(history)) < 1e-9
+    assert len(state) == 5
+
+
+def test_streams_are_isolated():
+    """Les frames d'un conducteur n'influencent pas le lissage d'un autre"""
+    registry = StreamRegistry(buffer_size=3)
+    for _ in range(3):
+        registry.get('a').push('drowsy', 90.0)
+    for _ in range(3):
+        prediction, confidence = registry.get('b').push('awake', 10.0)
+    assert prediction == 'awake'
+    assert confidence == 10.0
+    assert len(registry) == 2
+
+
+def test_capacity_eviction():
+    """Au-delà de max_streams, le flux le moins récemment utilisé est évincé"""
+    registry = StreamRegistry(buffer_size=2, max_streams=2)
+    registry.get('a')
+    registry.get('b')
+    registry.get('a')
+    registry.get('c')
+    assert len(registry) == 2
+    assert registry.remove('b') is None
+    assert registry.evicted_capacity == 1
+
+
+def test_ttl_eviction():
+    """Les flux inactifs depuis plus que le TTL sont évincés"""
+    registry = StreamRegistry(buffer_size=2, ttl_seconds=0.01)
+    registry.get('a')
+    time.sleep(0.02)
+    registry.get('b')
+    assert len(registry) == 1
+    assert registry.evicted_ttl == 1
+    assert registry.stats()['memory_bytes'] > 0
+
+
+def test_stream_key_shared_by_http_and_websocket():
+    """/predict et le WebSocket adressent le même flux pour une session donnée"""
+    assert stream_key(7, 'abc') == '7:abc'
+    assert stream_key(7, None) == '7:-'
+    assert stream_key(None, 'abc') == 'anon:abc'
+
+
+if __name__ == "__main__":
+    test_majority_vote_and_mean()
+    test_streams_are_isolated()
+    test_capacity_eviction()
+    test_ttl_eviction()
+    test_stream_key_shared_by_http_and_websocket()
+    print("✅ Tests du registre de flux réussis")
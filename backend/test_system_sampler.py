@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Tests de l'échantillonneur de métriques système"""
+
+import time
+
+from system_sampler import SystemSampler
+
+
+def test_sampler_keeps_a_bounded_window_in_memory():
+    sampler = SystemSampler(interval_seconds=0.01, window=5)
+    try:
+        time.sleep(0.2)
+        latest = sampler.latest()
+        assert latest['threads'] >= 2  # thread principal + échantillonneur
+        assert 'gc_collections' in latest
+        assert sampler.stats()['samples'] == 5
+
+        series = sampler.series(fields=('threads',), points=3)
+        assert len(series['timestamp']) == len(series['threads']) == 3
+        assert series['timestamp'] == sorted(series['timestamp'])
+    finally:
+        sampler.close()
+
+
+def test_latest_is_read_without_blocking():
+    sampler = SystemSampler(interval_seconds=60)
+    try:
+        started = time.perf_counter()
+        for _ in range(1000):
+            sampler.latest()
+        assert time.perf_counter() - started < 0.1
+    finally:
+        sampler.close()
+
+
+if __name__ == "__main__":
+    test_sampler_keeps_a_bounded_window_in_memory()
+    test_latest_is_read_without_blocking()
+    print("✅ Tests de l'échantillonneur système réussis")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Tests des indicateurs temporels par flux (PERCLOS, clignements)"""
+
+import os
+import sqlite3
+import tempfile
+import time
+
+from temporal_engine import TemporalEngine, TemporalSeriesWriter, delete_metrics
+
+
+def feed(engine, closed_flags, start=0.0, fps=10.0):
+    for i, closed in enumerate(closed_flags):
+        engine.update(start + i / fps, closed, 0.1 if closed else 0.3, 'ear')
+    return start + len(closed_flags) / fps
+
+
+def test_perclos_and_blinks():
+    """PERCLOS = part de frames fermées ; une fermeture courte compte comme clignement"""
+    engine = TemporalEngine(window_seconds=60, capacity=100, max_blink_seconds=0.5)
+    # 2 clignements de 2 frames (0.2 s) sur 20 frames
+    feed(engine, [False] * 4 + [True] * 2 + [False] * 8 + [True] * 2 + [False] * 4)
+    snapshot = engine.snapshot()
+    assert snapshot['perclos'] == 0.2
+    assert snapshot['avg_blink_ms'] == 200.0
+    assert snapshot['blink_rate_per_min'] == round(2 * 60 / 1.9, 2)
+    assert snapshot['long_closures'] == 0
+    assert snapshot['source'] == 'ear'
+
+
+def test_long_closure_is_not_a_blink():
+    """Une fermeture plus longue que max_blink_seconds est comptée à part"""
+    engine = TemporalEngine(max_blink_seconds=0.5)
+    feed(engine, [False] * 2 + [True] * 10)
+    assert engine.snapshot()['eyes_closed_ms'] == 900.0
+    feed(engine, [False], start=1.2)
+    snapshot = engine.snapshot()
+    assert snapshot['long_closures'] == 1
+    assert snapshot['blink_rate_per_min'] == 0.0
+
+
+def test_window_expiry_and_capacity():
+    """Les frames sorties de la fenêtre (ou au-delà de la capacité) ne comptent plus"""
+    engine = TemporalEngine(window_seconds=1.0, capacity=100)
+    end = feed(engine, [True] * 10)
+    feed(engine, [False] * 10, start=end + 5)
+    assert engine.perclos() == 0.0
+    assert engine.snapshot()['window_frames'] == 10
+
+    engine = TemporalEngine(window_seconds=60, capacity=4)
+    feed(engine, [True, True, False, False, False, False])
+    assert engine.perclos() == 0.0
+
+
+def test_series_writer_flushes_compact_rows():
+    """Une ligne par flux et par intervalle, écrite en lot"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE session_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, stream_id TEXT, timestamp REAL, perclos REAL,
+                blink_rate REAL, avg_blink_ms REAL, long_closures INTEGER, mean_score REAL, source TEXT, frames INTEGER
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+        writer = TemporalSeriesWriter(db_path, interval_seconds=1.0, flush_seconds=60)
+        engine = TemporalEngine()
+        for i in range(25):
+            t = i / 10
+            engine.update(t, False, 0.3, 'ear')
+            writer.maybe_record('1:42', engine, t)
+        writer.close()
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT stream_id, frames, source FROM session_metrics ORDER BY id').fetchall()
+        conn.close()
+        assert [r[1] for r in rows] == [1, 10, 10]
+        assert all(r[0] == '1:42' and r[2] == 'ear' for r in rows)
+        assert writer.stats()['rows_written'] == 3
+    finally:
+        os.remove(db_path)
+
+
+def test_metrics_retention_and_deletion():
+    """Flux anonymes non persistés, purge au-delà de la rétention, suppression par utilisateur ou session"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE session_metrics (id INTEGER PRIMARY KEY AUTOINCREMENT, stream_id TEXT, timestamp REAL)')
+        now = time.time()
+        conn.executemany('INSERT INTO session_metrics (stream_id, timestamp) VALUES (?, ?)', [
+            ('1:42', now), ('1:42#face1', now), ('1:43', now), ('12:42', now), ('2:7', now - 40 * 86400)
+        ])
+        conn.commit()
+
+        writer = TemporalSeriesWriter(db_path, flush_seconds=60, retention_seconds=30 * 86400)
+        writer.maybe_record('anon:127.0.0.1', TemporalEngine(), 0.0)
+        assert writer.stats()['anonymous_skipped'] == 1
+        assert writer.prune(now) == 1
+        assert writer.prune(now) == 0  # au plus une purge par prune_seconds
+        writer.close()
+
+        assert delete_metrics(conn.cursor(), 1, 42) == 2
+        assert delete_metrics(conn.cursor(), 1) == 1
+        conn.commit()
+        assert [r[0] for r in conn.execute('SELECT stream_id FROM session_metrics')] == ['12:42']
+        conn.close()
+    finally:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    test_perclos_and_blinks()
+    test_long_closure_is_not_a_blink()
+    test_window_expiry_and_capacity()
+    test_series_writer_flushes_compact_rows()
+    test_metrics_retention_and_deletion()
+    print("✅ Tests des indicateurs temporels réussis")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests du pool de processus d'inférence (slots, processus morts, boîtes des frames réduites)"""
+
+import os
+
+import numpy as np
+
+from face_tracking import FaceTrack
+from worker_pool import InferenceWorkerPool, scale_box
+
+
+class BoxScorer:
+    """Retourne la moyenne de la frame et place le visage en (10, 20, 30, 40) dans l'image reçue"""
+
+    def score_array(self, image_rgb, track):
+        if image_rgb[0, 0, 0] == 255:
+            os._exit(3)  # simule un plantage du processus (segfault, OOM...)
+        if track is not None:
+            track.box = (10, 20, 30, 40)
+        return float(image_rgb.mean()), image_rgb.shape[:2]
+
+
+def make_scorer():
+    return BoxScorer()
+
+
+def test_scale_box():
+    assert scale_box(None, 0.5) is None
+    assert scale_box((10, 20, 30, 40), 1.0) == (10, 20, 30, 40)
+    assert scale_box((10, 20, 30, 40), 2.0) == (20, 40, 60, 80)
+
+
+def test_resized_frame_box_in_original_coordinates():
+    """La boîte renvoyée pour une frame réduite est exprimée dans la frame d'origine"""
+    pool = InferenceWorkerPool(make_scorer, num_workers=1, threads_per_worker=1,
+                               slots_per_worker=1, max_frame_pixels=50 * 50, timeout=10).start(timeout=60)
+    try:
+        track = FaceTrack()
+        _, shape = pool.score(np.zeros((100, 100, 3), dtype=np.uint8), track)
+        assert shape == (50, 50)
+        assert track.box == (20, 40, 60, 80)
+    finally:
+        pool.close()
+
+
+def test_dead_worker_releases_slot_and_restarts():
+    """Un processus qui meurt met sa requête en échec, rend le slot et est relancé"""
+    pool = InferenceWorkerPool(make_scorer, num_workers=1, threads_per_worker=1,
+                               slots_per_worker=1, max_frame_pixels=32 * 32, timeout=20).start(timeout=60)
+    try:
+        crash = np.full((32, 32, 3), 255, dtype=np.uint8)
+        try:
+            pool.score(crash)
+            assert False, 'la requête du processus mort doit échouer'
+        except RuntimeError:
+            pass
+        # Le seul slot a été rendu : la requête suivante passe sur le processus relancé
+        score, _ = pool.score(np.ones((32, 32, 3), dtype=np.uint8))
+        assert score == 1.0
+        stats = pool.stats()
+        assert stats['restarts'] == 1
+        assert stats['free_slots'] == 1
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    test_scale_box()
+    test_resized_frame_box_in_original_coordinates()
+    test_dead_worker_releases_slot_and_restarts()
+    print("✅ Tests du pool d'inférence réussis")
@@ -0,0 +1,434 @@
+"""Pool de processus d'inférence : frames décodées transmises par mémoire partagée.
+
+Chaque processus possède son propre détecteur (modèle, détecteurs de visages)
+et un nombre de threads torch fixé, ce qui sort la détection faciale et le
+forward du GIL du processus Flask. Les frames ne sont pas picklées : le
+parent les copie dans un slot d'un segment `SharedMemory` et n'envoie que
+(identifiant, slot, hauteur, largeur, suivi du visage).
+
+Chaque processus a son propre canal (Pipe) : un processus tué en pleine
+écriture ne peut pas bloquer les autres, alors qu'il laisserait pris le
+verrou d'une `mp.Queue` partagée. Les requêtes vont au processus qui en a le
+moins en cours. Un slot est rendu à la réception du résultat, ou récupéré si
+la requête dépasse son délai. Le thread collecteur surveille les processus :
+les requêtes d'un processus mort sont mises en échec et il est relancé.
+"""
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import cv2
+import numpy as np
+
+from face_tracking import FaceTrack
+
+FRAME_CHANNELS = 3
+
+
+def scale_box(box, scale):
+    """Boîte (x, y, w, h) multipliée par `scale` (passage entre frame d'origine et frame réduite)"""
+    if box is None or scale == 1.0:
+        return box
+    return tuple(int(round(v * scale)) for v in box)
+
+
+def _worker_main(worker_index, factory, factory_args, shm_name, slot_bytes, threads, conn):
+    """Boucle d'un processus : lit la frame dans son slot, la score, renvoie le score brut sur `conn`"""
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # déjà fixé par une opération parallèle antérieure
+    cv2.setNumThreads(1)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        scorer = factory(*factory_args)
+    except Exception as e:
+        conn.send(('failed', worker_index, str(e)))
+        shm.close()
+        return
+    conn.send(('ready', worker_index, os.getpid()))
+
+    track = FaceTrack()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break  # parent fermé
+        if task is None:
+            break
+
+        request_id, slot, height, width, box, frames_since_full = task
+        frame = np.ndarray((height, width, FRAME_CHANNELS), dtype=np.uint8,
+                           buffer=shm.buf, offset=slot * slot_bytes)
+        started = time.perf_counter()
+        try:
+            if frames_since_full is None:
+                score = scorer.score_array(frame, None)
+                box = None
+            else:
+                track.box, track.frames_since_full = box, frames_since_full
+                score = scorer.score_array(frame, track)
+                box, frames_since_full = track.box, track.frames_since_full
+                if box is not None:
+                    box = tuple(int(v) for v in box)
+            error = None
+        except Exception as e:
+            score, error = None, str(e)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        del frame  # libérer la vue avant toute réutilisation du slot
+
+        conn.send(('result', request_id, worker_index, score, box, frames_since_full, elapsed_ms, error))
+
+    conn.close()
+    shm.close()
+
+
+class InferenceWorkerPool:
+    """N processus d'inférence alimentés par des slots de mémoire partagée.
+
+    `factory(*factory_args)` est appelée dans chaque processus et doit
+    retourner un objet exposant `score_array(image_rgb, track)` -> score brut
+    (objet picklable, ici (probabilité, EAR)).
+    Elle doit être importable (fonction de module) pour le démarrage en `spawn`.
+    """
+
+    def __init__(self, factory, factory_args=(), num_workers=2, threads_per_worker=None,
+                 slots_per_worker=4, max_frame_pixels=1920 * 1080, timeout=30.0):
+        self.num_workers = max(1, int(num_workers))
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.max_frame_pixels = max_frame_pixels
+        self.slot_bytes = max_frame_pixels * FRAME_CHANNELS
+        self.num_slots = self.num_workers * max(1, slots_per_worker)
+        self.timeout = timeout
+        self._factory = factory
+        self._factory_args = factory_args
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self.num_slots * self.slot_bytes)
+        self._free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+
+        self._context = mp.get_context('spawn')  # pas de fork après l'initialisation de torch
+        self._processes = [None] * self.num_workers
+        self._conns = [None] * self.num_workers
+        self._send_locks = [threading.Lock() for _ in range(self.num_workers)]
+        self._retired = set()  # processus arrêtés sans erreur (échec du chargement) : pas de relance
+
+        self._ids = itertools.count()
+        self._pending = {}  # request_id -> (Future, slot, FaceTrack ou None, échelle, échéance, processus)
+        self._lock = threading.Lock()
+        self._collector = None
+        self._closed = False
+
+        self.pids = [None] * self.num_workers
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.resized = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._in_flight = [0] * self.num_workers
+        self._worker_frames = [0] * self.num_workers
+        self._worker_ms = [0.0] * self.num_workers
+
+    def _start_worker(self, worker_index):
+        """Lancer (ou relancer) un processus avec un canal neuf"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_index, self._factory, self._factory_args, self._shm.name, self.slot_bytes,
+                  self.threads_per_worker, child_conn),
+            name=f'inference-worker-{worker_index}',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()  # seul le processus garde l'autre extrémité : EOF s'il meurt
+        with self._send_locks[worker_index]:
+            previous = self._conns[worker_index]
+            self._conns[worker_index] = parent_conn
+            self._processes[worker_index] = process
+        if previous is not None:
+            previous.close()
+
+    def _receive(self, worker_index):
+        """Message suivant d'un processus, None si son canal est fermé (processus mort)"""
+        try:
+            return self._conns[worker_index].recv()
+        except (EOFError, OSError):
+            self._processes[worker_index].join(1.0)  # laisser son code de sortie disponible
+            return None
+
+    def start(self, timeout=600.0):
+        """Démarrer les processus et attendre qu'ils aient chargé (et échauffé) leur détecteur"""
+        for index in range(self.num_workers):
+            self._start_worker(index)
+
+        deadline = time.monotonic() + timeout
+        waiting = set(range(self.num_workers))
+        while waiting:
+            ready = wait([self._conns[index] for index in waiting], timeout=max(0.0, deadline - time.monotonic()))
+            if not ready:
+                self.close()
+                raise RuntimeError(f"{len(waiting)} processus d'inférence non prêts après {timeout}s")
+            for conn in ready:
+                index = self._conns.index(conn)
+                message = self._receive(index) or ('failed', index, 'processus arrêté au démarrage')
+                if message[0] == 'failed':
+                    self.close()
+                    raise RuntimeError(f"Processus d'inférence {message[1]} en échec: {message[2]}")
+                self.pids[index] = message[2]
+                waiting.discard(index)
+
+        self._collector = threading.Thread(target=self._collect, name='inference-pool-collector', daemon=True)
+        self._collector.start()
+        return self
+
+    def _fit(self, image_rgb):
+        """Réduire une frame qui dépasse la taille d'un slot (même rapport d'aspect).
+
+        Retourne (image, échelle) : les boîtes calculées sur l'image réduite
+        sont à diviser par l'échelle pour revenir à la frame d'origine.
+        """
+        height, width = image_rgb.shape[:2]
+        if height * width <= self.max_frame_pixels:
+            return np.ascontiguousarray(image_rgb), 1.0
+        scale = (self.max_frame_pixels / (height * width)) ** 0.5
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        with self._lock:
+            self.resized += 1
+        return cv2.resize(image_rgb, size, interpolation=cv2.INTER_AREA), scale
+
+    def _acquire_slot(self):
+        """Slot libre, en attendant au plus `timeout` ; récupère les slots des requêtes expirées"""
+        try:
+            return self._free_slots.get(timeout=self.timeout)
+        except queue.Empty:
+            self._expire_overdue()
+            try:
+                return self._free_slots.get_nowait()
+            except queue.Empty:
+                raise TimeoutError(f"Aucun slot d'inférence libre après {self.timeout}s") from None
+
+    def _submit(self, image_rgb, track=None):
+        if self._closed:
+            raise RuntimeError("Pool d'inférence fermé")
+        image_rgb, scale = self._fit(image_rgb)
+        height, width = image_rgb.shape[:2]
+
+        slot = self._acquire_slot()
+        view = np.ndarray((height, width, FRAME_CHANNELS), dtype=np.uint8,
+                          buffer=self._shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(view, image_rgb)
+        del view
+
+        if track is None:
+            task_box, frames_since_full = None, None
+        else:
+            task_box, frames_since_full = scale_box(track.box, scale), track.frames_since_full
+
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            candidates = [i for i in range(self.num_workers) if i not in self._retired]
+            if not candidates:
+                self._free_slots.put(slot)
+                raise RuntimeError("Aucun processus d'inférence actif")
+            worker_index = min(candidates, key=self._in_flight.__getitem__)
+            self._in_flight[worker_index] += 1
+            self._pending[request_id] = (future, slot, track, scale, time.monotonic() + self.timeout, worker_index)
+            self.submitted += 1
+
+        try:
+            with self._send_locks[worker_index]:
+                self._conns[worker_index].send((request_id, slot, height, width, task_box, frames_since_full))
+        except (OSError, ValueError) as e:
+            # Processus mort entre le choix et l'envoi : le collecteur le relance
+            self._fail(request_id, RuntimeError(f"Processus d'inférence {worker_index} indisponible: {e}"))
+        return request_id, future
+
+    def submit(self, image_rgb, track=None):
+        """Envoyer une frame RGB uint8 (HxWx3) : retourne un Future du score brut.
+
+        `track` (FaceTrack) est transmis au processus puis mis à jour avec la
+        nouvelle boîte (dans les coordonnées de `image_rgb`) à la réception du
+        résultat. Attend un slot libre au plus `timeout` secondes (contre-pression),
+        puis lève TimeoutError.
+        """
+        return self._submit(image_rgb, track)[1]
+
+    def score(self, image_rgb, track=None):
+        """Score brut d'une frame, calculé par un processus du pool"""
+        request_id, future = self._submit(image_rgb, track)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._fail(request_id, TimeoutError(f"Inférence sans réponse après {self.timeout}s"))
+            raise
+
+    def _pop(self, request_id):
+        """Retirer une requête en attente (à appeler sous `self._lock`)"""
+        entry = self._pending.pop(request_id, None)
+        if entry is not None:
+            self._in_flight[entry[5]] -= 1
+        return entry
+
+    def _fail(self, request_id, error):
+        """Mettre une requête en échec et rendre son slot (résultat éventuel ignoré)"""
+        with self._lock:
+            entry = self._pop(request_id)
+            if entry is None:
+                return
+            self.errors += 1
+        future, slot = entry[0], entry[1]
+        self._free_slots.put(slot)
+        if not future.done():
+            future.set_exception(error)
+
+    def _expire_overdue(self):
+        """Récupérer les slots des requêtes qui ont dépassé leur délai"""
+        now = time.monotonic()
+        with self._lock:
+            overdue = [request_id for request_id, entry in self._pending.items() if entry[4] <= now]
+            self.timeouts += len(overdue)
+        for request_id in overdue:
+            self._fail(request_id, TimeoutError(f"Inférence sans réponse après {self.timeout}s"))
+
+    def _check_workers(self):
+        """Mettre en échec les requêtes d'un processus mort et le relancer"""
+        for index, process in enumerate(self._processes):
+            if self._closed or index in self._retired or process.exitcode is None:
+                continue
+            error = RuntimeError(f"Processus d'inférence {index} arrêté (code {process.exitcode})")
+            with self._lock:
+                lost = [request_id for request_id, entry in self._pending.items() if entry[5] == index]
+            if process.exitcode == 0:
+                # Arrêt normal ou échec du chargement du détecteur : pas de relance en boucle
+                with self._lock:
+                    self._retired.add(index)
+            else:
+                # Relancer avant de rendre les requêtes : les suivantes partent sur le nouveau canal
+                print(f"⚠️ Processus d'inférence {index} arrêté (code {process.exitcode}), redémarrage")
+                self._start_worker(index)
+                with self._lock:
+                    self.restarts += 1
+            for request_id in lost:
+                self._fail(request_id, error)
+
+    def _collect(self):
+        """Thread de réception : résout les Futures, rend les slots et surveille les processus"""
+        while not self._closed:
+            active = [i for i in range(self.num_workers) if i not in self._retired]
+            watched = {self._conns[i]: i for i in active}
+            watched.update({self._processes[i].sentinel: None for i in active})
+            for ready in wait(list(watched), timeout=1.0):
+                index = watched[ready]
+                message = self._receive(index) if index is not None else None
+                if message is not None:
+                    self._handle(message)
+            self._check_workers()
+            self._expire_overdue()
+
+    def _handle(self, message):
+        if message[0] == 'ready':
+            self.pids[message[1]] = message[2]
+            return
+        if message[0] == 'failed':
+            print(f"❌ Processus d'inférence {message[1]} en échec au redémarrage: {message[2]}")
+            return
+        _, request_id, worker_index, score, box, frames_since_full, elapsed_ms, error = message
+
+        with self._lock:
+            self._worker_frames[worker_index] += 1
+            self._worker_ms[worker_index] += elapsed_ms
+            entry = self._pop(request_id)
+            if entry is None:
+                return  # requête expirée : slot déjà rendu
+            future, slot, track, scale = entry[:4]
+            self.completed += 1
+            if error is not None:
+                self.errors += 1
+        self._free_slots.put(slot)
+
+        if track is not None:
+            track.box, track.frames_since_full = scale_box(box, 1 / scale), frames_since_full
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(score)
+
+    def close(self, timeout=5.0):
+        """Arrêter les processus et libérer la mémoire partagée"""
+        if self._closed:
+            return
+        self._closed = True
+
+        for index, conn in enumerate(self._conns):
+            if conn is None:
+                continue
+            try:
+                with self._send_locks[index]:
+                    conn.send(None)
+            except (OSError, ValueError):
+                pass  # processus déjà mort
+        for process in self._processes:
+            if process is not None and process.pid is not None:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+
+        if self._collector is not None:
+            self._collector.join(timeout)
+        for conn in self._conns:
+            if conn is not None:
+                conn.close()
+
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future, *_ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Pool d'inférence fermé"))
+
+        self._shm.close()
+        self._shm.unlink()
+
+    def stats(self):
+        with self._lock:
+            workers = [
+                {
+                    'pid': pid,
+                    'alive': process.is_alive(),
+                    'in_flight': in_flight,
+                    'frames': frames,
+                    'avg_ms': round(total_ms / frames, 3) if frames else 0.0
+                }
+                for pid, process, in_flight, frames, total_ms in zip(self.pids, self._processes, self._in_flight,
+                                                                     self._worker_frames, self._worker_ms)
+            ]
+            return {
+                'enabled': True,
+                'workers': self.num_workers,
+                'threads_per_worker': self.threads_per_worker,
+                'slots': self.num_slots,
+                'free_slots': self._free_slots.qsize(),
+                'shared_memory_mb': round(self.num_slots * self.slot_bytes / (1024 * 1024), 1),
+                'in_flight': len(self._pending),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'restarts': self.restarts,
+                'resized_frames': self.resized,
+                'per_worker': workers
+            }
@@ -0,0 +1,87 @@
+"""Point d'entrée de production (gunicorn) avec modèle préchargé et partagé.
+
+Le maître gunicorn (`preload_app`, voir gunicorn.conf.py) importe ce module
+une seule fois : le modèle est chargé (poids projetés en mémoire, voir
+MODEL_MMAP), optimisé et échauffé, puis les objets Python existants sont
+gelés (`gc.freeze`) pour que le ramasse-miettes des workers ne réécrive pas
+leurs en-têtes et ne duplique pas les pages héritées. Chaque worker forké
+partage ensuite les poids en copy-on-write ; son initialisation se limite à
+relancer les threads de fond (init_worker).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Le serveur WebSocket de streaming n'est pas lancé ici (un seul processus peut
+écouter sur son port) : le démarrer à part avec app1.py si besoin.
+"""
+
+import gc
+import os
+import time
+
+import app1
+from app1 import app, app_config, startup_state
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def memory_report(pid=None):
+    """Mémoire d'un processus en Mo : rss, et uss/pss (pages privées / part proportionnelle) si disponibles"""
+    if psutil is None:
+        return {}
+    process = psutil.Process(pid)
+    try:
+        info = process.memory_full_info()
+    except (psutil.AccessDenied, AttributeError):
+        info = process.memory_info()
+    report = {}
+    for field in ('rss', 'uss', 'pss', 'shared'):
+        value = getattr(info, field, None)
+        if value is not None:
+            report[f'{field}_mb'] = round(value / (1024 * 1024), 1)
+    return report
+
+
+def preload():
+    """Charger et échauffer le modèle dans le maître, sans thread ni processus de fond"""
+    started = time.perf_counter()
+    app1.detector = app1.startup(background=False)
+    # Le micro-batching est démarré par le constructeur : son thread ne survivrait pas au fork
+    app1.detector.stop_batcher()
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    startup_state['preload_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    startup_state['master'] = {'pid': os.getpid(), **memory_report()}
+    print(f"✅ Modèle préchargé dans le maître en {startup_state['preload_ms']}ms "
+          f"({startup_state['master'].get('rss_mb')} Mo RSS)")
+
+
+def init_worker(torch_threads=None):
+    """Initialisation d'un worker forké : threads torch, pool d'inférence et services de fond"""
+    started = time.perf_counter()
+    before = memory_report()
+    # Le thread d'écriture des logs du maître n'existe pas dans le worker
+    app1.log_sampling = app1.configure_logging()
+    if torch_threads:
+        app1.torch.set_num_threads(torch_threads)
+    detector = app1.init_detector()
+    if app_config.INFERENCE_WORKERS > 0 and detector.worker_pool is None:
+        app1.start_worker_pool(detector)
+    app1.start_background_services(detector)
+    startup_state['worker'] = {
+        'pid': os.getpid(),
+        'init_ms': round((time.perf_counter() - started) * 1000, 1),
+        'memory_before': before,
+        'memory_after': memory_report()
+    }
+    worker = startup_state['worker']
+    print(f"👷 Worker {worker['pid']} prêt en {worker['init_ms']}ms "
+          f"(RSS {before.get('rss_mb')} -> {worker['memory_after'].get('rss_mb')} Mo, "
+          f"USS {worker['memory_after'].get('uss_mb')} Mo)")
+
+
+if app_config.WSGI_PRELOAD:
+    preload()
@@ -41,6 +41,27 @@ export class ApiClient {
 		return this.request('/predict', { method: 'POST', body: JSON.stringify({ image }) });
 	}
 
+	// Envoi binaire d'une frame JPEG (Blob) : évite l'encodage base64 et le JSON
+	async predictFrame(blob, clientSessionId = null) {
+		const params = new URLSearchParams();
+		if (clientSessionId !== null && clientSessionId !== undefined) {
+			params.set('client_session_id', String(clientSessionId));
+		}
+		const query = params.toString() ? `?${params.toString()}` : '';
+		const token = localStorage.getItem('authToken');
+		const headers = { 'Content-Type': 'image/jpeg' };
+		if (token) {
+			headers['Authorization'] = `Bearer ${token}`;
+		}
+
+		const response = await fetch(`${this.baseUrl}/predict${query}`, { method: 'POST', headers, body: blob });
+		const data = await response.json().catch(() => null);
+		if (!response.ok) {
+			throw new Error((data && (data.error || data.message)) || `HTTP ${response.status}: ${response.statusText}`);
+		}
+		return data;
+	}
+
 	saveSession(session) {
 		return this.request('/save_session', { method: 'POST', body: JSON.stringify(session) });
 	}